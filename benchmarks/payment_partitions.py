@@ -0,0 +1,106 @@
+"""
+Monthly range partitioning of the payments table against a plain table.
+
+Usage:
+    python -m benchmarks.payment_partitions [--rows N] [--months M] [--settings creditoapp.settings.prod]
+
+Needs PostgreSQL. Fills two scratch tables shaped like credits_payment, one
+plain and one partitioned by payment_date month, with the same rows, then
+times the range queries the API runs (one month of payment_date, overdue
+lookups by due_date) and prints how many partitions each plan touches.
+The scratch tables are dropped at the end.
+"""
+import argparse
+import os
+import time
+
+QUERIES = {
+    "month by payment_date": "SELECT count(*), sum(payment_amount) FROM {table} WHERE payment_date >= %s AND payment_date < %s",
+    "pending due in month": "SELECT count(*) FROM {table} WHERE due_date >= %s AND due_date < %s AND status = 'pending'",
+}
+
+def create_tables(cursor, rows, months):
+    cursor.execute("""
+        CREATE TABLE bench_payment_plain (
+            id integer PRIMARY KEY, payment_amount numeric(11, 2), payment_date date,
+            due_date date, status varchar(15), credit_id integer
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE bench_payment_partitioned (
+            id integer, payment_amount numeric(11, 2), payment_date date,
+            due_date date, status varchar(15), credit_id integer, PRIMARY KEY (id, payment_date)
+        ) PARTITION BY RANGE (payment_date)
+    """)
+
+    for month in range(months):
+        cursor.execute(
+            f"CREATE TABLE bench_payment_partitioned_{month} PARTITION OF bench_payment_partitioned "
+            "FOR VALUES FROM (DATE '2020-01-01' + %s * interval '1 month') TO (DATE '2020-01-01' + %s * interval '1 month')",
+            [month, month + 1]
+        )
+
+    for table in ("bench_payment_plain", "bench_payment_partitioned"):
+        cursor.execute(f"""
+            INSERT INTO {table}
+            SELECT i, 100, DATE '2020-01-01' + (i %% (%s * 30)), DATE '2020-01-01' + (i %% (%s * 30)) + 7,
+                   CASE WHEN i %% 3 = 0 THEN 'pending' ELSE 'completed' END, i / 12
+            FROM generate_series(1, %s) AS i
+        """, [months, months, rows])
+        cursor.execute(f"CREATE INDEX ON {table} (payment_date)")
+        cursor.execute(f"CREATE INDEX ON {table} (due_date, status)")
+        cursor.execute(f"ANALYZE {table}")
+
+def time_query(cursor, sql, params, repeat):
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        cursor.execute(sql, params)
+        cursor.fetchall()
+
+    return (time.perf_counter() - start) / repeat * 1000
+
+def scanned_partitions(cursor, sql, params):
+    cursor.execute("EXPLAIN " + sql, params)
+
+    return sum("bench_payment_partitioned_" in line for (line,) in cursor.fetchall())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--settings", default="creditoapp.settings.prod")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", args.settings)
+
+    import django
+    django.setup()
+
+    from django.db import connection
+
+    if connection.vendor != "postgresql":
+        parser.exit(1, "Payment partitioning is PostgreSQL only, run it with PostgreSQL settings\n")
+
+    with connection.cursor() as cursor:
+        try:
+            create_tables(cursor, args.rows, args.months)
+
+            #A month in the middle of the data
+            params = ["2022-06-01", "2022-07-01"]
+
+            print(f"{args.rows} payments over {args.months} months")
+
+            for name, sql in QUERIES.items():
+                plain = time_query(cursor, sql.format(table="bench_payment_plain"), params, args.repeat)
+                partitioned_sql = sql.format(table="bench_payment_partitioned")
+                partitioned = time_query(cursor, partitioned_sql, params, args.repeat)
+
+                print(f"  {name:<24} plain {plain:8.2f} ms   partitioned {partitioned:8.2f} ms "
+                      f"({scanned_partitions(cursor, partitioned_sql, params)} of {args.months} partitions scanned)")
+        finally:
+            cursor.execute("DROP TABLE IF EXISTS bench_payment_plain, bench_payment_partitioned CASCADE")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Overhead of the API throttles per request.
+
+Usage:
+    python -m benchmarks.throttling [--requests N] [--settings creditoapp.settings.local]
+
+Runs allow_request against the configured default cache (local memory in
+development, Redis in production) for DRF's UserRateThrottle, which keeps a
+timestamp list per user, and for the project's UserSlidingWindowThrottle.
+"""
+import argparse
+import os
+import time
+from unittest import mock
+
+def run(throttle_class, requests, rate):
+    from django.core.cache import cache
+    from rest_framework.test import APIRequestFactory
+    
+    cache.clear()
+    
+    request = APIRequestFactory().get("/")
+    request.user = mock.Mock(is_authenticated=True, pk="benchmark")
+    
+    with mock.patch.object(throttle_class, "THROTTLE_RATES", {"user": rate}):
+        start = time.perf_counter()
+        
+        for _ in range(requests):
+            throttle_class().allow_request(request, None)
+            
+        elapsed = time.perf_counter() - start
+        
+    return elapsed / requests * 1_000_000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--settings", default="creditoapp.settings.local")
+    args = parser.parse_args()
+    
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", args.settings)
+    
+    import django
+    django.setup()
+    
+    from rest_framework.throttling import UserRateThrottle
+    from utils.throttling import UserSlidingWindowThrottle
+    
+    #The first rate never throttles, the second keeps the user at the limit
+    for rate in ("1000000/hour", f"{args.requests // 2}/hour"):
+        print(f"rate {rate}, {args.requests} requests")
+        
+        for throttle_class in (UserRateThrottle, UserSlidingWindowThrottle):
+            print(f"  {throttle_class.__name__:<28} {run(throttle_class, args.requests, rate):8.1f} us/request")
+
+if __name__ == "__main__":
+    main()
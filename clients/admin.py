@@ -1,8 +1,17 @@
 from django.contrib import admin
 from .models import Client
 
+from utils.paginators import EstimatedCountPaginator
+
 class ClientAdmin(admin.ModelAdmin):
     list_display = ('id', 'first_name', 'last_name')
+    list_filter = ('is_active',)
+    search_fields = ['id', 'first_name', 'last_name', 'email']
     exclude = ['date_joined']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        return Client.all_objects.all()
     
-admin.site.register(Client, ClientAdmin)
\ No newline at end of file
+admin.site.register(Client, ClientAdmin)
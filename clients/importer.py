@@ -0,0 +1,129 @@
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from utils.versions import bump_once
+
+from .models import Client
+from .serializers import ClientImportRowSerializer
+
+def check_batch(batch):
+    """
+    Validates the rows of a batch and checks their ids and emails against the
+    clients with one IN query and against the earlier rows of the batch.
+    Returns the results of every row and the clients to insert.
+    """
+    results = []
+    clients = []
+    valid = []
+
+    for line, row in batch:
+        if not isinstance(row, dict):
+            results.append({'line': line, 'id': None, 'status': "rejected", 'errors': {'non_field_errors': ["The row is not a JSON object."]}})
+            continue
+
+        serializer = ClientImportRowSerializer(data=row)
+
+        if not serializer.is_valid():
+            results.append({'line': line, 'id': row.get('id'), 'status': "rejected", 'errors': serializer.errors})
+            continue
+
+        valid.append((line, serializer.validated_data))
+
+    existing = Client.all_objects.filter(
+        Q(id__in=[data['id'] for _, data in valid]) | Q(email__in=[data['email'] for _, data in valid])
+    ).values_list('id', 'email')
+
+    taken_ids = set()
+    taken_emails = set()
+
+    for client_id, email in existing:
+        taken_ids.add(client_id)
+        taken_emails.add(email)
+
+    #Line of the row of the batch created with each id and email
+    seen_ids = {}
+    seen_emails = {}
+
+    for line, data in valid:
+        errors = {}
+
+        if data['id'] in taken_ids:
+            errors['id'] = ["A client with this id already exists."]
+        elif data['id'] in seen_ids:
+            errors['id'] = [f"Duplicates the id of line {seen_ids[data['id']]}."]
+
+        if data['email'] in taken_emails:
+            errors['email'] = ["A client with this email already exists."]
+        elif data['email'] in seen_emails:
+            errors['email'] = [f"Duplicates the email of line {seen_emails[data['email']]}."]
+
+        if errors:
+            results.append({'line': line, 'id': data['id'], 'status': "rejected", 'errors': errors})
+            continue
+
+        seen_ids[data['id']] = line
+        seen_emails[data['email']] = line
+        results.append({'line': line, 'id': data['id'], 'status': "created"})
+        clients.append(Client(**data))
+
+    results.sort(key=lambda result: result['line'])
+
+    return results, clients
+
+#Times a batch is checked and inserted before giving up on it
+ATTEMPTS = 2
+
+def import_batch(batch):
+    """
+    Checks and inserts a batch. Clients created by someone else between the
+    check and the insert make it fail, the batch is then checked again with
+    them. A batch that keeps failing is rejected as a whole, without failing
+    the batches before and after it.
+    """
+    for _ in range(ATTEMPTS):
+        results, clients = check_batch(batch)
+
+        try:
+            with transaction.atomic():
+                Client.all_objects.bulk_create(clients)
+        except IntegrityError:
+            continue
+
+        return results
+
+    return [
+        {**result, 'status': "rejected", 'errors': {'non_field_errors': ["Clients with the same id or email were being created at the same time, retry the row."]}}
+        if result['status'] == "created" else result
+        for result in results
+    ]
+
+def import_clients(rows, batch_size=1000, on_progress=None):
+    """
+    Creates clients from (line, row) pairs, batch_size rows per query and
+    transaction. Each batch is validated in memory, checked for existing and
+    repeated ids and emails with a single query and inserted with a single
+    bulk insert.
+
+    Returns the number of created and rejected clients and the result of
+    every row, rejected ones with their errors.
+    """
+    result = {'created': 0, 'rejected': 0, 'results': []}
+    rows = iter(rows)
+
+    with bump_once():
+        while True:
+            batch = list(islice(rows, batch_size))
+
+            if not batch:
+                break
+
+            for row in import_batch(batch):
+                result[row['status']] += 1
+                result['results'].append(row)
+
+            if on_progress:
+                on_progress(result)
+
+    return result
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from clients.importer import import_clients
+from utils.imports import FORMATS, file_format, read_rows
+
+class Command(BaseCommand):
+    help = "Creates clients from a CSV or JSONL file, rejecting the ones whose id or email is taken or repeated"
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help="CSV or JSONL file with id, first_name, last_name, email, phone and address")
+        parser.add_argument('--format', choices=FORMATS, default=None, help="Format of the file, taken from its extension by default")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows checked per query and inserted per transaction")
+
+    def handle(self, *args, **options):
+        import_format = file_format(options['file'], options['format'])
+
+        if import_format not in FORMATS:
+            raise CommandError(f"The file format must be one of: {', '.join(FORMATS)}")
+
+        def progress(result):
+            self.stdout.write(f"{result['created']} clients created, {result['rejected']} rejected")
+
+        try:
+            with open(options['file'], newline='', encoding='utf-8-sig') as file:
+                result = import_clients(read_rows(file, import_format), batch_size=options['batch_size'], on_progress=progress)
+        except OSError as e:
+            raise CommandError(e)
+
+        for row in result['results']:
+            if row['status'] == "rejected":
+                self.stderr.write(f"Line {row['line']}: {row['errors']}")
+
+        self.stdout.write(self.style.SUCCESS(f"{result['created']} clients created, {result['rejected']} rows rejected"))
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.1 on 2026-10-19 13:14
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from utils.postgres import trigram_indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Lower('id'), name='client_id_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Lower('first_name'), name='client_first_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Lower('last_name'), name='client_last_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='client_email_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Lower('phone'), name='client_phone_lower_idx'),
+        ),
+        trigram_indexes('clients_client', ['id', 'first_name', 'last_name', 'email', 'phone']),
+    ]
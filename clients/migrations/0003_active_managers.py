@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-19 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['id'], name='client_active_idx'),
+        ),
+    ]
@@ -1,7 +1,11 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 
-class Client(models.Model):
+from utils.managers import ActiveManager
+from utils.versions import VersionedModel, VersionedQuerySet
+
+class Client(VersionedModel):
 
     id = models.CharField(max_length=12, primary_key=True)
     first_name = models.CharField(max_length=30)
@@ -12,5 +16,21 @@ class Client(models.Model):
     address = models.CharField(max_length=50)
     is_active = models.BooleanField(("active"), default=True)
     
+    #objects hides soft-deleted clients, all_objects stays the default manager so unique
+    #validation, the admin, related lookups and dumpdata still see them
+    objects = ActiveManager()
+    all_objects = VersionedQuerySet.as_manager()
+    
+    class Meta:
+        default_manager_name = 'all_objects'
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(is_active=True), name='client_active_idx'),
+            models.Index(Lower('id'), name='client_id_lower_idx'),
+            models.Index(Lower('first_name'), name='client_first_name_lower_idx'),
+            models.Index(Lower('last_name'), name='client_last_name_lower_idx'),
+            models.Index(Lower('email'), name='client_email_lower_idx'),
+            models.Index(Lower('phone'), name='client_phone_lower_idx')
+        ]
+    
     def __str__(self) -> str:
         return f'{self.id} - {self.first_name} {self.last_name}'
\ No newline at end of file
@@ -14,4 +14,25 @@ class ClientInfoSerializer(serializers.ModelSerializer):
         exclude = [
             'date_joined',
             'is_active'
-        ]
\ No newline at end of file
+        ]
+        
+class ClientImportRowSerializer(serializers.ModelSerializer):
+    """
+    A row of a client import. Uniqueness of id and email is checked for the
+    whole batch at once by clients.importer, not per row.
+    """
+    
+    class Meta:
+        model = Client
+        fields = [
+            'id',
+            'first_name',
+            'last_name',
+            'email',
+            'phone',
+            'address'
+        ]
+        extra_kwargs = {
+            'id': {'validators': []},
+            'email': {'validators': []}
+        }
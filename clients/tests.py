@@ -2,8 +2,18 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
 from .models import Client
+from .importer import import_clients
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.forms import modelform_factory
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from io import StringIO
+import os
+from unittest import mock
+import tempfile
 
 class ClientTests(APITestCase):
     @classmethod
@@ -29,6 +39,7 @@ class ClientTests(APITestCase):
     def tearDownClass(cls):
         cls.user.delete()
         cls.client_test.delete()   
+        super().tearDownClass()
         
     def setUp(self):
         self.client.credentials(HTTP_AUTHORIZATION=f' Bearer {self.refresh.access_token}')
@@ -39,6 +50,19 @@ class ClientTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data.get("results")), 1)
         
+    def test_search_client(self):
+        url = reverse("client-list")
+        
+        response = self.client.get(url, {"search": "oli"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data.get("results")), 1)
+        
+        response = self.client.get(url, {"search": "rodrigo isa@"}, format="json")
+        self.assertEqual(len(response.data.get("results")), 1)
+        
+        response = self.client.get(url, {"search": "livia"}, format="json")
+        self.assertEqual(len(response.data.get("results")), 0)
+        
     def test_get_client_detail(self):
         url = reverse("client-detail", kwargs={"pk": self.client_test.id})
         response = self.client.get(url, format="json")
@@ -99,6 +123,132 @@ class ClientTests(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(self.client_test.is_active)
+        self.assertFalse(Client.objects.filter(id=self.client_test.id).exists())
+        self.assertTrue(Client.all_objects.filter(id=self.client_test.id).exists())
+        
+    def test_create_client_taken_by_deleted_client(self):
+        Client.all_objects.filter(id=self.client_test.id).update(is_active=False)
+        
+        url = reverse("client-list")
+        
+        data = {
+            "id": self.client_test.id,
+            "first_name": "Sabrina",
+            "last_name": "Carpenter",
+            "email": self.client_test.email,
+            "phone": "567",
+            "address": "Pensilvania"
+        }
+        
+        response = self.client.post(url, data)
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("id", response.data)
+        self.assertIn("email", response.data)
+        
+    def test_model_form_sees_deleted_client(self):
+        Client.all_objects.filter(id=self.client_test.id).update(is_active=False)
+        
+        form = modelform_factory(Client, fields="__all__")(data={
+            "id": "90",
+            "first_name": "Sabrina",
+            "last_name": "Carpenter",
+            "email": self.client_test.email,
+            "phone": "567",
+            "date_joined": "2024-01-01 00:00",
+            "address": "Pensilvania"
+        })
+        
+        self.assertFalse(form.is_valid())
+        self.assertIn("email", form.errors)
+        
+    def test_reactivate_deleted_client(self):
+        Client.all_objects.filter(id=self.client_test.id).update(is_active=False)
+        
+        url = reverse("client-detail", kwargs={"pk": self.client_test.id})
+        
+        self.assertEqual(self.client.get(url, format="json").status_code, status.HTTP_200_OK)
+        
+        response = self.client.patch(url, {"is_active": True})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(Client.objects.filter(id=self.client_test.id).exists())
+        
+    def test_bulk_onboard_clients(self):
+        url = reverse("client-bulk-onboard")
+        row = {"first_name": "Ana", "last_name": "Diaz", "phone": "555", "address": "Street 1"}
+        data = [
+            {**row, "id": "2", "email": "ana@example.com"},
+            {**row, "id": "3", "email": "isa@gmail.com"},
+            {**row, "id": "2", "email": "other@example.com"},
+            {**row, "id": "4", "email": "not-an-email"},
+            {**row, "id": "5", "email": "ana@example.com"}
+        ]
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data, format="json")
+            
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["created"], response.data["rejected"]), (1, 4))
+        self.assertEqual([result["status"] for result in response.data["results"]], ["created", "rejected", "rejected", "rejected", "rejected"])
+        self.assertIn("already exists", str(response.data["results"][1]["errors"]["email"][0]))
+        self.assertIn("line 1", str(response.data["results"][2]["errors"]["id"][0]))
+        self.assertTrue(Client.objects.filter(id="2", email="ana@example.com").exists())
+        
+        #Ids and emails of the whole batch are checked with a single query
+        selects = [query for query in queries if query["sql"].startswith("SELECT") and '"clients_client"' in query["sql"]]
+        self.assertEqual(len(selects), 1)
+        
+    @override_settings(BULK_IMPORT_MAX_ROWS=1)
+    def test_bulk_onboard_too_many_clients(self):
+        data = [
+            {"id": "80", "first_name": "Sabrina", "last_name": "Carpenter", "email": "sabrina@gmail.com", "phone": "567", "address": "Pensilvania"},
+            {"id": "81", "first_name": "Taylor", "last_name": "Swift", "email": "taylor@gmail.com", "phone": "567", "address": "Nashville"}
+        ]
+        
+        response = self.client.post(reverse("client-bulk-onboard"), data, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Client.all_objects.filter(id__in=["80", "81"]).exists())
+        
+    def test_bulk_onboard_clients_concurrent_inserts(self):
+        data = [
+            {"id": "70", "first_name": "Sabrina", "last_name": "Carpenter", "email": "sabrina@gmail.com", "phone": "567", "address": "Pensilvania"},
+            {"id": "71", "first_name": "Taylor", "last_name": "Swift", "email": "taylor@gmail.com", "phone": "567", "address": "Nashville"}
+        ]
+        
+        bulk_create = Client.all_objects.bulk_create
+        
+        #The second batch keeps colliding with clients created by another import
+        def collide(clients, *args, **kwargs):
+            if clients and clients[0].id == "71":
+                raise IntegrityError("UNIQUE constraint failed: clients_client.email")
+            
+            return bulk_create(clients, *args, **kwargs)
+        
+        with mock.patch.object(Client.all_objects, "bulk_create", side_effect=collide):
+            result = import_clients(enumerate(data, start=1), batch_size=1)
+            
+        self.assertEqual((result["created"], result["rejected"]), (1, 1))
+        self.assertEqual([row["status"] for row in result["results"]], ["created", "rejected"])
+        self.assertTrue(Client.objects.filter(id="70").exists())
+        self.assertFalse(Client.objects.filter(id="71").exists())
+        
+    def test_import_clients_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "portfolio.csv")
+            
+            with open(path, "w") as portfolio:
+                portfolio.write("id,first_name,last_name,email,phone,address\n")
+                portfolio.write("10,Ana,Diaz,ana@example.com,555,Street 1\n")
+                portfolio.write("11,Luis,Diaz,luis@example.com,556,Street 1\n")
+                portfolio.write("12,Ana,Diaz,ana@example.com,557,Street 2\n")
+                
+            out = StringIO()
+            call_command("import_clients", path, "--batch-size", "2", stdout=out, stderr=StringIO())
+            
+        self.assertIn("2 clients created, 1 rows rejected", out.getvalue())
+        self.assertEqual(Client.objects.filter(id__in=["10", "11", "12"]).count(), 2)
         
     def test_user_string_representation(self):
         self.assertEqual(str(self.client_test), "1 - Olivia Rodrigo")
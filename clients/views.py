@@ -2,23 +2,70 @@ from django.shortcuts import render
 
 # Create your views here.
 
+import io
+
+from django.conf import settings
+
 from .models import Client
 from .serializers import ClientSerializer
+from .importer import import_clients
 
 from django.core.serializers import serialize
 
 from rest_framework import routers, serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.filters import OrderingFilter, SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAuthenticated
 from utils.permissions import CustomDjangoModelPermissions
+from utils.filters import IndexedSearchFilter
+from utils.replicas import ReplicaReadMixin
+from utils.conditional import ConditionalGetMixin
+from utils.imports import FORMATS, file_format, read_rows, take_rows
 
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(ConditionalGetMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Client.objects.all().order_by('id')
     serializer_class = ClientSerializer
     permission_classes = [IsAuthenticated, CustomDjangoModelPermissions]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter]
+    search_fields = ['id', 'first_name', 'last_name', 'email', 'phone']
+    
+    #Soft-deleted clients are left out of the list but can still be read and reactivated
+    def get_queryset(self):
+        if self.action in ('retrieve', 'update', 'partial_update'):
+            return Client.all_objects.all().order_by('id')
+        
+        return super().get_queryset()
     
     def perform_destroy(self, instance):
         instance.is_active = False
         instance.save()
+        
+    #Creates clients from a JSON list or an uploaded CSV/JSONL file
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_onboard(self, request):
+        upload = request.FILES.get('file')
+        
+        if upload is not None:
+            upload_format = file_format(upload.name, request.data.get('format'))
+            
+            if upload_format not in FORMATS:
+                return Response({"error": f"The file format must be one of: {', '.join(FORMATS)}"}, status=400)
+            
+            rows = read_rows(io.TextIOWrapper(upload.file, encoding='utf-8-sig'), upload_format)
+            
+        elif isinstance(request.data, list):
+            rows = enumerate(request.data, start=1)
+            
+        else:
+            return Response({"error": "Send a list of clients or a CSV/JSONL file."}, status=400)
+        
+        #The import runs in the request, so its size is bounded
+        rows = take_rows(rows, settings.BULK_IMPORT_MAX_ROWS)
+        
+        if rows is None:
+            return Response({"error": f"At most {settings.BULK_IMPORT_MAX_ROWS} clients can be sent per request, use the import_clients command for larger files."}, status=400)
+        
+        return Response(import_clients(rows))
     
\ No newline at end of file
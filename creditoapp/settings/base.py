@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta
+from decimal import Decimal
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -30,7 +31,9 @@ INSTALLED_APPS = [
     'clients',
     'credits', 
     'products',
-    'users'
+    'tasks',
+    'users',
+    'utils'
     
 ]
 
@@ -65,7 +68,24 @@ REST_FRAMEWORK = {
     ),
  
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 5
+    'PAGE_SIZE': 5,
+    
+    'DEFAULT_THROTTLE_CLASSES': [
+        'utils.throttling.AnonSlidingWindowThrottle',
+        'utils.throttling.UserSlidingWindowThrottle',
+        'utils.throttling.ScopedSlidingWindowThrottle',
+    ],
+    
+    #'anon' and 'user' apply to every request, the other scopes are the
+    #throttle_scope of expensive viewsets and actions
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '60/min',
+        'user': '1200/min',
+        'credits': '300/min',
+        'credit_details': '60/min',
+        'credit_simulation': '30/min',
+        'reports': '60/min',
+    }
     
     
     #Useful for disabling paging
@@ -73,6 +93,43 @@ REST_FRAMEWORK = {
     
 }
 
+#Time a stored response can be replayed for a repeated Idempotency-Key
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
+#Days a paid or rejected credit stays in the hot tables before archive_credits moves it
+CREDIT_ARCHIVE_RETENTION_DAYS = 730
+
+#Partition credits_payment by payment_date month on PostgreSQL (applied by migration credits 0008),
+#off unless an environment enables it, the rebuild rewrites the whole table
+PAYMENT_PARTITIONING = False
+
+#Monthly Payment partitions kept ahead of the current month by create_payment_partitions
+PAYMENT_PARTITION_MONTHS_AHEAD = 12
+
+#Percentage of the pending collections the cash-flow report expects to be lost to delinquency
+CASHFLOW_DELINQUENCY_HAIRCUT = Decimal("5.00")
+
+#Maximum outstanding balance of a client including a new credit, None disables the check.
+#ClientExposure.limit overrides it per client
+CLIENT_EXPOSURE_LIMIT = None
+
+#Rows accepted by a bulk import request, larger files go through the import_products/import_clients commands
+BULK_IMPORT_MAX_ROWS = 5000
+
+#Days a bank statement line can be away from the due date of the payment it settles
+RECONCILE_DATE_WINDOW_DAYS = 7
+
+#ETag/Last-Modified on the API views. Model versions live in the cache, so it needs a cache
+#shared by every process that writes (API, run_workers, management commands), see utils.checks
+CONDITIONAL_GET = False
+
+#Safe requests of the views with ReplicaReadMixin read from these aliases
+DATABASE_ROUTERS = ['utils.replicas.ReplicaRouter']
+DATABASE_REPLICAS = []
+
+#Seconds a user reads from the primary after a write, above the replication lag
+REPLICA_PIN_SECONDS = 5
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -127,6 +184,10 @@ USE_I18N = True
 
 USE_TZ = True
 
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.1/howto/static-files/
+
+STATIC_URL = 'static/'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
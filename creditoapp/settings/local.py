@@ -8,5 +8,13 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+    },
+    #Same file as default, lets the replica routing be exercised locally
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+        "TEST": {"MIRROR": "default"},
     }
-}
\ No newline at end of file
+}
+
+DATABASE_REPLICAS = ["replica"]
\ No newline at end of file
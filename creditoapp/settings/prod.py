@@ -1,5 +1,6 @@
 from .base import *
 from decouple import config
+from decimal import Decimal
 
 SECRET_KEY = config("SECRET_KEY")
 DEBUG = config("DEBUG")
@@ -16,6 +17,28 @@ DATABASES = {
     }
 }
 
+#One alias per read replica host, same credentials as the primary
+DATABASE_REPLICAS = []
+
+for index, host in enumerate(config("DB_REPLICA_HOSTS", default="").split()):
+    DATABASES[f"replica_{index}"] = {**DATABASES["default"], "HOST": host}
+    DATABASE_REPLICAS.append(f"replica_{index}")
+
+PAYMENT_PARTITIONING = config("PAYMENT_PARTITIONING", default=True, cast=bool)
+
+CLIENT_EXPOSURE_LIMIT = config("CLIENT_EXPOSURE_LIMIT", default=None, cast=lambda value: Decimal(value) if value else None)
+
+#Shared by every worker so throttling budgets are global
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": config("CACHE_LOCATION", default="redis://127.0.0.1:6379/1"),
+    }
+}
+
+#Model versions are bumped in Redis by every process
+CONDITIONAL_GET = True
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
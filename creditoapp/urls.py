@@ -18,9 +18,10 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
 from products.views import ProductTypeViewSet, ProductViewSet
-from credits.views import CreditViewSet, PaymentViewSet, InterestRateListCreateView
+from credits.views import CreditViewSet, PaymentViewSet, InterestRateListCreateView, CashflowReportView, CollectionWorklistView
 from users.views import UserViewSet
 from clients.views import ClientViewSet
+from tasks.views import TaskViewSet
 
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
@@ -34,6 +35,7 @@ router.register(r'credits', CreditViewSet)
 router.register(r'payments', PaymentViewSet)
 router.register(r'users', UserViewSet)
 router.register(r'clients', ClientViewSet)
+router.register(r'tasks', TaskViewSet)
 
 urlpatterns = [
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -42,5 +44,7 @@ urlpatterns = [
     path('api-auth/', include('rest_framework.urls')),
     path('admin/', admin.site.urls),
     path('api/interest-rates/', InterestRateListCreateView.as_view(), name='interest_rates'),
+    path('api/reports/cashflow/', CashflowReportView.as_view(), name='cashflow_report'),
+    path('api/collections/worklist/', CollectionWorklistView.as_view(), name='collection_worklist'),
 ]
 
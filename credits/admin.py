@@ -1,27 +1,124 @@
-from django.contrib import admin
-from .models import Credit, Payment, InterestRate, ClientCreditProduct
+import logging
 
-class ClientCreditProductInLine(admin.TabularInline):
+from django.contrib import admin, messages
+from .models import Credit, Payment, InterestRate, ClientCreditProduct, StatusSweep, ArchivedCredit, ClientExposure
+
+from clients.models import Client
+from products.models import Product
+
+from utils.paginators import EstimatedCountPaginator
+
+logger = logging.getLogger(__name__)
+
+#Keeps soft-deleted clients and products selectable on existing rows
+class AllObjectsForeignKeyMixin:
+    all_objects_models = (Client, Product)
+    
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.related_model in self.all_objects_models:
+            kwargs['queryset'] = db_field.related_model.all_objects.all()
+            
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+def log_progress(action):
+    def on_progress(done, total):
+        logger.info("%s: processed %s of %s", action, done, total)
+        
+    return on_progress
+
+class ClientCreditProductInLine(AllObjectsForeignKeyMixin, admin.TabularInline):
     model = ClientCreditProduct
     extra = 1
+    autocomplete_fields = ['id_product']
+    readonly_fields = ('unit_price', 'line_total')
 
-class ClientCreditProductAdmin(admin.ModelAdmin):
-    list_display = ('id_credit', 'id_product')
+class ClientCreditProductAdmin(AllObjectsForeignKeyMixin, admin.ModelAdmin):
+    list_display = ('id_credit', 'id_product', 'quantity', 'unit_price', 'line_total')
     list_display_links = ('id_credit', 'id_product')
+    readonly_fields = ('unit_price', 'line_total')
+    list_select_related = ('id_credit__client', 'id_product')
+    autocomplete_fields = ['id_credit', 'id_product']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
-class CreditAdmin(admin.ModelAdmin):
+class CreditAdmin(AllObjectsForeignKeyMixin, admin.ModelAdmin):
     inlines = [ClientCreditProductInLine]
-    list_display = ('id', 'description', 'total_amount', 'no_installment', 'client')
+    list_display = ('id', 'description', 'total_amount', 'no_installment', 'client', 'status', 'application_date')
     list_display_links = ('id', 'description')
+    list_select_related = ('client',)
+    list_filter = ('status', 'application_date')
+    search_fields = ['id', 'description']
+    autocomplete_fields = ['client', 'interest_rate']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['approve_credits', 'reject_credits']
+    
+    @admin.action(description="Approve selected pending credits", permissions=["change"])
+    def approve_credits(self, request, queryset):
+        selected = queryset.count()
+        approved = queryset.approve(on_progress=log_progress("approve_credits"))
+        
+        self.message_user(request, f"{approved} of {selected} selected credits were approved.", messages.SUCCESS)
+        
+        if approved < selected:
+            self.message_user(request, f"{selected - approved} credits were skipped because they are not pending or already have payments.", messages.WARNING)
+    
+    @admin.action(description="Reject selected pending credits", permissions=["change"])
+    def reject_credits(self, request, queryset):
+        selected = queryset.count()
+        rejected = queryset.reject()
+        
+        self.message_user(request, f"{rejected} of {selected} selected credits were rejected.", messages.SUCCESS)
     
 class PaymentAdmin(admin.ModelAdmin):
-    list_display = ('id', 'credit', 'payment_amount', 'payment_date')
+    list_display = ('id', 'credit', 'payment_amount', 'payment_date', 'due_date', 'status')
     list_display_links = ('id', 'credit')
+    list_select_related = ('credit__client',)
+    list_filter = ('status', 'payment_date', 'due_date')
+    autocomplete_fields = ['credit']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['settle_payments']
+    
+    @admin.action(description="Mark selected payments as completed", permissions=["change"])
+    def settle_payments(self, request, queryset):
+        selected = queryset.count()
+        settled = queryset.settle(on_progress=log_progress("settle_payments"))
+        
+        self.message_user(request, f"{settled} of {selected} selected payments were marked as completed.", messages.SUCCESS)
+    
+class InterestRateAdmin(admin.ModelAdmin):
+    list_display = ('id', 'percentage')
+    search_fields = ['percentage']
+    
+class StatusSweepAdmin(admin.ModelAdmin):
+    list_display = ('id', 'sweep_date', 'overdue_payments', 'paid_credits', 'batches', 'started_at', 'finished_at')
+    list_filter = ('sweep_date',)
+    
+class ArchivedCreditAdmin(admin.ModelAdmin):
+    list_display = ('id', 'description', 'status', 'client', 'application_date', 'archived_at')
+    list_filter = ('status',)
+    search_fields = ['id', 'client__id']
+    
+    #Archived credits are written only by archive_credits
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+class ClientExposureAdmin(admin.ModelAdmin):
+    list_display = ('client', 'outstanding', 'limit', 'updated_at')
+    search_fields = ['client__id']
+    readonly_fields = ('outstanding', 'updated_at')
+    autocomplete_fields = ['client']
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
 admin.site.register(Credit, CreditAdmin)
 admin.site.register(Payment, PaymentAdmin)
-admin.site.register(InterestRate)
+admin.site.register(InterestRate, InterestRateAdmin)
 admin.site.register(ClientCreditProduct, ClientCreditProductAdmin)
-
-
-
+admin.site.register(StatusSweep, StatusSweepAdmin)
+admin.site.register(ArchivedCredit, ArchivedCreditAdmin)
+admin.site.register(ClientExposure, ClientExposureAdmin)
\ No newline at end of file
@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Credit, Payment, PaymentReceipt, ClientExposure, CollectionPriority
+
+def allocate_payment(credit, amount, today=None):
+    """
+    Applies `amount` to the unpaid installments of an approved credit, oldest
+    due first, and to the late penalty of each installment before its
+    principal. The installments are locked and walked once in due date order,
+    the ones touched are written back with a single bulk update, so the
+    number of queries does not depend on how many installments are covered.
+
+    Returns the allocation of every installment touched. Amounts above what
+    the credit owes are rejected.
+    """
+    today = today or timezone.localdate()
+
+    if credit.status != "approved":
+        raise ValidationError("Only approved credits can receive payments.")
+
+    with transaction.atomic():
+        installments = list(
+            Payment.objects.select_for_update()
+            .filter(credit_id=credit.id, status__in=Payment.UNPAID_STATUS)
+            .order_by('due_date', 'id')
+        )
+
+        owed = sum((payment.penalty_due(credit.penalty_rate, today) + payment.unpaid_amount for payment in installments), Decimal(0))
+
+        if amount > owed:
+            raise ValidationError(f"The amount exceeds the {owed} owed on the credit.")
+
+        remaining = amount
+        allocations = []
+        payments = []
+
+        for payment in installments:
+            if not remaining:
+                break
+
+            penalty = min(remaining, payment.penalty_due(credit.penalty_rate, today))
+            principal = min(remaining - penalty, payment.unpaid_amount)
+            remaining -= penalty + principal
+
+            payment.penalty_paid += penalty
+            payment.paid_amount += principal
+
+            if payment.paid_amount == payment.payment_amount:
+                payment.status = "completed"
+
+            payments.append(payment)
+            allocations.append({
+                'payment': payment.id,
+                'due_date': payment.due_date,
+                'penalty': penalty,
+                'principal': principal,
+                'balance': payment.payment_amount - payment.paid_amount,
+                'status': payment.status,
+            })
+
+        Payment.objects.bulk_update(payments, ['paid_amount', 'penalty_paid', 'status'])
+        PaymentReceipt.objects.bulk_create([
+            PaymentReceipt(credit_id=credit.id, payment_id=allocation['payment'], principal=allocation['principal'], penalty=allocation['penalty'], received_on=today)
+            for allocation in allocations
+        ])
+
+        ClientExposure.objects.adjust({credit.client_id: -sum(allocation['principal'] for allocation in allocations)})
+        Credit.objects.filter(id=credit.id).mark_paid()
+        CollectionPriority.objects.refresh([credit.client_id], today)
+
+    return {
+        'credit': credit.id,
+        'amount': amount,
+        'penalty': sum((allocation['penalty'] for allocation in allocations), Decimal(0)),
+        'principal': sum((allocation['principal'] for allocation in allocations), Decimal(0)),
+        'installments': allocations,
+    }
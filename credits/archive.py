@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Credit, Payment, ClientCreditProduct, ArchivedCredit, ArchivedPayment, ArchivedClientCreditProduct
+
+def closed_credits(before):
+    """
+    Credits that can be archived: paid before `before`, or rejected and
+    applied for before it.
+    """
+    return Credit.objects.filter(
+        Q(status="paid", end_date__lt=before) | Q(status="rejected", application_date__lt=before)
+    )
+
+def copy_rows(queryset, model):
+    fields = [field.attname for field in queryset.model._meta.concrete_fields]
+    
+    return model.objects.bulk_create([model(**row) for row in queryset.values(*fields)], batch_size=1000)
+
+def archive_credits(before, batch_size=500, on_progress=None):
+    """
+    Moves the closed credits, with their payments and products, to the archive
+    tables. Each batch is copied and deleted in its own transaction, so the
+    hot tables are never locked for the whole run and a credit is always in
+    exactly one of both places.
+    """
+    ids = list(closed_credits(before).order_by('id').values_list('id', flat=True))
+    archived = 0
+    
+    for offset in range(0, len(ids), batch_size):
+        batch = ids[offset:offset + batch_size]
+        
+        with transaction.atomic():
+            #Credits locked by a running write are left for the next run
+            credits = closed_credits(before).select_for_update(skip_locked=True).filter(id__in=batch)
+            locked = list(credits.values_list('id', flat=True))
+            
+            payments = Payment.objects.filter(credit_id__in=locked)
+            products = ClientCreditProduct.objects.filter(id_credit_id__in=locked)
+            
+            copy_rows(Credit.objects.filter(id__in=locked), ArchivedCredit)
+            copy_rows(payments, ArchivedPayment)
+            copy_rows(products, ArchivedClientCreditProduct)
+            
+            payments.delete()
+            products.delete()
+            Credit.objects.filter(id__in=locked).delete()
+            
+        archived += len(locked)
+        
+        if on_progress:
+            on_progress(offset + len(batch), len(ids))
+            
+    return archived
@@ -0,0 +1,28 @@
+from django_filters import rest_framework as filters
+
+from .models import Credit, Payment
+
+class CreditFilter(filters.FilterSet):
+    status = filters.MultipleChoiceFilter(choices=list(Credit.CREDIT_STATUS.items()))
+    
+    class Meta:
+        model = Credit
+        fields = {
+            'client': ['exact'],
+            'interest_rate': ['exact'],
+            'application_date': ['gte', 'lte'],
+            'start_date': ['gte', 'lte'],
+            'end_date': ['gte', 'lte']
+        }
+        
+class PaymentFilter(filters.FilterSet):
+    status = filters.MultipleChoiceFilter(choices=list(Payment.PAYMENT_STATUS.items()))
+    client = filters.CharFilter(field_name='credit__client')
+    
+    class Meta:
+        model = Payment
+        fields = {
+            'credit': ['exact'],
+            'payment_date': ['gte', 'lte'],
+            'due_date': ['gte', 'lte']
+        }
@@ -0,0 +1,102 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+class IdempotentWriteMixin:
+    """
+    Makes create, update and partial_update honour the Idempotency-Key header.
+
+    The first successful response of a key is stored together with the write
+    it describes, in the same transaction. A retry with the same key and the
+    same request is answered from the stored response with one indexed lookup
+    and without running the serializer again.
+    """
+    
+    def create(self, request, *args, **kwargs):
+        return self.idempotent(super().create, request, *args, **kwargs)
+    
+    def update(self, request, *args, **kwargs):
+        return self.idempotent(super().update, request, *args, **kwargs)
+    
+    def partial_update(self, request, *args, **kwargs):
+        return self.idempotent(super().partial_update, request, *args, **kwargs)
+    
+    def get_request_fingerprint(self, request):
+        data = request.data
+        
+        if hasattr(data, 'lists'):
+            data = dict(data.lists())
+            
+        payload = json.dumps([request.method, request.path, data], sort_keys=True, cls=DjangoJSONEncoder)
+        
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get_record(self, request, key):
+        try:
+            return IdempotencyKey.objects.get(user=request.user, key=key)
+        except IdempotencyKey.DoesNotExist:
+            return None
+    
+    def replay(self, record, fingerprint):
+        if record.fingerprint != fingerprint:
+            return Response(
+                {"error": "The Idempotency-Key was already used with a different request"},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+            
+        response = Response(record.response, status=record.status_code)
+        response['Idempotent-Replayed'] = 'true'
+        
+        return response
+    
+    def idempotent(self, handler, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        
+        if not key:
+            return handler(request, *args, **kwargs)
+        
+        if len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            return Response({"error": "The Idempotency-Key is too long"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        fingerprint = self.get_request_fingerprint(request)
+        record = self.get_record(request, key)
+        
+        if record is not None:
+            if record.expires_at > timezone.now():
+                return self.replay(record, fingerprint)
+            
+            record.delete()
+            
+        try:
+            with transaction.atomic():
+                response = handler(request, *args, **kwargs)
+                
+                if status.is_success(response.status_code):
+                    IdempotencyKey.objects.create(
+                        key=key,
+                        user=request.user,
+                        fingerprint=fingerprint,
+                        status_code=response.status_code,
+                        response=response.data,
+                        expires_at=timezone.now() + settings.IDEMPOTENCY_KEY_TTL
+                    )
+        except IntegrityError:
+            #A concurrent request with the same key won, its write is the only one kept
+            record = self.get_record(request, key)
+            
+            if record is None:
+                raise
+            
+            return self.replay(record, fingerprint)
+        
+        return response
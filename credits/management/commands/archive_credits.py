@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from credits.archive import archive_credits
+
+class Command(BaseCommand):
+    help = "Moves paid and rejected credits older than the retention window to the archive tables"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CREDIT_ARCHIVE_RETENTION_DAYS, help="Retention window in days")
+        parser.add_argument('--batch-size', type=int, default=500)
+        
+    def handle(self, *args, **options):
+        before = timezone.now().date() - timedelta(days=options['days'])
+        
+        def progress(done, total):
+            self.stdout.write(f"{done} of {total} credits processed")
+            
+        archived = archive_credits(before, batch_size=options['batch_size'], on_progress=progress)
+        
+        self.stdout.write(self.style.SUCCESS(f"{archived} credits closed before {before} were archived"))
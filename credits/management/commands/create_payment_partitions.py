@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from credits.partitions import create_payment_partitions
+
+class Command(BaseCommand):
+    help = "Creates the monthly Payment partitions ahead of the current month (PostgreSQL only)"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=settings.PAYMENT_PARTITION_MONTHS_AHEAD, help="Months ahead of the current one")
+        
+    def handle(self, *args, **options):
+        created = create_payment_partitions(options['months'])
+        
+        self.stdout.write(self.style.SUCCESS(f"{created} payment partitions created"))
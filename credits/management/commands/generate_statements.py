@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from credits.statements import RENDERERS, generate_statements, parse_period
+
+class Command(BaseCommand):
+    help = "Writes the monthly statement of every client with a credit open during the month, resuming an interrupted run"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--period', required=True, help="Month of the statements (YYYY-MM)")
+        parser.add_argument('--output', default='statements', help="Directory the period folder is created in")
+        parser.add_argument('--format', choices=sorted(RENDERERS), default='html')
+        parser.add_argument('--chunk-size', type=int, default=500, help="Clients loaded per query")
+        parser.add_argument('--workers', type=int, default=None, help="Rendering processes, one per CPU by default")
+        
+    def handle(self, *args, **options):
+        try:
+            period = parse_period(options['period'])
+        except ValueError:
+            raise CommandError("The period must be a month as YYYY-MM")
+        
+        def progress(generated, skipped):
+            self.stdout.write(f"{generated} statements generated, {skipped} skipped")
+            
+        generated, skipped = generate_statements(
+            period, options['output'], file_format=options['format'], chunk_size=options['chunk_size'],
+            workers=options['workers'], on_progress=progress
+        )
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"{generated} statements generated for {period:%Y-%m}, {skipped} already generated were skipped"
+        ))
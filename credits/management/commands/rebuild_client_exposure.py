@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from credits.models import ClientExposure
+
+class Command(BaseCommand):
+    help = "Recomputes the outstanding balance of every client from its unpaid payments"
+    
+    def handle(self, *args, **options):
+        clients = ClientExposure.objects.rebuild()
+        
+        self.stdout.write(self.style.SUCCESS(f"Exposure rebuilt, {clients} clients have an outstanding balance"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from credits.reconciliation import reconcile_statement
+
+class Command(BaseCommand):
+    help = "Settles the pending payments paid in a bank statement CSV (credit, amount, date) and lists the lines left unmatched"
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help="Bank statement CSV file")
+        parser.add_argument('--exceptions', default=None, help="CSV the unmatched, ambiguous and invalid lines are written to, <statement>.exceptions.csv by default")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Statement lines matched per query")
+        parser.add_argument('--window', type=int, default=None, help="Days a line can be away from the due date, RECONCILE_DATE_WINDOW_DAYS by default")
+
+    def handle(self, *args, **options):
+        exceptions_path = options['exceptions'] or f"{options['statement']}.exceptions.csv"
+
+        def progress(lines, counts):
+            self.stdout.write(f"{lines} lines read, {counts['matched']} matched")
+
+        try:
+            with open(options['statement'], newline='') as statement, open(exceptions_path, 'w', newline='') as exceptions:
+                counts = reconcile_statement(
+                    statement, exceptions, chunk_size=options['chunk_size'], window_days=options['window'], on_progress=progress
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['settled']} payments settled, {counts['unmatched']} unmatched, {counts['ambiguous']} ambiguous "
+            f"and {counts['invalid']} invalid lines written to {exceptions_path}"
+        ))
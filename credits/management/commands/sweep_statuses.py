@@ -0,0 +1,20 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from credits.sweeper import sweep_statuses
+
+class Command(BaseCommand):
+    help = "Marks overdue payments and paid credits, meant to run nightly"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--date', type=datetime.date.fromisoformat, help="Sweep as of this date (YYYY-MM-DD), today by default")
+        
+    def handle(self, *args, **options):
+        sweep = sweep_statuses(today=options['date'], batch_size=options['batch_size'])
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"{sweep.overdue_payments} payments marked as overdue, {sweep.paid_credits} credits marked as paid "
+            f"in {sweep.batches} batches ({(sweep.finished_at - sweep.started_at).total_seconds():.2f}s)"
+        ))
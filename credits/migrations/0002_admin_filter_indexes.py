@@ -0,0 +1,35 @@
+# Generated by Django 5.1.1 on 2026-10-19 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0001_initial'),
+        ('credits', '0001_initial'),
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='credit',
+            index=models.Index(fields=['status'], name='credit_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='credit',
+            index=models.Index(fields=['application_date'], name='credit_application_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status'], name='payment_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_date'], name='payment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['due_date'], name='payment_due_date_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-19 13:14
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from utils.postgres import trigram_indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_search_indexes'),
+        ('credits', '0002_admin_filter_indexes'),
+        ('products', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='credit',
+            index=models.Index(django.db.models.functions.text.Lower('description'), name='credit_description_lower_idx'),
+        ),
+        trigram_indexes('credits_credit', ['description']),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.1 on 2026-10-19 13:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_search_indexes'),
+        ('credits', '0003_search_indexes'),
+        ('products', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='payment',
+            name='payment_due_date_idx',
+        ),
+        migrations.AlterField(
+            model_name='credit',
+            name='client',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.RESTRICT, to='clients.client'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='credit',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.RESTRICT, to='credits.credit'),
+        ),
+        migrations.AddIndex(
+            model_name='credit',
+            index=models.Index(fields=['client', 'status'], name='credit_client_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['credit', 'status'], name='payment_credit_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['due_date', 'status'], name='payment_due_date_status_idx'),
+        ),
+    ]
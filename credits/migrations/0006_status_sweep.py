@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-19 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credits', '0005_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusSweep',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('sweep_date', models.DateField()),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('overdue_payments', models.PositiveIntegerField(default=0)),
+                ('paid_credits', models.PositiveIntegerField(default=0)),
+                ('batches', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('overdue', 'Overdue'), ('completed', 'Completed')], default='pending', max_length=15),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.1 on 2026-10-19 13:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0003_active_managers'),
+        ('credits', '0006_status_sweep'),
+        ('products', '0003_active_managers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedCredit',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('description', models.CharField(max_length=50)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=11)),
+                ('no_installment', models.PositiveSmallIntegerField()),
+                ('application_date', models.DateField()),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('penalty_rate', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('paid', 'Paid')], max_length=15)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, to='clients.client')),
+                ('interest_rate', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, to='credits.interestrate')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedClientCreditProduct',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('quantity', models.PositiveSmallIntegerField()),
+                ('id_product', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, to='products.product')),
+                ('id_credit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='clientcreditproduct_set', to='credits.archivedcredit')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedPayment',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('payment_amount', models.DecimalField(decimal_places=2, max_digits=11)),
+                ('payment_date', models.DateField()),
+                ('due_date', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('overdue', 'Overdue'), ('completed', 'Completed')], max_length=15)),
+                ('credit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_set', to='credits.archivedcredit')),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import migrations
+
+from credits.partitions import partition_payments, unpartition_payments
+
+def enabled(schema_editor):
+    return schema_editor.connection.vendor == 'postgresql' and settings.PAYMENT_PARTITIONING
+
+def forwards(apps, schema_editor):
+    if enabled(schema_editor):
+        partition_payments(schema_editor)
+
+def backwards(apps, schema_editor):
+    if enabled(schema_editor):
+        unpartition_payments(schema_editor)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credits', '0007_archive_tables'),
+    ]
+
+    #Payment is partitioned by payment_date month on PostgreSQL, SQLite keeps a plain table
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
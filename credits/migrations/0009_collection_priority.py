@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-19 13:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0003_active_managers'),
+        ('credits', '0008_payment_partitions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionPriority',
+            fields=[
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='clients.client')),
+                ('overdue_installments', models.PositiveIntegerField()),
+                ('overdue_amount', models.DecimalField(decimal_places=2, max_digits=13)),
+                ('oldest_due_date', models.DateField()),
+                ('penalty_rate', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('score', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-score', 'client'], name='collection_priority_score_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-19 13:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def build_exposure(apps, schema_editor):
+    Payment = apps.get_model('credits', 'Payment')
+    ClientExposure = apps.get_model('credits', 'ClientExposure')
+    
+    rows = (
+        Payment.objects.filter(status__in=["pending", "overdue"])
+        .values('credit__client_id').annotate(total=models.Sum('payment_amount')).order_by()
+    )
+    
+    ClientExposure.objects.bulk_create(
+        [ClientExposure(client_id=row['credit__client_id'], outstanding=row['total']) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0003_active_managers'),
+        ('credits', '0009_collection_priority'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientExposure',
+            fields=[
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='clients.client')),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=13)),
+                ('limit', models.DecimalField(blank=True, decimal_places=2, max_digits=13, null=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(build_exposure, migrations.RunPython.noop),
+    ]
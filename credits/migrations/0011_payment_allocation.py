@@ -0,0 +1,44 @@
+# Generated by Django 5.1.1 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+from utils.versions import bump_versions
+
+
+def fill_paid_amount(apps, schema_editor):
+    #Completed installments were paid in full
+    for name in ('Payment', 'ArchivedPayment'):
+        model = apps.get_model('credits', name)
+        model.objects.filter(status="completed").update(paid_amount=models.F('payment_amount'))
+        bump_versions(model, using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credits', '0010_client_exposure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpayment',
+            name='paid_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=11),
+        ),
+        migrations.AddField(
+            model_name='archivedpayment',
+            name='penalty_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=11),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='paid_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=11),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='penalty_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=11),
+        ),
+        migrations.RunPython(fill_paid_amount, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+from django.db import migrations, models
+
+from utils.versions import bump_versions
+
+#Lines priced per UPDATE by the backfill
+BATCH_SIZE = 1000
+
+
+def backfill_prices(apps, schema_editor):
+    """
+    Prices the existing lines with the current price of their product, in
+    primary key batches so no UPDATE locks the whole table.
+    """
+    Product = apps.get_model('products', 'Product')
+    price = models.Subquery(Product._default_manager.filter(id=models.OuterRef('id_product_id')).values('price')[:1])
+
+    for name in ('ClientCreditProduct', 'ArchivedClientCreditProduct'):
+        model = apps.get_model('credits', name)
+        ids = list(model.objects.order_by('id').values_list('id', flat=True))
+
+        for offset in range(0, len(ids), BATCH_SIZE):
+            lines = model.objects.filter(id__in=ids[offset:offset + BATCH_SIZE])
+            lines.update(unit_price=price)
+            lines.update(line_total=models.F('unit_price') * models.F('quantity'))
+
+        #Historical managers are plain, cached ETags of the lines must still change
+        bump_versions(model, using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credits', '0011_payment_allocation'),
+        ('products', '0003_active_managers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientcreditproduct',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=11),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='clientcreditproduct',
+            name='line_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=13),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='archivedclientcreditproduct',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=11),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='archivedclientcreditproduct',
+            name='line_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=13),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_prices, migrations.RunPython.noop),
+    ]
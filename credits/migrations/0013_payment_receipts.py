@@ -0,0 +1,59 @@
+# Generated by Django 5.1.1 on 2026-10-19 14:13
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+#Payments turned into receipts per bulk insert by the backfill
+BATCH_SIZE = 1000
+
+
+def backfill_receipts(apps, schema_editor):
+    """
+    Records what was paid before receipts existed as received on the due
+    date of the installment, or today for installments not due yet, the
+    closest date available.
+    """
+    Payment = apps.get_model('credits', 'Payment')
+    PaymentReceipt = apps.get_model('credits', 'PaymentReceipt')
+    today = django.utils.timezone.localdate()
+
+    paid = (
+        Payment.objects.filter(models.Q(paid_amount__gt=0) | models.Q(penalty_paid__gt=0))
+        .order_by('id').values_list('id', 'credit_id', 'paid_amount', 'penalty_paid', 'due_date')
+    )
+    receipts = []
+
+    for payment_id, credit_id, paid_amount, penalty_paid, due_date in paid.iterator(chunk_size=BATCH_SIZE):
+        receipts.append(PaymentReceipt(credit_id=credit_id, payment_id=payment_id, principal=paid_amount, penalty=penalty_paid, received_on=min(due_date, today)))
+
+        if len(receipts) == BATCH_SIZE:
+            PaymentReceipt.objects.bulk_create(receipts)
+            receipts = []
+
+    PaymentReceipt.objects.bulk_create(receipts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credits', '0012_line_item_prices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payment_id', models.IntegerField()),
+                ('principal', models.DecimalField(decimal_places=2, max_digits=11)),
+                ('penalty', models.DecimalField(decimal_places=2, default=0, max_digits=11)),
+                ('received_on', models.DateField(default=django.utils.timezone.localdate)),
+                ('credit', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='credits.credit')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['credit', 'received_on'], name='receipt_credit_received_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_receipts, migrations.RunPython.noop),
+    ]
@@ -1,17 +1,104 @@
-from django.db import models
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Case, Count, Exists, F, Max, Min, OuterRef, Sum, Value, When
+from django.db.models.functions import Lower
 from clients.models import Client
 from products.models import Product
+from utils.versions import VersionedModel, VersionedQuerySet
+
+from .schedules import installment_amounts, installment_dates
 
 from django.core.exceptions import ValidationError 
 
 from dateutil.relativedelta import relativedelta
 from django.utils import timezone
+from decimal import Decimal
 
 def validate_positive(value):
     if value < 0:
         raise ValidationError("Ensure this value is greater than or equal to 0.")
+
+def first_payment_date():
+    return timezone.now().date() + relativedelta(months=1)
+
+class CreditQuerySet(VersionedQuerySet):
+
+    #Number of credits approved per transaction by approve()
+    approve_batch_size = 500
+
+    def approve(self, on_progress=None):
+        """
+        Approves the pending credits of the queryset that have no schedule yet.
+        Each batch is locked, its schedules are written with a single bulk insert
+        and the credits are updated with a single bulk update. The exposure of
+        the clients of the batch is locked first, credits that would take their
+        client above its limit stay pending.
+        """
+        ids = list(self.filter(status="pending").order_by('id').values_list('id', flat=True))
+        start_date = first_payment_date()
+        approved = 0
+
+        for offset in range(0, len(ids), self.approve_batch_size):
+            batch = ids[offset:offset + self.approve_batch_size]
+
+            with transaction.atomic(using=self.db):
+                clients = set(self.model.objects.using(self.db).filter(id__in=batch).values_list('client_id', flat=True))
+                exposures = ClientExposure.objects.using(self.db).lock(clients)
+
+                candidates = (
+                    self.model.objects.using(self.db).select_for_update(skip_locked=True)
+                    .filter(id__in=batch, status="pending")
+                    .exclude(Exists(Payment.objects.filter(credit=OuterRef('pk'))))
+                    .order_by('id')
+                )
+
+                credits = []
+                payments = []
+                exposure = {}
+
+                for credit in candidates:
+                    schedule = credit.build_schedule(start_date)
+                    amount = sum(payment.payment_amount for payment in schedule)
+
+                    #Counts the credits of the batch already approved for the client
+                    if credit.client_id not in exposures or exposures[credit.client_id].exceeds(amount):
+                        continue
+
+                    exposures[credit.client_id].outstanding += amount
+                    credits.append(credit)
+                    payments.extend(schedule)
+                    credit.mark_approved(start_date)
+                    exposure[credit.client_id] = exposure.get(credit.client_id, 0) + amount
+
+                Payment.objects.using(self.db).bulk_create(payments, batch_size=1000)
+                self.model.objects.using(self.db).bulk_update(credits, ['status', 'start_date', 'end_date'], batch_size=1000)
+                ClientExposure.objects.using(self.db).adjust(exposure)
+
+            approved += len(credits)
+
+            if on_progress:
+                on_progress(offset + len(batch), len(ids))
+
+        return approved
+
+    def reject(self):
+        return self.filter(status="pending").update(status="rejected")
+
+    def mark_paid(self):
+        """
+        Marks as paid the credits of the queryset whose payments are all completed.
+        """
+        payments = Payment.objects.filter(credit=OuterRef('pk'))
+
+        return (
+            self.exclude(status__in=["paid", "rejected"])
+            .filter(Exists(payments))
+            .exclude(Exists(payments.exclude(status="completed")))
+            .update(status="paid")
+        )
     
-class Credit(models.Model):
+class Credit(VersionedModel):
     
     CREDIT_STATUS = {
         "pending":"Pending",
@@ -30,77 +117,239 @@ class Credit(models.Model):
     penalty_rate = models.DecimalField(max_digits=4, decimal_places=2, validators=[validate_positive])
     status = models.CharField(max_length=15, default="pending", choices=CREDIT_STATUS)
     interest_rate = models.ForeignKey('InterestRate', on_delete=models.RESTRICT)    
-    client = models.ForeignKey(Client, on_delete=models.RESTRICT) 
+    client = models.ForeignKey(Client, on_delete=models.RESTRICT, db_index=False) 
     products = models.ManyToManyField(Product, through='ClientCreditProduct', through_fields=('id_credit', 'id_product'), blank=False)
     
+    objects = CreditQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='credit_status_idx'),
+            models.Index(fields=['application_date'], name='credit_application_date_idx'),
+            models.Index(fields=['client', 'status'], name='credit_client_status_idx'),
+            models.Index(Lower('description'), name='credit_description_lower_idx')
+        ]
+    
     def __str__(self) -> str:
         return f'{self.description} - {self.client}'
     
+    #Sums the line totals stored on the products of the credit, without joining Product
     def calculate_total_amount(self):
-        total = 0
-        
-        for credit_product in self.clientcreditproduct_set.all():
-            total += credit_product.id_product.price * credit_product.quantity
-            
-        return total
+        return self.clientcreditproduct_set.aggregate(total=Sum('line_total'))['total'] or 0
+
+    #Builds the unsaved monthly payments of the credit starting on start_date
+    def build_schedule(self, start_date):
+        amounts = installment_amounts(self.total_amount, self.no_installment)
+        dates = installment_dates(start_date, self.no_installment)
+
+        return [
+            Payment(credit=self, payment_date=payment_date, due_date=due_date, payment_amount=amount)
+            for amount, (payment_date, due_date) in zip(amounts, dates)
+        ]
+
+    def mark_approved(self, start_date):
+        self.start_date = start_date
+        self.end_date = self.start_date + relativedelta(months=self.no_installment-1)
+        self.status = "approved"
 
     def update(self, validated_data):
         status = validated_data.pop('status', [])
-        instance_status = self.status
         
-        if instance_status == "pending":
-            if status == "approved":
+        if self.status != "pending":
+            raise ValidationError("The credit can no longer be updated.")
+        
+        if status == "approved":
+            self.approve()
+            
+        elif status == "rejected":
+            self.transition("rejected")
+            
+    def transition(self, status, **fields):
+        """
+        Moves the credit out of pending with a conditional UPDATE. Only one of
+        several concurrent transitions of the same credit can match the row, the
+        others fail fast instead of waiting on an application level lock.
+        """
+        pending = Credit.objects.filter(id=self.id, status="pending")
+        
+        #Credits that already have payments keep their schedule and stay pending
+        if status == "approved":
+            pending = pending.exclude(Exists(Payment.objects.filter(credit=OuterRef('pk'))))
+        
+        if not pending.update(status=status, **fields):
+            if Credit.objects.filter(id=self.id, status="pending").exists():
+                return False
+            
+            raise ValidationError("The credit can no longer be updated.")
+        
+        self.status = status
+        
+        for attr, value in fields.items():
+            setattr(self, attr, value)
+            
+        return True
+            
+    #Checks the exposure limit while holding the exposure row, pending credits of the client are approved one at a time
+    def approve(self):
+        start_date = first_payment_date()
+        schedule = self.build_schedule(start_date)
+        amount = sum(payment.payment_amount for payment in schedule)
+        
+        with transaction.atomic():
+            exposure = ClientExposure.objects.lock([self.client_id])[self.client_id]
+            
+            if exposure.exceeds(amount):
+                raise ValidationError(
+                    f"The credit would take the outstanding balance of the client to {exposure.outstanding + amount}, above its limit of {exposure.effective_limit}"
+                )
+            
+            if self.transition("approved", start_date=start_date, end_date=start_date + relativedelta(months=self.no_installment-1)):
+                Payment.objects.bulk_create(schedule)
                 
-                if self.payment_set.count() == 0:
-                    start_date = timezone.now().date() + relativedelta(months=1)
-                    no_installment = self.no_installment
-                    monthly_amount = self.total_amount / no_installment
-                    
-                    for i in range(no_installment):
-                        payment_date = start_date + relativedelta(months=i)
-                        
-                        Payment.objects.create(credit=self, payment_date=payment_date, due_date=payment_date + relativedelta(weeks=1), payment_amount=monthly_amount)
-                    
-                    self.start_date = start_date
-                    self.end_date = self.start_date + relativedelta(months=self.no_installment-1)
-                    
-                    self.status = "approved"
+                ClientExposure.objects.adjust({self.client_id: amount})
+
+class PaymentQuerySet(VersionedQuerySet):
+
+    #Number of payments settled per transaction by settle()
+    settle_batch_size = 1000
+
+    def settle(self, on_progress=None, received_on=None):
+        """
+        Completes the unpaid payments of the queryset in batches, records the
+        balances received on received_on (today by default) and marks as
+        paid, with one grouped update per batch, the credits they settle.
+        """
+        received_on = received_on or timezone.localdate()
+        ids = list(self.filter(status__in=Payment.UNPAID_STATUS).order_by('id').values_list('id', flat=True))
+        settled = 0
+
+        for offset in range(0, len(ids), self.settle_batch_size):
+            batch = ids[offset:offset + self.settle_batch_size]
+
+            with transaction.atomic(using=self.db):
+                payments = self.model.objects.using(self.db).filter(id__in=batch, status__in=Payment.UNPAID_STATUS)
+                balances = list(payments.values_list('id', 'credit_id', F('payment_amount') - F('paid_amount')))
+                credit_ids = {credit_id for _, credit_id, _ in balances}
+                exposure = {
+                    row['credit__client_id']: -row['total']
+                    for row in payments.values('credit__client_id').annotate(total=Sum(F('payment_amount') - F('paid_amount'))).order_by()
+                }
+
+                settled += payments.update(status="completed", paid_amount=F('payment_amount'))
+
+                PaymentReceipt.objects.using(self.db).bulk_create([
+                    PaymentReceipt(credit_id=credit_id, payment_id=payment_id, principal=balance, received_on=received_on)
+                    for payment_id, credit_id, balance in balances if balance
+                ])
+
+                ClientExposure.objects.using(self.db).adjust(exposure)
+
+                Credit.objects.using(self.db).filter(id__in=credit_ids).mark_paid()
                 
-            elif status == "rejected": 
-                self.status = "rejected"
-             
-        else:
-            raise ValidationError("The credit can no longer be updated.")
-                               
-        self.save()
+                CollectionPriority.objects.using(self.db).refresh(
+                    Credit.objects.using(self.db).filter(id__in=credit_ids).values_list('client_id', flat=True)
+                )
+
+            if on_progress:
+                on_progress(offset + len(batch), len(ids))
+
+        return settled
         
-class Payment(models.Model):
+class Payment(VersionedModel):
     
     PAYMENT_STATUS = {
         "pending":"Pending",
+        "overdue":"Overdue",
         "completed":"Completed"
     }
     
+    UNPAID_STATUS = ["pending", "overdue"]
+    
     id = models.AutoField(primary_key=True)
     payment_amount = models.DecimalField(max_digits=11, decimal_places=2)
+    #Principal and late penalty paid so far by partial payments
+    paid_amount = models.DecimalField(max_digits=11, decimal_places=2, default=0)
+    penalty_paid = models.DecimalField(max_digits=11, decimal_places=2, default=0)
     payment_date = models.DateField()
     due_date = models.DateField()
     status = models.CharField(max_length=15, default="pending", choices=PAYMENT_STATUS)
-    credit = models.ForeignKey(Credit, on_delete=models.RESTRICT)
+    credit = models.ForeignKey(Credit, on_delete=models.RESTRICT, db_index=False)
+
+    objects = PaymentQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='payment_status_idx'),
+            models.Index(fields=['payment_date'], name='payment_date_idx'),
+            models.Index(fields=['credit', 'status'], name='payment_credit_status_idx'),
+            models.Index(fields=['due_date', 'status'], name='payment_due_date_status_idx')
+        ]
     
     def __str__(self) -> str:
         return f'{self.id} - {self.credit.description}'
     
+    @property
+    def unpaid_amount(self):
+        return self.payment_amount - self.paid_amount if self.status in self.UNPAID_STATUS else 0
+    
+    def penalty_due(self, penalty_rate, today):
+        """
+        Late penalty still owed: a flat penalty_rate percent of the installment
+        once it is past its due date.
+        """
+        if self.status not in self.UNPAID_STATUS or (self.status != "overdue" and self.due_date >= today):
+            return Decimal(0)
+        
+        penalty = (self.payment_amount * penalty_rate / 100).quantize(Decimal("0.01"))
+        
+        return max(penalty - self.penalty_paid, Decimal(0))
+    
     def update(self, validated_data):
+        before = self.unpaid_amount
+        
         for attr, value in validated_data.items():
             setattr(self, attr, value) 
             
+        if self.status == "completed":
+            self.paid_amount = self.payment_amount
+            
         self.save()
+        
+        #The balance of an installment completed by hand is received today
+        if before:
+            PaymentReceipt.objects.create(credit_id=self.credit_id, payment_id=self.id, principal=before - self.unpaid_amount)
+        
+        ClientExposure.objects.adjust({self.credit.client_id: self.unpaid_amount - before})
 
-class ClientCreditProduct(models.Model):
+class PaymentReceipt(models.Model):
+    """
+    Money received for an installment, principal and late penalty, on the day
+    it was received. Statements compute balances as of a date from it.
+    """
+    credit = models.ForeignKey(Credit, on_delete=models.CASCADE, db_index=False)
+    #Payment is partitioned on PostgreSQL and can not be the target of a foreign key
+    payment_id = models.IntegerField()
+    principal = models.DecimalField(max_digits=11, decimal_places=2)
+    penalty = models.DecimalField(max_digits=11, decimal_places=2, default=0)
+    received_on = models.DateField(default=timezone.localdate)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['credit', 'received_on'], name='receipt_credit_received_idx')
+        ]
+    
+    def __str__(self) -> str:
+        return f'{self.payment_id} - {self.principal + self.penalty} ({self.received_on})'
+
+class ClientCreditProduct(VersionedModel):
     id_credit = models.ForeignKey(Credit, on_delete=models.RESTRICT)
     id_product = models.ForeignKey(Product, on_delete=models.RESTRICT)
     quantity = models.PositiveSmallIntegerField()
+    #Price of the product when the line was created or changed product, later repricing does not change it
+    unit_price = models.DecimalField(max_digits=11, decimal_places=2)
+    line_total = models.DecimalField(max_digits=13, decimal_places=2)
+    
+    objects = VersionedQuerySet.as_manager()
     
     class Meta:
         constraints = [
@@ -109,13 +358,269 @@ class ClientCreditProduct(models.Model):
   
     def __str__(self) -> str:
         return f'{self.id_credit} - {self.id_product} - Quantity: {self.quantity}'
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        #Product the stored unit price was taken from
+        instance._priced_product_id = instance.__dict__.get('id_product_id')
+        
+        return instance
+    
+    #Takes the current price of the product unless the line already has one for it
+    def snapshot_price(self):
+        if self.unit_price is None or self.id_product_id != getattr(self, '_priced_product_id', self.id_product_id):
+            self.unit_price = self.id_product.price
+            
+        self._priced_product_id = self.id_product_id
+        self.line_total = self.unit_price * self.quantity
+        
+    def save(self, *args, **kwargs):
+        self.snapshot_price()
+        super().save(*args, **kwargs)
      
-class InterestRate(models.Model):
+class InterestRate(VersionedModel):
     id = models.SmallAutoField(primary_key=True)
     percentage = models.DecimalField(max_digits=4, decimal_places=2, validators=[validate_positive])
     
+    objects = VersionedQuerySet.as_manager()
+    
     def __str__(self) -> str:
         return f'{self.percentage}'
+
+class IdempotencyKey(models.Model):
+    key = models.CharField(max_length=255)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key')
+        ]
+        
+    def __str__(self) -> str:
+        return f'{self.user_id} - {self.key}'
+
+class StatusSweep(models.Model):
+    id = models.AutoField(primary_key=True)
+    sweep_date = models.DateField()
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    overdue_payments = models.PositiveIntegerField(default=0)
+    paid_credits = models.PositiveIntegerField(default=0)
+    batches = models.PositiveIntegerField(default=0)
+    
+    def __str__(self) -> str:
+        return f'{self.sweep_date} - {self.overdue_payments} overdue payments, {self.paid_credits} paid credits'
+
+class ArchivedCredit(models.Model):
+    """
+    Closed credit moved out of the hot tables by archive_credits. Keeps the id
+    it had, the archived payments and products hang from it.
+    """
+    id = models.IntegerField(primary_key=True)
+    description = models.CharField(max_length=50)
+    total_amount = models.DecimalField(max_digits=11, decimal_places=2, default=0)
+    no_installment = models.PositiveSmallIntegerField()
+    application_date = models.DateField()
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
+    penalty_rate = models.DecimalField(max_digits=4, decimal_places=2)
+    status = models.CharField(max_length=15, choices=Credit.CREDIT_STATUS)
+    interest_rate = models.ForeignKey('InterestRate', on_delete=models.RESTRICT)
+    client = models.ForeignKey(Client, on_delete=models.RESTRICT)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self) -> str:
+        return f'{self.description} - {self.client}'
+
+class ArchivedPayment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    payment_amount = models.DecimalField(max_digits=11, decimal_places=2)
+    paid_amount = models.DecimalField(max_digits=11, decimal_places=2, default=0)
+    penalty_paid = models.DecimalField(max_digits=11, decimal_places=2, default=0)
+    payment_date = models.DateField()
+    due_date = models.DateField()
+    status = models.CharField(max_length=15, choices=Payment.PAYMENT_STATUS)
+    credit = models.ForeignKey(ArchivedCredit, on_delete=models.CASCADE, related_name='payment_set')
+    
+    def __str__(self) -> str:
+        return f'{self.id} - {self.credit.description}'
+
+class ArchivedClientCreditProduct(models.Model):
+    id = models.IntegerField(primary_key=True)
+    id_credit = models.ForeignKey(ArchivedCredit, on_delete=models.CASCADE, related_name='clientcreditproduct_set')
+    id_product = models.ForeignKey(Product, on_delete=models.RESTRICT)
+    quantity = models.PositiveSmallIntegerField()
+    unit_price = models.DecimalField(max_digits=11, decimal_places=2)
+    line_total = models.DecimalField(max_digits=13, decimal_places=2)
+    
+    def __str__(self) -> str:
+        return f'{self.id_credit} - {self.id_product} - Quantity: {self.quantity}'
+
+class CollectionPriorityQuerySet(models.QuerySet):
     
+    #Weights of the collection priority score
+    DAY_WEIGHT = Decimal("1")
+    AMOUNT_WEIGHT = Decimal("0.01")
+    INSTALLMENT_WEIGHT = Decimal("5")
     
-    
\ No newline at end of file
+    def score(self, days_overdue, overdue_amount, penalty_rate, overdue_installments):
+        return (
+            days_overdue * self.DAY_WEIGHT * (1 + penalty_rate / 100)
+            + overdue_amount * self.AMOUNT_WEIGHT
+            + overdue_installments * self.INSTALLMENT_WEIGHT
+        )
+    
+    def refresh(self, client_ids=None, today=None):
+        """
+        Recomputes the priority of the given clients, or of every client, from
+        their overdue payments with one grouped query, upserts the results and
+        removes the clients that no longer have anything overdue.
+        """
+        today = today or timezone.localdate()
+        now = timezone.now()
+        overdue = Payment.objects.using(self.db).filter(status="overdue")
+        priorities = self.all()
+        
+        if client_ids is not None:
+            client_ids = list(set(client_ids))
+            overdue = overdue.filter(credit__client_id__in=client_ids)
+            priorities = priorities.filter(client_id__in=client_ids)
+            
+        rows = overdue.values('credit__client_id').annotate(
+            overdue_installments=Count('id'),
+            overdue_amount=Sum(F('payment_amount') - F('paid_amount')),
+            oldest_due_date=Min('due_date'),
+            penalty_rate=Max('credit__penalty_rate')
+        ).order_by()
+        
+        objs = [
+            self.model(
+                client_id=row['credit__client_id'],
+                overdue_installments=row['overdue_installments'],
+                overdue_amount=row['overdue_amount'],
+                oldest_due_date=row['oldest_due_date'],
+                penalty_rate=row['penalty_rate'],
+                score=self.score((today - row['oldest_due_date']).days, row['overdue_amount'], row['penalty_rate'], row['overdue_installments']),
+                refreshed_at=now
+            )
+            for row in rows
+        ]
+        
+        with transaction.atomic(using=self.db):
+            self.bulk_create(
+                objs, batch_size=1000, update_conflicts=True, unique_fields=['client'],
+                update_fields=['overdue_installments', 'overdue_amount', 'oldest_due_date', 'penalty_rate', 'score', 'refreshed_at']
+            )
+            priorities.filter(refreshed_at__lt=now).delete()
+            
+        return len(objs)
+
+class CollectionPriority(models.Model):
+    """
+    Materialized collection priority of each client with overdue payments,
+    refreshed by CollectionPriority.objects.refresh when payments change.
+    """
+    client = models.OneToOneField(Client, on_delete=models.CASCADE, primary_key=True)
+    overdue_installments = models.PositiveIntegerField()
+    overdue_amount = models.DecimalField(max_digits=13, decimal_places=2)
+    oldest_due_date = models.DateField()
+    penalty_rate = models.DecimalField(max_digits=4, decimal_places=2)
+    score = models.DecimalField(max_digits=14, decimal_places=2)
+    refreshed_at = models.DateTimeField()
+    
+    objects = CollectionPriorityQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score', 'client'], name='collection_priority_score_idx')
+        ]
+        
+    def __str__(self) -> str:
+        return f'{self.client_id} - {self.score}'
+
+class ClientExposureQuerySet(models.QuerySet):
+    
+    def adjust(self, deltas):
+        """
+        Adds each amount of `deltas`, a mapping of client id to amount, to the
+        outstanding balance of the client with a single UPDATE.
+        """
+        deltas = {client_id: delta for client_id, delta in deltas.items() if delta}
+        
+        if not deltas:
+            return
+        
+        with transaction.atomic(using=self.db):
+            self.bulk_create([self.model(client_id=client_id) for client_id in deltas], ignore_conflicts=True)
+            
+            self.filter(client_id__in=deltas).update(
+                outstanding=F('outstanding') + Case(
+                    *[When(client_id=client_id, then=Value(delta)) for client_id, delta in deltas.items()],
+                    output_field=models.DecimalField(max_digits=13, decimal_places=2)
+                ),
+                updated_at=timezone.now()
+            )
+    
+    def lock(self, client_ids):
+        """
+        Locks the exposure rows of the clients, creating the missing ones, and
+        returns them by client id. Rows are locked in client order so
+        concurrent approvals do not deadlock. Must run in a transaction.
+        """
+        self.bulk_create([self.model(client_id=client_id) for client_id in client_ids], ignore_conflicts=True)
+        
+        return {
+            exposure.client_id: exposure
+            for exposure in self.select_for_update().filter(client_id__in=client_ids).order_by('client_id')
+        }
+    
+    def rebuild(self):
+        """
+        Recomputes every outstanding balance from the unpaid payments with one
+        grouped query. Per client limits are kept.
+        """
+        now = timezone.now()
+        rows = (
+            Payment.objects.using(self.db).filter(status__in=Payment.UNPAID_STATUS)
+            .values('credit__client_id').annotate(total=Sum(F('payment_amount') - F('paid_amount'))).order_by()
+        )
+        
+        objs = [self.model(client_id=row['credit__client_id'], outstanding=row['total'], updated_at=now) for row in rows]
+        
+        with transaction.atomic(using=self.db):
+            self.update(outstanding=0, updated_at=now)
+            self.bulk_create(objs, batch_size=1000, update_conflicts=True, unique_fields=['client'], update_fields=['outstanding', 'updated_at'])
+            
+        return len(objs)
+
+class ClientExposure(models.Model):
+    """
+    Outstanding balance of the unpaid installments of each client. It is kept
+    up to date on approval and payment so the exposure limit of a new credit
+    is checked with a primary key lookup.
+    """
+    client = models.OneToOneField(Client, on_delete=models.CASCADE, primary_key=True)
+    outstanding = models.DecimalField(max_digits=13, decimal_places=2, default=0)
+    #Overrides settings.CLIENT_EXPOSURE_LIMIT for this client
+    limit = models.DecimalField(max_digits=13, decimal_places=2, null=True, blank=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+    
+    objects = ClientExposureQuerySet.as_manager()
+    
+    def __str__(self) -> str:
+        return f'{self.client_id} - {self.outstanding}'
+    
+    @property
+    def effective_limit(self):
+        return settings.CLIENT_EXPOSURE_LIMIT if self.limit is None else self.limit
+    
+    def exceeds(self, amount):
+        limit = self.effective_limit
+        
+        return limit is not None and self.outstanding + amount > limit
@@ -0,0 +1,149 @@
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+PAYMENT_TABLE = "credits_payment"
+DEFAULT_PARTITION = f"{PAYMENT_TABLE}_default"
+
+#Indexes of Payment.Meta, created again on the partitioned table
+PAYMENT_INDEXES = {
+    "payment_status_idx": "status",
+    "payment_date_idx": "payment_date",
+    "payment_credit_status_idx": "credit_id, status",
+    "payment_due_date_status_idx": "due_date, status",
+}
+
+def partition_name(month):
+    return f"{PAYMENT_TABLE}_y{month:%Y}m{month:%m}"
+
+def month_start(date):
+    return date.replace(day=1)
+
+def is_partitioned(cursor):
+    cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [PAYMENT_TABLE])
+
+    return cursor.fetchone() is not None
+
+def create_partition(cursor, month):
+    """
+    Creates the partition of `month` unless it exists. Rows of that month that
+    landed in the default partition are moved into it before it is attached.
+    """
+    name = partition_name(month)
+
+    cursor.execute("SELECT to_regclass(%s)", [name])
+
+    if cursor.fetchone()[0] is not None:
+        return False
+
+    bounds = [month, month + relativedelta(months=1)]
+
+    cursor.execute(f'CREATE TABLE "{name}" (LIKE "{PAYMENT_TABLE}" INCLUDING DEFAULTS)')
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE payment_date >= %s AND payment_date < %s RETURNING *) '
+        f'INSERT INTO "{name}" SELECT * FROM moved',
+        bounds
+    )
+    cursor.execute(f'ALTER TABLE "{PAYMENT_TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)', bounds)
+
+    return True
+
+def create_payment_partitions(months=None, using=DEFAULT_DB_ALIAS):
+    """
+    Makes sure the monthly partitions of the current month and the next
+    `months` exist. Does nothing unless Payment is partitioned (PostgreSQL).
+    Returns the number of partitions created.
+    """
+    months = settings.PAYMENT_PARTITION_MONTHS_AHEAD if months is None else months
+    connection = connections[using]
+
+    if connection.vendor != 'postgresql':
+        return 0
+
+    start = month_start(timezone.now().date())
+    created = 0
+
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return 0
+
+        for offset in range(months + 1):
+            created += create_partition(cursor, start + relativedelta(months=offset))
+
+    return created
+
+def partition_payments(schema_editor):
+    """
+    Rebuilds credits_payment as a table partitioned by payment_date month.
+
+    PostgreSQL requires the partition key in every unique constraint, so the
+    primary key becomes (id, payment_date). The id stays unique through its
+    identity sequence. Payments outside every monthly partition go to the
+    default partition, so an insert never fails for a missing month.
+    """
+    execute = schema_editor.execute
+
+    execute(f'ALTER TABLE "{PAYMENT_TABLE}" RENAME TO "{PAYMENT_TABLE}_old"')
+
+    for name in PAYMENT_INDEXES:
+        execute(f'DROP INDEX IF EXISTS "{name}"')
+
+    execute(
+        f'CREATE TABLE "{PAYMENT_TABLE}" (LIKE "{PAYMENT_TABLE}_old" INCLUDING DEFAULTS INCLUDING IDENTITY, '
+        f'PRIMARY KEY (id, payment_date)) PARTITION BY RANGE (payment_date)'
+    )
+    execute(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{PAYMENT_TABLE}" DEFAULT')
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN(payment_date) FROM "{PAYMENT_TABLE}_old"')
+        first = cursor.fetchone()[0] or timezone.now().date()
+
+        month = month_start(first)
+        last = month_start(timezone.now().date()) + relativedelta(months=settings.PAYMENT_PARTITION_MONTHS_AHEAD)
+
+        while month <= last:
+            create_partition(cursor, month)
+            month += relativedelta(months=1)
+
+    execute(f'INSERT INTO "{PAYMENT_TABLE}" OVERRIDING SYSTEM VALUE SELECT * FROM "{PAYMENT_TABLE}_old"')
+    execute(
+        f"SELECT setval(pg_get_serial_sequence('{PAYMENT_TABLE}', 'id'), "
+        f'(SELECT COALESCE(MAX(id), 0) + 1 FROM "{PAYMENT_TABLE}_old"), false)'
+    )
+    execute(f'DROP TABLE "{PAYMENT_TABLE}_old"')
+    execute(
+        f'ALTER TABLE "{PAYMENT_TABLE}" ADD CONSTRAINT "{PAYMENT_TABLE}_credit_id_fk" '
+        f'FOREIGN KEY (credit_id) REFERENCES "credits_credit" (id) DEFERRABLE INITIALLY DEFERRED'
+    )
+
+    for name, columns in PAYMENT_INDEXES.items():
+        execute(f'CREATE INDEX "{name}" ON "{PAYMENT_TABLE}" ({columns})')
+
+def unpartition_payments(schema_editor):
+    """
+    Reverse of partition_payments, back to a single table with id as key.
+    """
+    execute = schema_editor.execute
+
+    execute(f'ALTER TABLE "{PAYMENT_TABLE}" RENAME TO "{PAYMENT_TABLE}_old"')
+
+    for name in PAYMENT_INDEXES:
+        execute(f'DROP INDEX IF EXISTS "{name}"')
+
+    execute(
+        f'CREATE TABLE "{PAYMENT_TABLE}" (LIKE "{PAYMENT_TABLE}_old" INCLUDING DEFAULTS INCLUDING IDENTITY, PRIMARY KEY (id))'
+    )
+    execute(f'INSERT INTO "{PAYMENT_TABLE}" OVERRIDING SYSTEM VALUE SELECT * FROM "{PAYMENT_TABLE}_old"')
+    execute(
+        f"SELECT setval(pg_get_serial_sequence('{PAYMENT_TABLE}', 'id'), "
+        f'(SELECT COALESCE(MAX(id), 0) + 1 FROM "{PAYMENT_TABLE}_old"), false)'
+    )
+    execute(f'DROP TABLE "{PAYMENT_TABLE}_old" CASCADE')
+    execute(
+        f'ALTER TABLE "{PAYMENT_TABLE}" ADD CONSTRAINT "{PAYMENT_TABLE}_credit_id_fk" '
+        f'FOREIGN KEY (credit_id) REFERENCES "credits_credit" (id) DEFERRABLE INITIALLY DEFERRED'
+    )
+
+    for name, columns in PAYMENT_INDEXES.items():
+        execute(f'CREATE INDEX "{name}" ON "{PAYMENT_TABLE}" ({columns})')
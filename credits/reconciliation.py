@@ -0,0 +1,132 @@
+import csv
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.conf import settings
+
+from .models import Payment
+
+CENTS = Decimal("0.01")
+
+#Columns a bank statement file must have, extra columns are kept in the exceptions file
+STATEMENT_COLUMNS = ['credit', 'amount', 'date']
+
+def parse_line(row):
+    """
+    Credit id, amount and date of a statement line, None if any is invalid.
+    """
+    try:
+        return int(row['credit']), Decimal(row['amount']).quantize(CENTS), date.fromisoformat(row['date'].strip())
+    except (AttributeError, TypeError, ValueError, InvalidOperation):
+        return None
+
+def build_index(lines, window):
+    """
+    Unpaid payments that can match the lines of a chunk, loaded with one query
+    for their credits and date range, keyed by (credit, unpaid balance, due
+    date) so a line is looked up in constant time.
+    """
+    credit_ids = {line[0] for line in lines}
+    dates = [line[2] for line in lines]
+    index = {}
+
+    candidates = (
+        Payment.objects.filter(
+            credit_id__in=credit_ids,
+            status__in=Payment.UNPAID_STATUS,
+            due_date__range=(min(dates) - window, max(dates) + window)
+        )
+        .values_list('id', 'credit_id', 'payment_amount', 'paid_amount', 'due_date')
+    )
+
+    for payment_id, credit_id, payment_amount, paid_amount, due_date in candidates:
+        index.setdefault((credit_id, payment_amount - paid_amount, due_date), []).append(payment_id)
+
+    return index
+
+def match_line(index, line, window):
+    """
+    Removes from the index and returns the payments the line can settle,
+    probing each due date of the window. A single candidate is a match.
+    """
+    credit_id, amount, day = line
+    keys = [(credit_id, amount, day + timedelta(days=offset)) for offset in range(-window.days, window.days + 1)]
+    candidates = [(key, payment_id) for key in keys for payment_id in index.get(key, ())]
+
+    if len(candidates) == 1:
+        key, payment_id = candidates[0]
+        index[key].remove(payment_id)
+
+    return [payment_id for _, payment_id in candidates]
+
+def reconcile_statement(statement, exceptions, chunk_size=5000, window_days=None, on_progress=None):
+    """
+    Streams a CSV bank statement with credit, amount and date columns and
+    settles the unpaid payment each line pays for: same credit, same unpaid
+    balance and due date within the window.
+
+    The file is read chunk_size lines at a time, each chunk costs one query
+    for its candidates plus one bulk settlement per line date of its
+    matches, recorded as received on that date. Lines that
+    are invalid, match nothing or match several payments are written to the
+    `exceptions` file with the reason. Returns the count of each outcome.
+    """
+    window = timedelta(days=settings.RECONCILE_DATE_WINDOW_DAYS if window_days is None else window_days)
+    reader = csv.DictReader(statement)
+
+    missing = set(STATEMENT_COLUMNS) - set(reader.fieldnames or [])
+
+    if missing:
+        raise ValueError(f"The statement has no {', '.join(sorted(missing))} column")
+
+    writer = csv.DictWriter(exceptions, fieldnames=['line', 'reason', *reader.fieldnames], extrasaction='ignore')
+    writer.writeheader()
+
+    counts = {'matched': 0, 'settled': 0, 'unmatched': 0, 'ambiguous': 0, 'invalid': 0}
+    #Line 1 of the file is the header
+    line_number = 1
+
+    while True:
+        rows = list(islice(reader, chunk_size))
+
+        if not rows:
+            break
+
+        lines = []
+
+        for row in rows:
+            line_number += 1
+            line = parse_line(row)
+
+            if line is None:
+                counts['invalid'] += 1
+                writer.writerow({'line': line_number, 'reason': "invalid", **row})
+            else:
+                lines.append((line_number, row, line))
+
+        #Payments matched by each line date, they are received on that date
+        matched = {}
+
+        if lines:
+            index = build_index([line for _, _, line in lines], window)
+
+            for number, row, line in lines:
+                candidates = match_line(index, line, window)
+
+                if len(candidates) == 1:
+                    matched.setdefault(line[2], []).append(candidates[0])
+                    continue
+
+                reason = "ambiguous" if candidates else "unmatched"
+                counts[reason] += 1
+                writer.writerow({'line': number, 'reason': reason, **row})
+
+        for received_on, payment_ids in matched.items():
+            counts['matched'] += len(payment_ids)
+            counts['settled'] += Payment.objects.filter(id__in=payment_ids).settle(received_on=received_on)
+
+        if on_progress:
+            on_progress(line_number - 1, counts)
+
+    return counts
@@ -0,0 +1,109 @@
+import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import ClientCreditProduct, Payment
+
+PERIODS = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+#Value each payment row is grouped by for a breakdown
+GROUPS = {
+    'interest_rate': 'credit__interest_rate__percentage',
+    'product_type': 'credit__clientcreditproduct__id_product__product_type__description',
+}
+
+def cashflow_totals(period='month', group_by=None, start_date=None, end_date=None):
+    """
+    Unpaid balances of the pending and overdue payments summed per
+    payment_date period, and per group if asked, in a single grouped query.
+
+    A credit can finance products of several types, so for the product type
+    breakdown each credit's balance is split across its products in
+    proportion to their share of the credit total.
+    """
+    payments = Payment.objects.filter(status__in=Payment.UNPAID_STATUS)
+
+    if start_date:
+        payments = payments.filter(payment_date__gte=start_date)
+
+    if end_date:
+        payments = payments.filter(payment_date__lte=end_date)
+
+    if group_by == 'product_type':
+        return product_type_totals(payments.filter(credit__total_amount__gt=0), period)
+
+    fields = {'period_start': PERIODS[period]('payment_date')}
+
+    if group_by:
+        fields['group'] = F(GROUPS[group_by])
+
+    return list(
+        payments.annotate(**fields)
+        .values(*fields)
+        .annotate(amount=Sum(F('payment_amount') - F('paid_amount')))
+        .order_by(*fields)
+    )
+
+def product_type_totals(payments, period):
+    """
+    Splits the balance of each credit per period across the product types of
+    its lines, in Decimal, with one grouped query for the balances and one for
+    the line totals.
+    """
+    balances = list(
+        payments.annotate(period_start=PERIODS[period]('payment_date'))
+        .values('period_start', 'credit_id', 'credit__total_amount')
+        .annotate(amount=Sum(F('payment_amount') - F('paid_amount')))
+        .order_by()
+    )
+
+    lines = (
+        ClientCreditProduct.objects.filter(id_credit__in={balance['credit_id'] for balance in balances})
+        .values('id_credit_id', group=F('id_product__product_type__description'))
+        .annotate(line_total=Sum('line_total'))
+        .order_by()
+    )
+
+    shares = {}
+
+    for line in lines:
+        shares.setdefault(line['id_credit_id'], []).append((line['group'], line['line_total']))
+
+    totals = {}
+
+    for balance in balances:
+        for group, line_total in shares.get(balance['credit_id'], []):
+            key = (balance['period_start'], group)
+            totals[key] = totals.get(key, Decimal(0)) + balance['amount'] * line_total / balance['credit__total_amount']
+
+    return [
+        {'period_start': period_start, 'group': group, 'amount': amount}
+        for (period_start, group), amount in sorted(totals.items())
+    ]
+
+def seconds_until_tomorrow():
+    now = timezone.localtime()
+    tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), tzinfo=now.tzinfo)
+
+    return max(1, int((tomorrow - now).total_seconds()))
+
+def cached_cashflow_totals(period='month', group_by=None, start_date=None, end_date=None):
+    """
+    cashflow_totals cached until the end of the day, one entry per set of
+    parameters.
+    """
+    key = f"cashflow:{timezone.localdate()}:{period}:{group_by}:{start_date}:{end_date}"
+    totals = cache.get(key)
+
+    if totals is None:
+        totals = cashflow_totals(period, group_by, start_date, end_date)
+        cache.set(key, totals, seconds_until_tomorrow())
+
+    return totals
@@ -0,0 +1,29 @@
+from decimal import Decimal, ROUND_DOWN
+
+from dateutil.relativedelta import relativedelta
+
+CENTS = Decimal("0.01")
+
+def installment_amounts(total_amount, no_installment):
+    """
+    Amounts of the installments a credit of total_amount is repaid in, in
+    cents as they are stored, with the rounding remainder on the last one so
+    they add up to the total. Used both by approval and by the simulation, so
+    a simulated schedule is the one the credit gets when it is approved.
+    """
+    total_amount = Decimal(total_amount).quantize(CENTS)
+    amount = (total_amount / no_installment).quantize(CENTS, rounding=ROUND_DOWN)
+
+    return [amount] * (no_installment - 1) + [total_amount - amount * (no_installment - 1)]
+
+def installment_dates(start_date, no_installment):
+    """
+    Payment and due date of each monthly installment starting on start_date.
+    """
+    dates = []
+
+    for i in range(no_installment):
+        payment_date = start_date + relativedelta(months=i)
+        dates.append((payment_date, payment_date + relativedelta(weeks=1)))
+
+    return dates
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
-from .models import Credit, Payment, InterestRate, ClientCreditProduct
+from .models import Credit, Payment, InterestRate, ClientCreditProduct, ArchivedCredit, CollectionPriority, ClientExposure
+from .simulation import MAX_SIMULATION_SCENARIOS
+from .reports import PERIODS, GROUPS
 
 from products.models import Product
 from products.serializers import ProductInfoSerializer
@@ -10,7 +12,10 @@ from clients.serializers import ClientInfoSerializer
 
 from dateutil.relativedelta import relativedelta
 
+from decimal import Decimal
+
 from django.utils import timezone
+from django.conf import settings
 
 class PaymentSerializer(serializers.ModelSerializer):
     credit = serializers.PrimaryKeyRelatedField(queryset=Credit.objects.all(), write_only=True)
@@ -20,11 +25,14 @@ class PaymentSerializer(serializers.ModelSerializer):
         fields = [
             'id', 
             'payment_amount', 
+            'paid_amount',
+            'penalty_paid',
             'payment_date', 
             'due_date', 
             'status', 
             'credit'
             ]
+        read_only_fields = ['paid_amount', 'penalty_paid']
         
     def update(self, instance, validated_data):
         instance.update(validated_data)
@@ -37,6 +45,24 @@ class PaymentSerializer(serializers.ModelSerializer):
         
         return instance
              
+class PaymentAllocationRequestSerializer(serializers.Serializer):
+    amount = serializers.DecimalField(max_digits=11, decimal_places=2, min_value=Decimal("0.01"))
+    
+class InstallmentAllocationSerializer(serializers.Serializer):
+    payment = serializers.IntegerField()
+    due_date = serializers.DateField()
+    penalty = serializers.DecimalField(max_digits=11, decimal_places=2)
+    principal = serializers.DecimalField(max_digits=11, decimal_places=2)
+    balance = serializers.DecimalField(max_digits=11, decimal_places=2)
+    status = serializers.CharField()
+    
+class PaymentAllocationSerializer(serializers.Serializer):
+    credit = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=11, decimal_places=2)
+    penalty = serializers.DecimalField(max_digits=11, decimal_places=2)
+    principal = serializers.DecimalField(max_digits=11, decimal_places=2)
+    installments = InstallmentAllocationSerializer(many=True)
+             
 class InterestRateSerializer(serializers.ModelSerializer):   
     
     class Meta:
@@ -58,14 +84,21 @@ class ClientCreditProductSerializer(serializers.ModelSerializer):
         fields = [
             'id_product', 
             'product_info', 
-            'quantity'
+            'quantity',
+            'unit_price',
+            'line_total'
             ]
+        read_only_fields = ['unit_price', 'line_total']
+        
+class CreditProductSerializer(ClientCreditProductSerializer):
+    #Products are resolved all at once by CreditSerializer.validate_products
+    id_product = serializers.IntegerField(write_only=True)
         
 class CreditSerializer(serializers.ModelSerializer):
     
-    products = ClientCreditProductSerializer(source='clientcreditproduct_set', many=True)
+    products = CreditProductSerializer(source='clientcreditproduct_set', many=True)
     
-    client = serializers.PrimaryKeyRelatedField(queryset=Client.objects.all(), write_only=True)
+    client = serializers.PrimaryKeyRelatedField(queryset=Client.all_objects.all(), write_only=True)
     client_info = ClientInfoSerializer(source='client', read_only=True)
     
     interest_rate = serializers.PrimaryKeyRelatedField(queryset=InterestRate.objects.all(), write_only=True)
@@ -93,37 +126,76 @@ class CreditSerializer(serializers.ModelSerializer):
             'payments'
             ]
     
-    #Validates that a product exists
+    #Validates that a new credit belongs to an active client
+    def validate_client(self, value):
+        if self.instance is None and not value.is_active:
+            raise ValidationError("The client is inactive and cannot create a credit")
+        
+        return value
+    
+    #Validates that the products exist and are active with a single query
     def validate_products(self, value):
         if not value:
             raise ValidationError("There must be at least one product.")
         
-        inactive_products = [product['id_product'] for product in value if not product['id_product'].is_active]
+        product_ids = [product['id_product'] for product in value]
+        
+        if len(set(product_ids)) != len(product_ids):
+            raise ValidationError("A product can only be added once to a credit.")
         
-        if inactive_products:
-            product_names = "\n".join([product.name for product in inactive_products])
-            raise ValidationError(
-                f"The following products are inactive and cannot be added to credit: {product_names}"
-            )
+        products = Product.objects.in_bulk(product_ids)
+        
+        if len(products) != len(product_ids):
+            missing_ids = set(product_ids) - products.keys()
+            inactive_products = Product.all_objects.filter(id__in=missing_ids)
+            
+            if inactive_products:
+                product_names = "\n".join([product.name for product in inactive_products])
+                raise ValidationError(
+                    f"The following products are inactive and cannot be added to credit: {product_names}"
+                )
+                
+            raise ValidationError(f"The following products do not exist: {', '.join(map(str, sorted(missing_ids)))}")
+        
+        for product in value:
+            product['id_product'] = products[product['id_product']]
             
         return value
   
+    #Checks the exposure limit of the client with a primary key lookup
+    def validate(self, attrs):
+        if self.instance is None:
+            client = attrs['client']
+            amount = sum(product['id_product'].price * product['quantity'] for product in attrs['clientcreditproduct_set'])
+            
+            try:
+                exposure = ClientExposure.objects.get(client=client)
+            except ClientExposure.DoesNotExist:
+                exposure = ClientExposure(client=client)
+                
+            if exposure.exceeds(amount):
+                raise ValidationError({
+                    "client": f"The credit would take the outstanding balance of the client to {exposure.outstanding + amount}, above its limit of {exposure.effective_limit}"
+                })
+                
+        return attrs
+  
+    #Creates the credit with its total and its products with a single bulk insert
     def create(self, validated_data):
         products_data = validated_data.pop('clientcreditproduct_set')
+        validated_data.pop('total_amount', None)
         
-        client = validated_data.get('client')
+        lines = [ClientCreditProduct(**product_data) for product_data in products_data]
         
-        if not client.is_active:
-            raise ValidationError("The client is inactive and cannot create a credit")
+        for line in lines:
+            line.snapshot_price()
         
-        credit = Credit.objects.create(**validated_data)
+        credit = Credit.objects.create(total_amount=sum(line.line_total for line in lines), **validated_data)
         
-        for product_data in products_data:
-            ClientCreditProduct.objects.create(id_credit=credit, **product_data)
+        for line in lines:
+            line.id_credit = credit
             
-        credit.total_amount = credit.calculate_total_amount()
-        
-        credit.save()
+        ClientCreditProduct.objects.bulk_create(lines)
             
         return credit
     
@@ -131,6 +203,78 @@ class CreditSerializer(serializers.ModelSerializer):
         instance.update(validated_data)
                 
         return instance
-        
 
-    
\ No newline at end of file
+class ArchivedCreditSerializer(CreditSerializer):
+    """
+    Read only representation of an archived credit, same shape as a live one.
+    """
+    
+    class Meta(CreditSerializer.Meta):
+        model = ArchivedCredit
+        fields = CreditSerializer.Meta.fields + ['archived_at']
+        
+class CreditScenarioSerializer(serializers.Serializer):
+    amount = serializers.DecimalField(max_digits=11, decimal_places=2, min_value=Decimal("0.01"))
+    no_installment = serializers.IntegerField(min_value=1, max_value=32767)
+    interest_rate = serializers.IntegerField()
+    
+class CreditSimulationSerializer(serializers.Serializer):
+    scenarios = CreditScenarioSerializer(many=True, allow_empty=False, max_length=MAX_SIMULATION_SCENARIOS)
+    
+    #Resolves every interest rate of the request in a single query
+    def validate_scenarios(self, value):
+        interest_rates = InterestRate.objects.in_bulk({scenario['interest_rate'] for scenario in value})
+        
+        missing = sorted({scenario['interest_rate'] for scenario in value} - interest_rates.keys())
+        
+        if missing:
+            raise ValidationError(f"The following interest rates do not exist: {', '.join(map(str, missing))}")
+        
+        for scenario in value:
+            scenario['percentage'] = interest_rates[scenario['interest_rate']].percentage
+            
+        return value
+    
+class CreditScheduleSummarySerializer(serializers.Serializer):
+    amount = serializers.DecimalField(max_digits=11, decimal_places=2)
+    no_installment = serializers.IntegerField()
+    percentage = serializers.DecimalField(max_digits=4, decimal_places=2)
+    installment_amount = serializers.DecimalField(max_digits=11, decimal_places=2)
+    last_installment_amount = serializers.DecimalField(max_digits=11, decimal_places=2)
+    total_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_interest = serializers.DecimalField(max_digits=14, decimal_places=2)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    
+class CashflowQuerySerializer(serializers.Serializer):
+    period = serializers.ChoiceField(choices=list(PERIODS), default='month')
+    group_by = serializers.ChoiceField(choices=list(GROUPS), required=False)
+    haircut = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=Decimal("0"), max_value=Decimal("100"), default=settings.CASHFLOW_DELINQUENCY_HAIRCUT)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    
+class CashflowSerializer(serializers.Serializer):
+    period_start = serializers.DateField()
+    group = serializers.CharField(required=False)
+    amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    expected_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    
+class CollectionPrioritySerializer(serializers.ModelSerializer):
+    client_info = ClientInfoSerializer(source='client', read_only=True)
+    days_overdue = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = CollectionPriority
+        fields = [
+            'client_info',
+            'score',
+            'days_overdue',
+            'oldest_due_date',
+            'overdue_installments',
+            'overdue_amount',
+            'penalty_rate',
+            'refreshed_at'
+            ]
+        
+    def get_days_overdue(self, obj):
+        return (timezone.localdate() - obj.oldest_due_date).days
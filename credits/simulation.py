@@ -0,0 +1,54 @@
+from decimal import ROUND_HALF_UP
+
+from dateutil.relativedelta import relativedelta
+from django.utils import timezone
+
+from .schedules import CENTS, installment_amounts, installment_dates
+
+#Maximum number of scenarios accepted in a single simulation request
+MAX_SIMULATION_SCENARIOS = 5000
+
+def quantize(value):
+    return value.quantize(CENTS, rounding=ROUND_HALF_UP)
+
+def simulate_schedules(scenarios, start_date=None):
+    """
+    Computes the schedule summary of each scenario without touching the database.
+
+    Each scenario is a dict with `amount`, `no_installment` and `percentage`.
+    Installments come from the same schedule logic approval uses, so the
+    summary matches the payments of the credit once approved. Scenarios are
+    processed in batches sharing the same tenor, so the schedule dates are
+    computed once per batch. Results are returned in the input order.
+    """
+    if start_date is None:
+        start_date = timezone.now().date() + relativedelta(months=1)
+
+    batches = {}
+
+    for index, scenario in enumerate(scenarios):
+        batches.setdefault(scenario['no_installment'], []).append(index)
+
+    results = [None] * len(scenarios)
+
+    for no_installment, indexes in batches.items():
+        end_date = installment_dates(start_date, no_installment)[-1][0]
+
+        for index in indexes:
+            amount = scenarios[index]['amount']
+            amounts = installment_amounts(amount, no_installment)
+            total_amount = sum(amounts)
+
+            results[index] = {
+                'amount': amount,
+                'no_installment': no_installment,
+                'percentage': scenarios[index]['percentage'],
+                'installment_amount': amounts[0],
+                'last_installment_amount': amounts[-1],
+                'total_amount': total_amount,
+                'total_interest': total_amount - amount,
+                'start_date': start_date,
+                'end_date': end_date,
+            }
+
+    return results
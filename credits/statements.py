@@ -0,0 +1,293 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from clients.models import Client
+
+from .models import Credit, Payment, PaymentReceipt
+
+MANIFEST = "manifest.jsonl"
+
+CSV_HEADER = ['client', 'credit', 'description', 'installment', 'payment_date', 'due_date', 'amount', 'status']
+
+def parse_period(value):
+    """
+    First day of the month of a YYYY-MM period.
+    """
+    year, month = value.split("-")
+
+    return date(int(year), int(month), 1)
+
+def statement_filename(client_id, file_format):
+    name = re.sub(r'[^\w-]', '_', client_id)
+
+    #Ids changed by the sanitisation get a digest of the id, so two of them never share a file
+    if name != client_id:
+        name = f"{name}~{hashlib.sha1(client_id.encode()).hexdigest()[:10]}"
+
+    return f"{name}.{file_format}"
+
+def statement_credits(period):
+    """
+    Credits open during the month of `period`: approved by its end, their
+    first installment falls a month after the approval, and not paid off
+    before it started, whatever their status is now.
+    """
+    period_end = period + relativedelta(months=1)
+    received = PaymentReceipt.objects.filter(credit=OuterRef('pk'), received_on__gte=period)
+
+    return Credit.objects.filter(
+        Q(status="approved") | Q(status="paid", pk__in=received.values('credit')),
+        start_date__lt=period_end + relativedelta(months=1)
+    )
+
+def client_chunks(chunk_size, period):
+    """
+    Yields the clients with a credit open during the period, chunk_size at a
+    time, in primary key order. Each chunk is a keyset query after the last
+    id seen.
+    """
+    clients = Client.all_objects.filter(Exists(statement_credits(period).filter(client=OuterRef('pk')))).order_by('id')
+    last_id = None
+
+    while True:
+        chunk = clients if last_id is None else clients.filter(id__gt=last_id)
+        chunk = list(chunk.values('id', 'first_name', 'last_name', 'email', 'address')[:chunk_size])
+
+        if not chunk:
+            return
+
+        yield chunk
+        last_id = chunk[-1]['id']
+
+def load_statements(clients, period):
+    """
+    Builds the statements of a chunk of clients as of the end of the period,
+    with one query for their credits, one for the installments and one for
+    the receipts of those credits up to the period end. Statements are plain
+    dicts so they can be sent to the rendering processes.
+    """
+    period_end = period + relativedelta(months=1)
+    #A statement of the running month shows the installments as they are today
+    as_of = min(period_end, timezone.localdate())
+    statements = {}
+    credits = {}
+
+    for client in clients:
+        statements[client['id']] = {
+            'period': f"{period:%Y-%m}",
+            'client': {
+                'id': client['id'],
+                'name': f"{client['first_name']} {client['last_name']}",
+                'email': client['email'],
+                'address': client['address'],
+            },
+            'credits': [],
+            'outstanding': Decimal(0),
+        }
+
+    rows = (
+        statement_credits(period).filter(client_id__in=statements)
+        .order_by('client_id', 'id')
+        .values('id', 'client_id', 'description', 'total_amount', 'interest_rate__percentage')
+    )
+
+    for row in rows:
+        credit = {
+            'id': row['id'],
+            'description': row['description'],
+            'total_amount': row['total_amount'],
+            'interest_rate': row['interest_rate__percentage'],
+            'installments': [],
+            'received': [],
+            'paid': Decimal(0),
+            'outstanding': Decimal(0),
+        }
+
+        credits[row['id']] = credit
+        statements[row['client_id']]['credits'].append(credit)
+
+    receipts = (
+        PaymentReceipt.objects.filter(credit_id__in=credits, received_on__lt=period_end)
+        .order_by('credit_id', 'received_on', 'id')
+        .values('credit_id', 'payment_id', 'principal', 'penalty', 'received_on')
+    )
+
+    #Principal received for each installment by the period end
+    paid = {}
+
+    for receipt in receipts:
+        credit = credits[receipt['credit_id']]
+        credit['paid'] += receipt['principal']
+        paid[receipt['payment_id']] = paid.get(receipt['payment_id'], Decimal(0)) + receipt['principal']
+
+        if receipt['received_on'] >= period:
+            credit['received'].append({
+                'payment': receipt['payment_id'],
+                'received_on': receipt['received_on'],
+                'amount': receipt['principal'] + receipt['penalty'],
+            })
+
+    payments = (
+        Payment.objects.filter(credit_id__in=credits)
+        .order_by('credit_id', 'payment_date', 'id')
+        .values('id', 'credit_id', 'payment_date', 'due_date', 'payment_amount')
+    )
+
+    for payment in payments:
+        credit = credits[payment['credit_id']]
+        credit['outstanding'] += payment['payment_amount'] - paid.get(payment['id'], Decimal(0))
+
+        if period <= payment['payment_date'] < period_end:
+            #Status of the installment on the last day of the period
+            if payment['id'] in paid and paid[payment['id']] >= payment['payment_amount']:
+                status = "completed"
+            elif payment['due_date'] < as_of:
+                status = "overdue"
+            else:
+                status = "pending"
+
+            credit['installments'].append({
+                'id': payment['id'],
+                'payment_date': payment['payment_date'],
+                'due_date': payment['due_date'],
+                'amount': payment['payment_amount'],
+                'status': status,
+            })
+
+    for statement in statements.values():
+        statement['outstanding'] = sum((credit['outstanding'] for credit in statement['credits']), Decimal(0))
+
+    return list(statements.values())
+
+def render_csv(statement):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_HEADER)
+
+    for credit in statement['credits']:
+        for installment in credit['installments']:
+            writer.writerow([
+                statement['client']['id'], credit['id'], credit['description'], installment['id'],
+                installment['payment_date'], installment['due_date'], installment['amount'], installment['status']
+            ])
+
+        for receipt in credit['received']:
+            writer.writerow([
+                statement['client']['id'], credit['id'], credit['description'], receipt['payment'],
+                receipt['received_on'], '', receipt['amount'], 'received'
+            ])
+
+        writer.writerow([statement['client']['id'], credit['id'], credit['description'], '', '', '', credit['outstanding'], 'outstanding'])
+
+    return output.getvalue()
+
+def render_html(statement):
+    from django.template.loader import render_to_string
+
+    return render_to_string('credits/statement.html', statement)
+
+RENDERERS = {
+    'csv': render_csv,
+    'html': render_html,
+}
+
+def init_worker():
+    #Spawned processes start without Django configured
+    import django
+    django.setup()
+
+def write_statement(directory, file_format, statement):
+    """
+    Renders a statement and writes it atomically, so an interrupted run never
+    leaves a partial file behind. Runs in the process pool.
+    """
+    content = RENDERERS[file_format](statement).encode()
+    filename = statement_filename(statement['client']['id'], file_format)
+    path = os.path.join(directory, filename)
+
+    with open(path + ".tmp", "wb") as file:
+        file.write(content)
+
+    os.replace(path + ".tmp", path)
+
+    return {
+        'client': statement['client']['id'],
+        'file': filename,
+        'credits': len(statement['credits']),
+        'outstanding': str(statement['outstanding']),
+        'sha256': hashlib.sha256(content).hexdigest(),
+    }
+
+def read_manifest(directory):
+    """
+    Clients whose statement is listed in the manifest and still on disk.
+    """
+    path = os.path.join(directory, MANIFEST)
+    done = set()
+
+    if not os.path.exists(path):
+        return done
+
+    with open(path) as manifest:
+        for line in manifest:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                #Last line of a run killed while writing it
+                continue
+
+            if os.path.exists(os.path.join(directory, entry['file'])):
+                done.add(entry['client'])
+
+    return done
+
+def generate_statements(period, output, file_format='html', chunk_size=500, workers=None, on_progress=None):
+    """
+    Writes the statements of `period` into output/YYYY-MM and lists each one
+    in the manifest of that directory as soon as it is written. Clients
+    already in the manifest are skipped before their data is loaded, so an
+    interrupted run can be started again and continues where it stopped.
+
+    The database is only queried by this process, the pool processes only
+    render and write files. Returns the number of generated and skipped
+    statements.
+    """
+    directory = os.path.join(output, f"{period:%Y-%m}")
+    os.makedirs(directory, exist_ok=True)
+
+    done = read_manifest(directory)
+    generated = skipped = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool, \
+            open(os.path.join(directory, MANIFEST), "a") as manifest:
+        for chunk in client_chunks(chunk_size, period):
+            pending = [client for client in chunk if client['id'] not in done]
+            skipped += len(chunk) - len(pending)
+
+            if not pending:
+                continue
+
+            statements = load_statements(pending, period)
+            results = pool.map(write_statement, [directory] * len(statements), [file_format] * len(statements), statements, chunksize=32)
+
+            for entry in results:
+                manifest.write(json.dumps(entry) + "\n")
+                generated += 1
+
+            manifest.flush()
+
+            if on_progress:
+                on_progress(generated, skipped)
+
+    return generated, skipped
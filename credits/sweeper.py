@@ -0,0 +1,53 @@
+from django.utils import timezone
+
+from .models import Credit, Payment, StatusSweep, CollectionPriority
+
+def sweep_statuses(today=None, batch_size=1000):
+    """
+    Materializes the statuses that depend on time or on other rows.
+
+    Pending payments due before today become overdue and approved credits with
+    every payment completed become paid. Both run as chunked set-based updates,
+    each chunk found through the (due_date, status) and status indexes, and the
+    run is recorded as a StatusSweep. The collection priorities are rebuilt
+    at the end.
+    """
+    today = today or timezone.now().date()
+    sweep = StatusSweep.objects.create(sweep_date=today)
+    
+    while True:
+        ids = list(
+            Payment.objects.filter(due_date__lt=today, status="pending")
+            .order_by('due_date', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        
+        if not ids:
+            break
+        
+        sweep.overdue_payments += Payment.objects.filter(id__in=ids, status="pending").update(status="overdue")
+        sweep.batches += 1
+        
+    last_id = 0
+    
+    while True:
+        ids = list(
+            Credit.objects.filter(status="approved", id__gt=last_id)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        
+        if not ids:
+            break
+        
+        sweep.paid_credits += Credit.objects.filter(id__in=ids).mark_paid()
+        sweep.batches += 1
+        last_id = ids[-1]
+        
+    #Days overdue grow every day, so every priority is recomputed
+    CollectionPriority.objects.refresh(today=today)
+    
+    sweep.finished_at = timezone.now()
+    sweep.save()
+    
+    return sweep
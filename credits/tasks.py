@@ -0,0 +1,25 @@
+from tasks.registry import task
+
+from .models import Credit
+from .sweeper import sweep_statuses
+from .partitions import create_payment_partitions
+
+@task(name='credits.approve_credit')
+def approve_credit(credit_id):
+    credit = Credit.objects.get(id=credit_id)
+    credit.update({'status': 'approved'})
+    
+    return {'credit': credit.id, 'status': credit.status, 'end_date': str(credit.end_date)}
+
+@task(name='credits.sweep_statuses')
+def sweep_statuses_task():
+    sweep = sweep_statuses()
+    
+    #The nightly run also keeps the Payment partitions ahead of the calendar
+    partitions = create_payment_partitions()
+    
+    return {'sweep': sweep.id, 'overdue_payments': sweep.overdue_payments, 'paid_credits': sweep.paid_credits, 'partitions': partitions}
+
+@task(name='credits.create_payment_partitions')
+def create_payment_partitions_task(months=None):
+    return {'partitions': create_payment_partitions(months)}
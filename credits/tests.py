@@ -1,14 +1,41 @@
 from django.urls import reverse
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 from rest_framework import status
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import Group
-from .models import Credit, Client, ClientCreditProduct, Payment, InterestRate
+from .models import first_payment_date, Credit, Client, ClientCreditProduct, Payment, InterestRate, IdempotencyKey, StatusSweep, ArchivedCredit, ArchivedPayment, CollectionPriority, ClientExposure
+from .sweeper import sweep_statuses
+from .simulation import simulate_schedules
+from .partitions import partition_name, create_partition, create_payment_partitions, partition_payments
+from .statements import client_chunks, load_statements, statement_filename
 from products.models import Product, ProductType 
 from clients.models import Client 
 from users.models import User
 from decimal import Decimal
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, connections
+from django.db.models import Sum
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management import call_command
+from django.utils import timezone
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+from utils.throttling import ScopedSlidingWindowThrottle, UserSlidingWindowThrottle
+from django.http import QueryDict
+from .filters import CreditFilter, PaymentFilter
+from .serializers import CreditSerializer, ClientCreditProductSerializer
+import csv
+import datetime
+from importlib import import_module
+from django.apps import apps
+import json
+import os
+import tempfile
 
 class CreditTestCase(APITestCase):
     @classmethod
@@ -137,6 +164,24 @@ class CreditTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data.get("results")), 1)
         
+    def test_search_credit(self):
+        url = reverse("credit-list")
+        
+        response = self.client.get(url, {"search": "crédito"}, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data.get("results")), 1)
+        
+    def test_filter_credit_list(self):
+        url = reverse("credit-list")
+        
+        response = self.client.get(url, {"status": ["pending", "approved"], "client": self.client_user.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data.get("results")), 1)
+        
+        response = self.client.get(url, {"status": "paid"}, format="json")
+        self.assertEqual(len(response.data.get("results")), 0)
+        
     def test_get_credit_detail(self):
         url = reverse("credit-detail", kwargs={"pk": self.credit.id})
         
@@ -196,6 +241,46 @@ class CreditTestCase(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
     
+    def test_create_credit_idempotency_key(self):
+        url = reverse("credit-list")
+        
+        credit_data = {
+            "description": "Crédito Prueba",
+            "no_installment": 12,
+            "penalty_rate": Decimal("2.5"),
+            "interest_rate": self.interest_rate.id,
+            "client": self.client_user.id,
+            "products": [
+                {"id_product": self.product1.id, "quantity": 2}
+            ]
+        }
+        
+        response = self.client.post(url, credit_data, format="json", HTTP_IDEMPOTENCY_KEY="credit-1")
+        
+        #Authenticated user and stored response
+        with self.assertNumQueries(2):
+            replay = self.client.post(url, credit_data, format="json", HTTP_IDEMPOTENCY_KEY="credit-1")
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.data["id"], response.data["id"])
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(Credit.objects.count(), 2)
+        
+        credit_data["no_installment"] = 6
+        
+        response = self.client.post(url, credit_data, format="json", HTTP_IDEMPOTENCY_KEY="credit-1")
+        
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        
+    def test_purge_idempotency_keys(self):
+        IdempotencyKey.objects.create(key="old", user=self.user, fingerprint="", status_code=201, response={}, expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        IdempotencyKey.objects.create(key="new", user=self.user, fingerprint="", status_code=201, response={}, expires_at=timezone.now() + datetime.timedelta(hours=1))
+        
+        call_command("purge_idempotency_keys", stdout=StringIO())
+        
+        self.assertEqual(list(IdempotencyKey.objects.values_list("key", flat=True)), ["new"])
+        
     def test_create_credit_no_products(self):
         url = reverse("credit-list")
         
@@ -256,6 +341,99 @@ class CreditTestCase(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
     
+    def test_create_credit_validates_products_in_one_query(self):
+        credit_data = {
+            "description": "Crédito Prueba",
+            "no_installment": 12,
+            "penalty_rate": Decimal("2.5"),
+            "interest_rate": self.interest_rate.id,
+            "client": self.client_user.id,
+            "products": [
+                {"id_product": self.product1.id, "quantity": 2},
+                {"id_product": self.product2.id, "quantity": 1}
+            ]
+        }
+        
+        serializer = CreditSerializer(data=credit_data)
+        
+        #Interest rate, client, all products and the client exposure
+        with self.assertNumQueries(4):
+            self.assertTrue(serializer.is_valid())
+            
+    def test_credit_lines_keep_their_price(self):
+        credit_data = {
+            "description": "Crédito Prueba",
+            "no_installment": 12,
+            "penalty_rate": Decimal("2.5"),
+            "interest_rate": self.interest_rate.id,
+            "client": self.client_user.id,
+            "products": [
+                {"id_product": self.product1.id, "quantity": 2}
+            ]
+        }
+        
+        response = self.client.post(reverse("credit-list"), credit_data, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["total_amount"], "200.00")
+        self.assertEqual((response.data["products"][0]["unit_price"], response.data["products"][0]["line_total"]), ("100.00", "200.00"))
+        
+        credit = Credit.objects.get(id=response.data["id"])
+        Product.objects.filter(id=self.product1.id).update(price=Decimal("150.00"))
+        
+        #A single aggregate over the lines, Product is not joined
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(credit.calculate_total_amount(), Decimal("200.00"))
+            
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("products_product", queries[0]["sql"])
+        
+        #Existing lines are priced by the migration with the current price
+        ClientCreditProduct.objects.filter(id_credit=credit).update(unit_price=0, line_total=0)
+        import_module("credits.migrations.0012_line_item_prices").backfill_prices(apps, mock.Mock(connection=connection))
+        
+        line = ClientCreditProduct.objects.get(id_credit=credit)
+        
+        self.assertEqual((line.unit_price, line.line_total), (Decimal("150.00"), Decimal("300.00")))
+        
+    def test_credit_line_repriced_when_product_changes(self):
+        line = ClientCreditProduct.objects.get(id_credit=self.credit, id_product=self.product2)
+        product = Product.objects.create(name="Product 3", description="Premium", price=Decimal("999.00"), product_type=self.product_type)
+        
+        serializer = ClientCreditProductSerializer(line, data={"id_product": product.id, "quantity": 2}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        
+        line = ClientCreditProduct.objects.get(id=line.id)
+        
+        self.assertEqual((line.unit_price, line.line_total), (Decimal("999.00"), Decimal("1998.00")))
+        
+        #Saving the line again for the same product keeps its price
+        Product.objects.filter(id=product.id).update(price=Decimal("1.00"))
+        line.quantity = 1
+        line.save()
+        
+        self.assertEqual((line.unit_price, line.line_total), (Decimal("999.00"), Decimal("999.00")))
+        
+    def test_create_credit_repeated_product(self):
+        url = reverse("credit-list")
+        
+        credit_data = {
+            "description": "Crédito Prueba",
+            "no_installment": 12,
+            "penalty_rate": Decimal("2.5"),
+            "interest_rate": self.interest_rate.id,
+            "client": self.client_user.id,
+            "products": [
+                {"id_product": self.product1.id, "quantity": 2},
+                {"id_product": self.product1.id, "quantity": 1}
+            ]
+        }
+        
+        response = self.client.post(url, credit_data, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
     def test_update_put_credit(self):
         url = reverse("credit-detail", kwargs={"pk": self.credit.id})
         
@@ -314,6 +492,23 @@ class CreditTestCase(APITestCase):
         with self.assertRaises(ValidationError):
             response = self.client.patch(url, data)
             
+    def test_update_credit_stale_instance(self):
+        first = Credit.objects.get(id=self.credit.id)
+        second = Credit.objects.get(id=self.credit.id)
+        
+        first.update({"status": "approved"})
+        
+        with self.assertRaises(ValidationError):
+            second.update({"status": "approved"})
+            
+        with self.assertRaises(ValidationError):
+            second.update({"status": "rejected"})
+            
+        self.credit.refresh_from_db()
+        
+        self.assertEqual(self.credit.status, "approved")
+        self.assertEqual(self.credit.payment_set.count(), 12)
+        
     #Test for Payment
     def test_get_payment_list(self):
         url = reverse("credit-detail", kwargs={"pk": self.credit.id})
@@ -403,6 +598,681 @@ class CreditTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data.get("status"), "completed")
         
+    #Test for Simulation
+    def test_simulate_credit(self):
+        url = reverse("credit-simulate")
+        
+        data = {
+            "scenarios": [
+                {"amount": "1000.00", "no_installment": 12, "interest_rate": self.interest_rate.id},
+                {"amount": "2000.00", "no_installment": 12, "interest_rate": self.interest_rate.id},
+                {"amount": "1000.00", "no_installment": 6, "interest_rate": self.interest_rate.id}
+            ]
+        }
+        
+        response = self.client.post(url, data, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(response.data[0]["installment_amount"], "83.33")
+        self.assertEqual(response.data[0]["total_interest"], "0.00")
+        self.assertEqual(response.data[2]["no_installment"], 6)
+        self.assertEqual(Credit.objects.count(), 1)
+        
+    def test_simulated_schedule_matches_approval(self):
+        credit = Credit.objects.create(
+            description="Simulated",
+            total_amount=Decimal("1000.00"),
+            no_installment=3,
+            penalty_rate=Decimal("2.5"),
+            interest_rate=self.interest_rate,
+            client=self.client_user
+        )
+        
+        simulation, = simulate_schedules(
+            [{"amount": credit.total_amount, "no_installment": credit.no_installment, "percentage": self.interest_rate.percentage}],
+            start_date=first_payment_date()
+        )
+        
+        credit.approve()
+        credit.refresh_from_db()
+        
+        payments = credit.payment_set.order_by('payment_date')
+        
+        self.assertEqual([payment.payment_amount for payment in payments], [Decimal("333.33"), Decimal("333.33"), Decimal("333.34")])
+        self.assertEqual(payments[0].payment_amount, simulation["installment_amount"])
+        self.assertEqual(payments[2].payment_amount, simulation["last_installment_amount"])
+        self.assertEqual(simulation["total_amount"], credit.total_amount)
+        self.assertEqual(ClientExposure.objects.get(client=self.client_user).outstanding, Decimal("1000.00"))
+        
+        #The incremental exposure matches the one rebuilt from the stored payments
+        ClientExposure.objects.rebuild()
+        self.assertEqual(ClientExposure.objects.get(client=self.client_user).outstanding, Decimal("1000.00"))
+        self.assertEqual(payments.first().payment_date, simulation["start_date"])
+        self.assertEqual(credit.end_date, simulation["end_date"])
+        
+    def test_simulate_credit_no_valid_interest_rate(self):
+        url = reverse("credit-simulate")
+        
+        data = {
+            "scenarios": [
+                {"amount": "1000.00", "no_installment": 12, "interest_rate": 999}
+            ]
+        }
+        
+        response = self.client.post(url, data, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+    #Test for Admin
+    def test_admin_payment_changelist(self):
+        Payment.objects.create(
+            payment_amount = 1000,
+            payment_date = "2024-11-11",
+            due_date = "2024-11-18",
+            status = "pending",
+            credit = self.credit
+        )
+        
+        self.client.force_login(self.user)
+        
+        response = self.client.get(reverse("admin:credits_payment_changelist"), {"status__exact": "pending"})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, "Crédito Prueba - 123456789012 - John Doe")
+        
+    def test_admin_credit_changelist(self):
+        self.client.force_login(self.user)
+        
+        response = self.client.get(reverse("admin:credits_credit_changelist"))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+    def test_admin_approve_credits_action(self):
+        self.client.force_login(self.user)
+        
+        data = {
+            "action": "approve_credits",
+            "_selected_action": [self.credit.id]
+        }
+        
+        response = self.client.post(reverse("admin:credits_credit_changelist"), data)
+        
+        self.credit.refresh_from_db()
+        
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(self.credit.status, "approved")
+        self.assertEqual(self.credit.payment_set.count(), 12)
+        
+    #Test for bulk operations
+    def test_approve_credits_bulk(self):
+        approved = Credit.objects.filter(id=self.credit.id).approve()
+        
+        self.credit.refresh_from_db()
+        
+        self.assertEqual(approved, 1)
+        self.assertEqual(self.credit.status, "approved")
+        self.assertEqual(self.credit.payment_set.count(), 12)
+        self.assertEqual(Credit.objects.filter(id=self.credit.id).approve(), 0)
+        
+    def test_reject_credits_bulk(self):
+        rejected = Credit.objects.filter(id=self.credit.id).reject()
+        
+        self.credit.refresh_from_db()
+        
+        self.assertEqual(rejected, 1)
+        self.assertEqual(self.credit.status, "rejected")
+        
+    def test_settle_payments_bulk(self):
+        Credit.objects.filter(id=self.credit.id).approve()
+        
+        settled = Payment.objects.filter(credit=self.credit).settle()
+        
+        self.credit.refresh_from_db()
+        
+        self.assertEqual(settled, 12)
+        self.assertEqual(self.credit.status, "paid")
+        
+    #Test for Throttling
+    def test_simulation_throttle_scope(self):
+        cache.clear()
+        
+        url = reverse("credit-simulate")
+        rates = {**ScopedSlidingWindowThrottle.THROTTLE_RATES, "credit_simulation": "2/min"}
+        
+        data = {
+            "scenarios": [
+                {"amount": "1000.00", "no_installment": 12, "interest_rate": self.interest_rate.id}
+            ]
+        }
+        
+        with mock.patch.object(ScopedSlidingWindowThrottle, "THROTTLE_RATES", rates):
+            responses = [self.client.post(url, data, format="json") for _ in range(3)]
+            list_response = self.client.get(reverse("credit-list"))
+            
+        self.assertEqual([response.status_code for response in responses], [200, 200, 429])
+        self.assertEqual(list_response.status_code, status.HTTP_200_OK)
+        
+    #Test for Status sweeper
+    def test_sweep_statuses(self):
+        Credit.objects.filter(id=self.credit.id).approve()
+        
+        payments = list(self.credit.payment_set.order_by('id'))
+        Payment.objects.filter(id=payments[0].id).update(due_date=datetime.date(2024, 1, 1))
+        Payment.objects.filter(id__in=[payment.id for payment in payments[1:]]).update(status="completed")
+        
+        sweep = sweep_statuses(batch_size=5)
+        
+        self.credit.refresh_from_db()
+        
+        self.assertEqual(sweep.overdue_payments, 1)
+        self.assertEqual(sweep.paid_credits, 0)
+        self.assertEqual(self.credit.payment_set.filter(status="overdue").count(), 1)
+        
+        Payment.objects.filter(id=payments[0].id).settle()
+        
+        self.credit.refresh_from_db()
+        
+        self.assertEqual(self.credit.status, "paid")
+        
+    def test_sweep_statuses_command(self):
+        credit = Credit.objects.create(description="Paid", no_installment=1, penalty_rate=1, interest_rate=self.interest_rate, client=self.client_user, status="approved")
+        Payment.objects.create(credit=credit, payment_amount=100, payment_date="2024-01-01", due_date="2024-01-08", status="completed")
+        
+        out = StringIO()
+        call_command("sweep_statuses", stdout=out)
+        
+        credit.refresh_from_db()
+        
+        self.assertEqual(credit.status, "paid")
+        self.assertIn("1 credits marked as paid", out.getvalue())
+        self.assertEqual(StatusSweep.objects.get().paid_credits, 1)
+        
+    #Test for Archival
+    def test_archive_credits_command(self):
+        Credit.objects.filter(id=self.credit.id).approve()
+        Payment.objects.filter(credit=self.credit).update(status="completed")
+        Credit.objects.filter(id=self.credit.id).update(status="paid", end_date=datetime.date(2020, 1, 1))
+        
+        recent = Credit.objects.create(description="Recent", no_installment=1, penalty_rate=1, interest_rate=self.interest_rate, client=self.client_user, status="rejected")
+        
+        out = StringIO()
+        call_command("archive_credits", "--batch-size", "1", stdout=out)
+        
+        self.assertIn("1 credits closed before", out.getvalue())
+        self.assertFalse(Credit.objects.filter(id=self.credit.id).exists())
+        self.assertFalse(Payment.objects.filter(credit_id=self.credit.id).exists())
+        self.assertFalse(ClientCreditProduct.objects.filter(id_credit_id=self.credit.id).exists())
+        self.assertTrue(Credit.objects.filter(id=recent.id).exists())
+        self.assertEqual(ArchivedPayment.objects.filter(credit_id=self.credit.id).count(), 12)
+        
+        archived = ArchivedCredit.objects.get()
+        
+        self.assertEqual(archived.id, self.credit.id)
+        self.assertEqual(archived.clientcreditproduct_set.count(), 2)
+        
+    def test_get_archived_credit(self):
+        Credit.objects.filter(id=self.credit.id).update(status="rejected", application_date=datetime.date(2020, 1, 1))
+        call_command("archive_credits", stdout=StringIO())
+        
+        response = self.client.get(self.url_template_credits.format(self.credit.id))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["id"], self.credit.id)
+        self.assertEqual(response.data[0]["status"], "rejected")
+        self.assertEqual(len(response.data[0]["products"]), 2)
+        self.assertIn("archived_at", response.data[0])
+        
+        response = self.client.get(self.url_template_clients.format(self.client_user.id))
+        
+        self.assertEqual(response.data, [])
+        
+        response = self.client.get(self.url_template_clients.format(self.client_user.id), {"include_archived": "true"})
+        
+        self.assertEqual([credit["id"] for credit in response.data], [self.credit.id])
+        
+    #Test for Payment partitions
+    def test_create_payment_partitions_command(self):
+        out = StringIO()
+        call_command("create_payment_partitions", "--months", "2", stdout=out)
+        
+        #PAYMENT_PARTITIONING is off in tests, so Payment stays unpartitioned
+        self.assertIn("0 payment partitions created", out.getvalue())
+        self.assertEqual(partition_name(datetime.date(2025, 3, 1)), "credits_payment_y2025m03")
+
+    def test_create_partition(self):
+        cursor = mock.Mock()
+        cursor.fetchone.return_value = (None,)
+
+        self.assertTrue(create_partition(cursor, datetime.date(2025, 12, 1)))
+
+        statements = [call.args for call in cursor.execute.call_args_list]
+        bounds = [datetime.date(2025, 12, 1), datetime.date(2026, 1, 1)]
+
+        self.assertEqual(statements[0], ("SELECT to_regclass(%s)", ["credits_payment_y2025m12"]))
+        self.assertEqual(statements[1], ('CREATE TABLE "credits_payment_y2025m12" (LIKE "credits_payment" INCLUDING DEFAULTS)',))
+        #Rows of the month already in the default partition move before the attach
+        self.assertIn('DELETE FROM "credits_payment_default"', statements[2][0])
+        self.assertEqual(statements[2][1], bounds)
+        self.assertEqual(
+            statements[3],
+            ('ALTER TABLE "credits_payment" ATTACH PARTITION "credits_payment_y2025m12" FOR VALUES FROM (%s) TO (%s)', bounds)
+        )
+
+        cursor.reset_mock()
+        cursor.fetchone.return_value = ("credits_payment_y2025m12",)
+
+        self.assertFalse(create_partition(cursor, datetime.date(2025, 12, 1)))
+        self.assertEqual(cursor.execute.call_count, 1)
+
+    def test_create_payment_partitions_ahead(self):
+        cursor = mock.MagicMock()
+        postgresql = mock.MagicMock(vendor='postgresql')
+        postgresql.cursor.return_value.__enter__.return_value = cursor
+
+        #Partitioned, then the current month exists and the next two do not
+        cursor.fetchone.side_effect = [(1,), ("credits_payment_y2026m10",), (None,), (None,)]
+
+        with mock.patch("credits.partitions.connections", {"default": postgresql}), \
+                mock.patch("credits.partitions.timezone.now", return_value=timezone.make_aware(datetime.datetime(2026, 10, 19))):
+            self.assertEqual(create_payment_partitions(months=2), 2)
+
+        created = [call.args[0] for call in cursor.execute.call_args_list if call.args[0].startswith("ALTER TABLE")]
+        self.assertEqual(len(created), 2)
+        self.assertIn('"credits_payment_y2026m11"', created[0])
+        self.assertIn('"credits_payment_y2026m12"', created[1])
+
+        cursor.reset_mock()
+        cursor.fetchone.side_effect = [None]
+
+        with mock.patch("credits.partitions.connections", {"default": postgresql}):
+            self.assertEqual(create_payment_partitions(months=2), 0)
+
+    def test_partition_payments_ddl(self):
+        cursor = mock.MagicMock()
+        cursor.fetchone.side_effect = [(datetime.date(2026, 9, 14),)] + [(None,)] * 3
+        schema_editor = mock.MagicMock()
+        schema_editor.connection.cursor.return_value.__enter__.return_value = cursor
+
+        with override_settings(PAYMENT_PARTITION_MONTHS_AHEAD=1), \
+                mock.patch("credits.partitions.timezone.now", return_value=timezone.make_aware(datetime.datetime(2026, 10, 19))):
+            partition_payments(schema_editor)
+
+        statements = [call.args[0] for call in schema_editor.execute.call_args_list]
+
+        self.assertEqual(statements[0], 'ALTER TABLE "credits_payment" RENAME TO "credits_payment_old"')
+        self.assertIn("PRIMARY KEY (id, payment_date)) PARTITION BY RANGE (payment_date)", statements[5])
+        self.assertEqual(statements[6], 'CREATE TABLE "credits_payment_default" PARTITION OF "credits_payment" DEFAULT')
+        self.assertIn('DROP TABLE "credits_payment_old"', statements)
+        self.assertEqual(statements[-4:], [
+            'CREATE INDEX "payment_status_idx" ON "credits_payment" (status)',
+            'CREATE INDEX "payment_date_idx" ON "credits_payment" (payment_date)',
+            'CREATE INDEX "payment_credit_status_idx" ON "credits_payment" (credit_id, status)',
+            'CREATE INDEX "payment_due_date_status_idx" ON "credits_payment" (due_date, status)',
+        ])
+
+        #One partition from the first payment month to PAYMENT_PARTITION_MONTHS_AHEAD after the current one
+        attached = [call.args[0] for call in cursor.execute.call_args_list if call.args[0].startswith("ALTER TABLE")]
+        self.assertEqual([statement.split('"')[3] for statement in attached], [
+            "credits_payment_y2026m09", "credits_payment_y2026m10", "credits_payment_y2026m11",
+        ])
+        
+    #Test for Statements
+    def test_generate_statements_command(self):
+        Credit.objects.filter(id=self.credit.id).approve()
+        self.credit.refresh_from_db()
+        
+        period = f"{self.credit.start_date:%Y-%m}"
+        
+        with tempfile.TemporaryDirectory() as output:
+            out = StringIO()
+            call_command("generate_statements", "--period", period, "--output", output, "--format", "csv", "--workers", "2", stdout=out)
+            
+            self.assertIn(f"1 statements generated for {period}, 0 already generated", out.getvalue())
+            
+            with open(os.path.join(output, period, f"{self.client_user.id}.csv")) as statement:
+                rows = statement.read().splitlines()
+                
+            #Header, the installment of the period and the outstanding balance
+            self.assertEqual(len(rows), 3)
+            self.assertIn("pending", rows[1])
+            self.assertTrue(rows[2].endswith(f"{self.credit.payment_set.aggregate(total=Sum('payment_amount'))['total']},outstanding"))
+            
+            with open(os.path.join(output, period, "manifest.jsonl")) as manifest:
+                self.assertEqual(json.loads(manifest.readline())["client"], self.client_user.id)
+                
+            out = StringIO()
+            call_command("generate_statements", "--period", period, "--output", output, "--format", "csv", stdout=out)
+            
+            self.assertIn("0 statements generated", out.getvalue())
+            self.assertIn("1 already generated were skipped", out.getvalue())
+            
+    def test_statement_as_of_period_end(self):
+        Credit.objects.filter(id=self.credit.id).update(total_amount=self.credit.calculate_total_amount())
+        Credit.objects.filter(id=self.credit.id).approve()
+        self.credit.refresh_from_db()
+
+        period = self.credit.start_date.replace(day=1)
+        next_period = period + datetime.timedelta(days=40)
+        next_period = next_period.replace(day=1)
+
+        #Paid off after the period, the credit still belongs to its statement
+        Payment.objects.filter(credit=self.credit).settle(received_on=next_period)
+        self.credit.refresh_from_db()
+        self.assertEqual(self.credit.status, "paid")
+
+        client = Client.objects.filter(id=self.client_user.id).values('id', 'first_name', 'last_name', 'email', 'address')
+
+        [statement] = load_statements(client, period)
+        [credit] = statement['credits']
+
+        self.assertEqual(credit['outstanding'], Decimal("300.00"))
+        self.assertEqual(credit['received'], [])
+        self.assertEqual([installment['status'] for installment in credit['installments']], ["pending"])
+
+        [statement] = load_statements(client, next_period)
+        [credit] = statement['credits']
+
+        self.assertEqual(credit['outstanding'], Decimal("0.00"))
+        self.assertEqual(len(credit['received']), 12)
+        self.assertEqual(sum(receipt['amount'] for receipt in credit['received']), Decimal("300.00"))
+
+        #Nothing is left to state once the credit was paid off
+        self.assertEqual(list(client_chunks(10, next_period + datetime.timedelta(days=31))), [])
+
+    def test_statement_filename_unique(self):
+        self.assertEqual(statement_filename("123456789012", "pdf"), "123456789012.pdf")
+        self.assertNotEqual(statement_filename("a/b", "pdf"), statement_filename("a_b", "pdf"))
+        self.assertNotEqual(statement_filename("a/b", "pdf"), statement_filename("a.b", "pdf"))
+
+    #Test for Cash-flow report
+    def test_cashflow_report(self):
+        cache.clear()
+        Credit.objects.filter(id=self.credit.id).update(total_amount=self.credit.calculate_total_amount())
+        Credit.objects.filter(id=self.credit.id).approve()
+        Payment.objects.filter(id=Payment.objects.filter(credit=self.credit).order_by('id')[0].id).update(status="completed")
+        #Overdue installments are still expected to be collected
+        Payment.objects.filter(id=Payment.objects.filter(credit=self.credit).order_by('id')[1].id).update(status="overdue")
+        
+        url = reverse("cashflow_report")
+        response = self.client.get(url, {"haircut": "10"})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 11)
+        self.assertEqual(response.data["results"][0]["amount"], "25.00")
+        self.assertEqual(response.data["results"][0]["expected_amount"], "22.50")
+        
+        response = self.client.get(url, {"group_by": "product_type", "period": "week"})
+        
+        self.assertEqual({row["group"] for row in response.data["results"]}, {"Electronics"})
+        self.assertEqual(sum(Decimal(row["amount"]) for row in response.data["results"]), Decimal("275.00"))
+        
+        #Totals are cached for the day
+        Payment.objects.filter(credit=self.credit).update(status="completed")
+        response = self.client.get(url, {"haircut": "10"})
+        
+        self.assertEqual(len(response.data["results"]), 11)
+        
+    def test_cashflow_report_invalid_group(self):
+        response = self.client.get(reverse("cashflow_report"), {"group_by": "client"})
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+    #Test for Collections worklist
+    def test_collection_worklist(self):
+        Credit.objects.filter(id=self.credit.id).approve()
+        
+        payments = list(self.credit.payment_set.order_by('id'))
+        Payment.objects.filter(id__in=[payments[0].id, payments[1].id]).update(due_date=datetime.date(2024, 1, 1))
+        
+        sweep_statuses(today=datetime.date(2024, 1, 11))
+        
+        priority = CollectionPriority.objects.get(client=self.client_user)
+        
+        self.assertEqual(priority.overdue_installments, 2)
+        self.assertEqual(priority.oldest_due_date, datetime.date(2024, 1, 1))
+        
+        url = reverse("collection_worklist")
+        response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["client_info"]["id"], self.client_user.id)
+        self.assertEqual(response.data["results"][0]["overdue_installments"], 2)
+        
+        #Payments changed through the API refresh the priority of their client
+        response = self.client.patch(reverse("payment-detail", kwargs={"pk": payments[0].id}), {"status": "completed"})
+        
+        self.assertEqual(CollectionPriority.objects.get(client=self.client_user).overdue_installments, 1)
+        
+        Payment.objects.filter(id=payments[1].id).settle()
+        
+        self.assertFalse(CollectionPriority.objects.exists())
+        
+    def test_collection_priority_score(self):
+        other = Client.objects.create(id="999", first_name="Jane", last_name="Roe", email="jane@example.com", phone="1", address="Street 2")
+        credit = Credit.objects.create(description="Other", no_installment=1, penalty_rate=1, interest_rate=self.interest_rate, client=other, status="approved")
+        
+        Payment.objects.create(credit=self.credit, payment_amount=100, payment_date="2024-01-01", due_date="2024-01-08", status="overdue")
+        Payment.objects.create(credit=credit, payment_amount=100, payment_date="2024-03-01", due_date="2024-03-08", status="overdue")
+        
+        self.assertEqual(CollectionPriority.objects.refresh(today=datetime.date(2024, 4, 1)), 2)
+        
+        ranking = list(CollectionPriority.objects.order_by('-score', 'client').values_list('client_id', flat=True))
+        
+        self.assertEqual(ranking, [self.client_user.id, other.id])
+        
+    #Test for Client exposure
+    def test_client_exposure_is_maintained(self):
+        Credit.objects.filter(id=self.credit.id).update(total_amount=Decimal("1200.00"))
+        self.credit.refresh_from_db()
+        self.credit.update({"status": "approved"})
+        
+        self.assertEqual(ClientExposure.objects.get(client=self.client_user).outstanding, Decimal("1200.00"))
+        
+        payments = list(self.credit.payment_set.order_by('id'))
+        self.client.patch(reverse("payment-detail", kwargs={"pk": payments[0].id}), {"status": "completed"})
+        
+        self.assertEqual(ClientExposure.objects.get(client=self.client_user).outstanding, Decimal("1100.00"))
+        
+        Payment.objects.filter(id__in=[payment.id for payment in payments[1:6]]).settle()
+        
+        self.assertEqual(ClientExposure.objects.get(client=self.client_user).outstanding, Decimal("600.00"))
+        
+        ClientExposure.objects.filter(client=self.client_user).update(outstanding=0)
+        call_command("rebuild_client_exposure", stdout=StringIO())
+        
+        self.assertEqual(ClientExposure.objects.get(client=self.client_user).outstanding, Decimal("600.00"))
+        
+    def test_create_credit_above_exposure_limit(self):
+        ClientExposure.objects.create(client=self.client_user, outstanding=Decimal("900.00"), limit=Decimal("1000.00"))
+        
+        credit_data = {
+            "description": "Crédito Prueba",
+            "no_installment": 12,
+            "penalty_rate": Decimal("2.5"),
+            "interest_rate": self.interest_rate.id,
+            "client": self.client_user.id,
+            "products": [
+                {"id_product": self.product1.id, "quantity": 1}
+            ]
+        }
+        
+        response = self.client.post(reverse("credit-list"), credit_data, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        credit_data["products"][0]["quantity"] = 2
+        
+        with override_settings(CLIENT_EXPOSURE_LIMIT=Decimal("10000.00")):
+            response = self.client.post(reverse("credit-list"), credit_data, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("above its limit of 1000.00", response.data["client"][0])
+        
+    def test_approve_pending_credits_above_exposure_limit(self):
+        ClientExposure.objects.create(client=self.client_user, limit=Decimal("500.00"))
+        
+        #Both were accepted while nothing was outstanding, together they exceed the limit
+        credits = [
+            Credit.objects.create(
+                description=f"Crédito {index}", total_amount=Decimal("300.00"), no_installment=3,
+                penalty_rate=Decimal("2.5"), interest_rate=self.interest_rate, client=self.client_user
+            )
+            for index in range(2)
+        ]
+        
+        self.assertEqual(Credit.objects.filter(id__in=[credit.id for credit in credits]).approve(), 1)
+        self.assertEqual(ClientExposure.objects.get(client=self.client_user).outstanding, Decimal("300.00"))
+        
+        credits[1].refresh_from_db()
+        self.assertEqual(credits[1].status, "pending")
+        
+        with self.assertRaises(ValidationError):
+            credits[1].approve()
+        
+        credits[1].refresh_from_db()
+        self.assertEqual(credits[1].status, "pending")
+        self.assertFalse(credits[1].payment_set.exists())
+        
+    #Test for Payment allocation
+    def test_allocate_payment(self):
+        Credit.objects.filter(id=self.credit.id).update(total_amount=Decimal("1200.00"))
+        self.credit.refresh_from_db()
+        self.credit.update({"status": "approved"})
+        
+        payments = list(self.credit.payment_set.order_by('due_date', 'id'))
+        Payment.objects.filter(id__in=[payments[0].id, payments[1].id]).update(due_date=datetime.date(2024, 1, 1), status="overdue")
+        
+        url = reverse("credit-allocate", kwargs={"pk": self.credit.id})
+        response = self.client.post(url, {"amount": "255.00"}, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["penalty"], "5.00")
+        self.assertEqual(response.data["principal"], "250.00")
+        self.assertEqual(
+            [(row["payment"], row["balance"], row["status"]) for row in response.data["installments"]],
+            [(payments[0].id, "0.00", "completed"), (payments[1].id, "0.00", "completed"), (payments[2].id, "50.00", "pending")]
+        )
+        
+        payment = Payment.objects.get(id=payments[2].id)
+        
+        self.assertEqual(payment.paid_amount, Decimal("50.00"))
+        self.assertEqual(ClientExposure.objects.get(client=self.client_user).outstanding, Decimal("950.00"))
+        self.assertFalse(CollectionPriority.objects.exists())
+        
+        #Paying off the rest settles the credit
+        response = self.client.post(url, {"amount": "950.00"}, format="json")
+        
+        self.credit.refresh_from_db()
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["installments"]), 10)
+        self.assertEqual(self.credit.status, "paid")
+        
+    def test_allocate_payment_constant_queries(self):
+        Credit.objects.filter(id=self.credit.id).update(total_amount=Decimal("1200.00"))
+        self.credit.refresh_from_db()
+        self.credit.update({"status": "approved"})
+        
+        url = reverse("credit-allocate", kwargs={"pk": self.credit.id})
+        
+        with CaptureQueriesContext(connection) as one_installment:
+            self.client.post(url, {"amount": "100.00"}, format="json")
+            
+        with CaptureQueriesContext(connection) as ten_installments:
+            response = self.client.post(url, {"amount": "1000.00"}, format="json")
+            
+        self.assertEqual(len(response.data["installments"]), 10)
+        self.assertEqual(len(one_installment), len(ten_installments))
+        
+    def test_allocate_payment_invalid(self):
+        self.credit.refresh_from_db()
+        
+        url = reverse("credit-allocate", kwargs={"pk": self.credit.id})
+        
+        response = self.client.post(url, {"amount": "10.00"}, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "Only approved credits can receive payments.")
+        
+        self.credit.update({"status": "approved"})
+        
+        response = self.client.post(url, {"amount": "1000.00"}, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("exceeds", response.data["error"])
+        
+        response = self.client.post(url, {"amount": "0"}, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+    #Test for Reconciliation
+    def test_reconcile_command(self):
+        Credit.objects.filter(id=self.credit.id).update(total_amount=Decimal("1200.00"))
+        self.credit.refresh_from_db()
+        self.credit.update({"status": "approved"})
+        
+        payments = list(self.credit.payment_set.order_by('due_date', 'id'))
+        Payment.objects.create(credit=self.credit, payment_amount=Decimal("100.00"), payment_date=payments[5].payment_date, due_date=payments[5].due_date)
+        
+        lines = [
+            f"{self.credit.id},100.00,{payments[0].due_date + datetime.timedelta(days=2)},TX1",
+            f"{self.credit.id},100,{payments[1].due_date},TX2",
+            f"{self.credit.id},100.00,{payments[5].due_date},TX3",
+            f"999999,100.00,{payments[2].due_date},TX4",
+            f"{self.credit.id},abc,{payments[2].due_date},TX5",
+            f"{self.credit.id},100.00,{payments[1].due_date},TX6",
+        ]
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "statement.csv")
+            
+            with open(path, "w") as statement:
+                statement.write("credit,amount,date,reference\n" + "\n".join(lines) + "\n")
+                
+            out = StringIO()
+            call_command("reconcile", path, "--chunk-size", "2", stdout=out)
+            
+            with open(path + ".exceptions.csv") as exceptions:
+                rows = list(csv.DictReader(exceptions))
+                
+        self.assertIn("2 payments settled, 2 unmatched, 1 ambiguous and 1 invalid lines", out.getvalue())
+        self.assertEqual(
+            [(row["line"], row["reason"], row["reference"]) for row in rows],
+            [("4", "ambiguous", "TX3"), ("5", "unmatched", "TX4"), ("6", "invalid", "TX5"), ("7", "unmatched", "TX6")]
+        )
+        self.assertEqual(
+            list(Payment.objects.filter(id__in=[payments[0].id, payments[1].id]).values_list('status', flat=True)),
+            ["completed", "completed"]
+        )
+        self.assertEqual(ClientExposure.objects.get(client=self.client_user).outstanding, Decimal("1000.00"))
+        
+    #Test for Conditional GET
+    @override_settings(CONDITIONAL_GET=True)
+    def test_conditional_get_credit_detail(self):
+        cache.clear()
+        
+        url = self.url_template_credits.format(self.credit.id)
+        etag = self.client.get(url)["ETag"]
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        #Payments are nested in the credit, changing one changes the ETag
+        with self.captureOnCommitCallbacks(execute=True):
+            Credit.objects.filter(id=self.credit.id).approve()
+            
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data[0]["payments"]), 12)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.filter(credit=self.credit).settle()
+            
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, status.HTTP_200_OK)
+        
     #Test for Interest Rate
     def test_get_interest_rate_list(self):
         url = reverse("interest_rates")
@@ -440,4 +1310,201 @@ class CreditTestCase(APITestCase):
         self.assertEqual(str(clientcreditproduct_data[0]), "Crédito Prueba - 123456789012 - John Doe - Product 1 - Quantity: 2")
     
     def test_interest_rate_string_representation(self):
-        self.assertEqual(str(self.interest_rate), "5.5")
\ No newline at end of file
+        self.assertEqual(str(self.interest_rate), "5.5")
+        
+class FilterIndexTestCase(TestCase):
+    """
+    Checks on a seeded and analyzed database that every filter of the credit
+    and payment FilterSets is answered with an index instead of a table scan.
+    """
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        
+        interest_rate = InterestRate.objects.create(percentage=2)
+        
+        clients = Client.objects.bulk_create([
+            Client(id=str(i), first_name="John", last_name="Doe", email=f"client{i}@example.com", phone="123", address="Main Street")
+            for i in range(200)
+        ])
+        
+        credits = Credit.objects.bulk_create([
+            Credit(description="Credit", no_installment=12, penalty_rate=1, interest_rate=interest_rate, client=clients[i % 200], status=list(Credit.CREDIT_STATUS)[i % 4])
+            for i in range(1000)
+        ])
+        
+        first_date = datetime.date(2024, 1, 1)
+        
+        Payment.objects.bulk_create([
+            Payment(
+                credit=credit,
+                payment_amount=100,
+                payment_date=first_date + datetime.timedelta(days=(credit.id * 7 + i * 30) % 900),
+                due_date=first_date + datetime.timedelta(days=(credit.id * 7 + i * 30) % 900 + 7),
+                status="completed" if i < 6 else "pending"
+            )
+            for credit in credits for i in range(12)
+        ])
+        
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            
+    def assertUsesIndex(self, filterset_class, queryset, params):
+        plan = filterset_class(QueryDict(params), queryset=queryset).qs.explain()
+        
+        self.assertNotRegex(plan, r"(?m)\bSCAN credits_\w+\s*$|Seq Scan", f"{params} does not use an index:\n{plan}")
+        
+    def test_payment_filters_use_indexes(self):
+        for params in [
+            "credit=1",
+            "credit=1&status=pending&status=completed",
+            "client=1",
+            "client=1&status=pending",
+            "due_date__gte=2024-01-01&due_date__lte=2024-01-15",
+            "due_date__lte=2024-01-15&status=pending",
+            "payment_date__gte=2024-01-01&payment_date__lte=2024-01-10"
+        ]:
+            self.assertUsesIndex(PaymentFilter, Payment.objects.order_by('id'), params)
+            
+    def test_credit_filters_use_indexes(self):
+        tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+        
+        for params in [
+            "status=pending",
+            "status=pending&status=approved&client=1",
+            "client=1",
+            f"application_date__gte={tomorrow}&application_date__lte={tomorrow}"
+        ]:
+            self.assertUsesIndex(CreditFilter, Credit.objects.order_by('id'), params)
+            
+    def test_filter_payments_by_status_and_credit(self):
+        filterset = PaymentFilter(QueryDict("credit=1&status=completed"), queryset=Payment.objects.all())
+        
+        self.assertEqual(filterset.qs.count(), 6)
+            
+@skipUnlessDBFeature("has_select_for_update")
+class ConcurrentApprovalTestCase(TransactionTestCase):
+    """
+    Stress test of concurrent approvals, only meaningful on a database with
+    row level locking such as PostgreSQL.
+    """
+    
+    workers = 8
+    
+    def setUp(self):
+        interest_rate = InterestRate.objects.create(percentage=2)
+        
+        client = Client.objects.create(id="1", first_name="John", last_name="Doe", email="john@example.com", phone="123", address="Main Street")
+        
+        self.credits = Credit.objects.bulk_create([
+            Credit(description="Credit", total_amount=1200, no_installment=12, penalty_rate=1, interest_rate=interest_rate, client=client)
+            for _ in range(self.workers * 4)
+        ])
+        
+    def approve(self, credit_id):
+        try:
+            Credit.objects.get(id=credit_id).update({"status": "approved"})
+            return True
+        except ValidationError:
+            return False
+        finally:
+            connections.close_all()
+            
+    def test_duplicate_approvals_of_same_credit(self):
+        credit_id = self.credits[0].id
+        
+        with ThreadPoolExecutor(self.workers) as executor:
+            results = list(executor.map(self.approve, [credit_id] * self.workers * 4))
+            
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(Payment.objects.filter(credit_id=credit_id).count(), 12)
+        
+    def test_parallel_approvals_of_different_credits(self):
+        with ThreadPoolExecutor(self.workers) as executor:
+            results = list(executor.map(self.approve, [credit.id for credit in self.credits]))
+            
+        self.assertTrue(all(results))
+        self.assertEqual(Payment.objects.count(), len(self.credits) * 12)
+        
+class SlidingWindowThrottleTestCase(SimpleTestCase):
+    
+    def setUp(self):
+        cache.clear()
+        
+        self.now = 1000 * 60.0
+        self.request = APIRequestFactory().get("/")
+        self.request.user = mock.Mock(is_authenticated=True, pk="1")
+        
+    def throttle(self):
+        throttle = UserSlidingWindowThrottle()
+        throttle.rate = "10/min"
+        throttle.num_requests, throttle.duration = 10, 60
+        throttle.timer = lambda: self.now
+        
+        return throttle
+    
+    def test_limits_requests_in_window(self):
+        results = [self.throttle().allow_request(self.request, None) for _ in range(11)]
+        
+        self.assertEqual(results.count(True), 10)
+        
+    def test_previous_window_is_weighted(self):
+        for _ in range(10):
+            self.throttle().allow_request(self.request, None)
+            
+        #Halfway through the next window half of the previous requests still count
+        self.now += 90
+        results = [self.throttle().allow_request(self.request, None) for _ in range(6)]
+        
+        self.assertEqual(results.count(True), 5)
+        
+        throttle = self.throttle()
+        throttle.allow_request(self.request, None)
+        
+        self.assertEqual(throttle.wait(), 1)
+        
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTestCase(APITransactionTestCase):
+    databases = {"default", "replica"}
+    
+    def setUp(self):
+        cache.clear()
+        
+        self.user = User.objects.create(id="1090147891", email="example1@gmail.com", is_superuser=True)
+        self.client_user = Client.objects.create(id="123456789012", first_name="John", last_name="Doe", email="johndoe@example.com", phone="123456789", address="Main Street 1")
+        self.interest_rate = InterestRate.objects.create(percentage=5.5)
+        self.credit = Credit.objects.create(description="Credit", no_installment=12, penalty_rate=1, interest_rate=self.interest_rate, client=self.client_user)
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f' Bearer {RefreshToken.for_user(self.user).access_token}')
+        
+    def credit_queries(self, alias, method, url, **kwargs):
+        with CaptureQueriesContext(connections[alias]) as queries:
+            response = method(url, **kwargs)
+            
+        return response, [query["sql"] for query in queries if "credits_credit" in query["sql"]]
+        
+    def test_safe_requests_read_from_replica(self):
+        response, replica_queries = self.credit_queries("replica", self.client.get, reverse("credit-list"))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertTrue(replica_queries)
+        
+    def test_writes_go_to_primary_and_pin_reads(self):
+        url = reverse("credit-detail", kwargs={"pk": self.credit.id})
+        response, replica_queries = self.credit_queries("replica", self.client.patch, url, data={"status": "rejected"}, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(replica_queries, [])
+        
+        #The next read of the same user sees its own write on the primary
+        response, replica_queries = self.credit_queries("replica", self.client.get, url)
+        
+        self.assertEqual(response.data["status"], "rejected")
+        self.assertEqual(replica_queries, [])
+        
+        cache.clear()
+        response, replica_queries = self.credit_queries("replica", self.client.get, url)
+        
+        self.assertTrue(replica_queries)
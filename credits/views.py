@@ -1,9 +1,19 @@
 from django.shortcuts import render
+from django.core.exceptions import ValidationError
 
 from clients.models import Client
+from products.models import Product
 
-from .models import Credit, Payment, InterestRate, ClientCreditProduct
-from .serializers import CreditSerializer, PaymentSerializer, InterestRateSerializer, ClientCreditProductSerializer
+from .models import Credit, Payment, InterestRate, ClientCreditProduct, ArchivedCredit, CollectionPriority, ClientExposure
+from .serializers import CreditSerializer, PaymentSerializer, InterestRateSerializer, ClientCreditProductSerializer, CreditSimulationSerializer, CreditScheduleSummarySerializer, ArchivedCreditSerializer, CashflowQuerySerializer, CashflowSerializer, CollectionPrioritySerializer, PaymentAllocationRequestSerializer, PaymentAllocationSerializer
+from .simulation import simulate_schedules, quantize
+from .reports import cached_cashflow_totals
+from .allocation import allocate_payment
+from .filters import CreditFilter, PaymentFilter
+from .idempotency import IdempotentWriteMixin
+from .tasks import approve_credit
+
+from tasks.serializers import TaskAcceptedSerializer
 
 from django.core.serializers import serialize
 
@@ -12,49 +22,165 @@ from rest_framework import routers, serializers, viewsets
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework.permissions import IsAuthenticated
-from utils.permissions import CustomDjangoModelPermissions
+from utils.permissions import CustomDjangoModelPermissions, ChangeActionPermissions
+from utils.filters import IndexedSearchFilter
+from utils.paginators import WorklistPagination
+from utils.replicas import ReplicaReadMixin
+from utils.conditional import ConditionalGetMixin
 
-class ClientCreditProductViewSet(viewsets.ModelViewSet):
+class ClientCreditProductViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = ClientCreditProduct.objects.all()
     serializer_class = ClientCreditProductSerializer
     permission_classes = [IsAuthenticated, CustomDjangoModelPermissions]
+    etag_models = [ClientCreditProduct, Product]
     
-class CreditViewSet(viewsets.ModelViewSet):
+class CreditViewSet(ConditionalGetMixin, ReplicaReadMixin, IdempotentWriteMixin, viewsets.ModelViewSet):
     queryset = Credit.objects.all().order_by('id')
     serializer_class = CreditSerializer
     permission_classes = [IsAuthenticated, CustomDjangoModelPermissions]
+    #Models nested in the representation of a credit
+    etag_models = [Credit, Payment, ClientCreditProduct, Product, Client, InterestRate]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter]
+    filterset_class = CreditFilter
+    search_fields = ['description']
+    throttle_scope = 'credits'
 
-    @action(detail=False, methods=['get'], url_path='details/(?P<credit_id>[^/.]+)')
+    @action(detail=False, methods=['get'], url_path='details/(?P<credit_id>[^/.]+)', throttle_scope='credit_details')
     def credits_by_id(self, request, credit_id=None):
         if not Credit.objects.filter(id=credit_id).exists():
-            return Response({"error": "Credit not found"}, status=400)
+            #Closed credits may have been moved to the archive
+            archived = self.get_archived_credits().filter(id=credit_id)
+            
+            if not archived:
+                return Response({"error": "Credit not found"}, status=400)
+            
+            return Response(ArchivedCreditSerializer(archived, many=True).data)
     
         credits = Credit.objects.filter(id=credit_id)
         serializer = self.get_serializer(credits, many=True)
         
         return Response(serializer.data)
     
-    @action(detail=False, methods=['get'], url_path='clients/(?P<client_id>[^/.]+)')
+    @action(detail=False, methods=['get'], url_path='clients/(?P<client_id>[^/.]+)', throttle_scope='credit_details')
     def credits_by_client(self, request, client_id=None):
-        if not Client.objects.filter(id=client_id).exists():
+        if not Client.all_objects.filter(id=client_id).exists():
             return Response({"error": "Client not found"}, status=400)
     
         credits = Credit.objects.filter(client_id=client_id)
         serializer = self.get_serializer(credits, many=True)
+        data = serializer.data
         
-        return Response(serializer.data)
+        if request.query_params.get('include_archived') in ('true', '1'):
+            archived = self.get_archived_credits().filter(client_id=client_id).order_by('id')
+            data = data + ArchivedCreditSerializer(archived, many=True).data
+        
+        return Response(data)
+    
+    def get_archived_credits(self):
+        return ArchivedCredit.objects.select_related('client', 'interest_rate').prefetch_related('payment_set', 'clientcreditproduct_set__id_product')
+    
+    #Queues the approval and answers right away with the task to poll
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, ChangeActionPermissions])
+    def approve(self, request, pk=None):
+        credit = self.get_object()
+        
+        if credit.status != "pending":
+            return Response({"error": "The credit can no longer be updated."}, status=400)
+        
+        task = approve_credit.enqueue(created_by=request.user, credit_id=credit.id)
+        serializer = TaskAcceptedSerializer(task, context={'request': request})
+        
+        return Response(serializer.data, status=202)
+    
+    #Applies an amount to the installments of the credit, oldest due first
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, ChangeActionPermissions])
+    def allocate(self, request, pk=None):
+        credit = self.get_object()
+        
+        serializer = PaymentAllocationRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            allocation = allocate_payment(credit, serializer.validated_data['amount'])
+        except ValidationError as e:
+            return Response({"error": e.message}, status=400)
+        
+        return Response(PaymentAllocationSerializer(allocation).data)
+    
+    #Computes what-if schedules without creating any credit
+    @action(detail=False, methods=['post'], throttle_scope='credit_simulation')
+    def simulate(self, request):
+        serializer = CreditSimulationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        results = simulate_schedules(serializer.validated_data['scenarios'])
+        
+        return Response(CreditScheduleSummarySerializer(results, many=True).data)
               
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(ConditionalGetMixin, ReplicaReadMixin, IdempotentWriteMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all().order_by('id')
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated, CustomDjangoModelPermissions]
+    filterset_class = PaymentFilter
     http_method_names = ['get', 'post', 'put', 'patch']
+    
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        
+        payment = serializer.instance
+        
+        ClientExposure.objects.adjust({payment.credit.client_id: payment.unpaid_amount})
+        CollectionPriority.objects.refresh([payment.credit.client_id])
+        
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        CollectionPriority.objects.refresh([serializer.instance.credit.client_id])
 
-class InterestRateListCreateView(generics.ListCreateAPIView):
+class InterestRateListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     queryset = InterestRate.objects.all().order_by('id')
     serializer_class = InterestRateSerializer
     permission_classes = [IsAuthenticated, CustomDjangoModelPermissions]
     
+    
+class CashflowReportView(ReplicaReadMixin, APIView):
+    """
+    Projected collections: unpaid payment balances per week or month of
+    payment_date, optionally per interest rate or product type, with the
+    expected amount after the delinquency haircut.
+    """
+    queryset = Payment.objects.all()
+    permission_classes = [IsAuthenticated, CustomDjangoModelPermissions]
+    throttle_scope = 'reports'
+    
+    def get(self, request):
+        serializer = CashflowQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        
+        params = serializer.validated_data
+        totals = cached_cashflow_totals(params['period'], params.get('group_by'), params.get('start_date'), params.get('end_date'))
+        expected = 1 - params['haircut'] / 100
+        
+        results = [
+            {**total, 'amount': quantize(total['amount']), 'expected_amount': quantize(total['amount'] * expected)}
+            for total in totals
+        ]
+        
+        return Response({
+            'period': params['period'],
+            'group_by': params.get('group_by'),
+            'haircut': params['haircut'],
+            'results': CashflowSerializer(results, many=True).data
+        })
+        
+class CollectionWorklistView(ReplicaReadMixin, generics.ListAPIView):
+    """
+    Clients with overdue payments, highest collection priority first.
+    """
+    queryset = CollectionPriority.objects.select_related('client').order_by('-score', 'client')
+    serializer_class = CollectionPrioritySerializer
+    permission_classes = [IsAuthenticated, CustomDjangoModelPermissions]
+    pagination_class = WorklistPagination
@@ -1,5 +1,18 @@
 from django.contrib import admin
 from .models import Product, ProductType
 
-admin.site.register(Product)
-admin.site.register(ProductType)
\ No newline at end of file
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'price', 'product_type', 'is_active')
+    list_select_related = ('product_type',)
+    list_filter = ('is_active',)
+    search_fields = ['name']
+    autocomplete_fields = ['product_type']
+    
+    def get_queryset(self, request):
+        return Product.all_objects.all()
+    
+class ProductTypeAdmin(admin.ModelAdmin):
+    search_fields = ['description']
+
+admin.site.register(Product, ProductAdmin)
+admin.site.register(ProductType, ProductTypeAdmin)
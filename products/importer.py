@@ -0,0 +1,138 @@
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Q
+
+from utils.versions import bump_once
+
+from .models import Product, ProductType
+from .serializers import ProductImportRowSerializer
+
+#Fields an import can set, the upsert rewrites all of them on existing products
+FIELDS = ['name', 'description', 'price', 'product_type', 'is_active']
+
+def import_batch(batch, product_types, result):
+    """
+    Applies a batch of rows with one query for the products it refers to, a
+    single upsert of the changed products and a single insert of the new ones.
+    """
+    valid = []
+
+    for line, row in batch:
+        if not isinstance(row, dict):
+            result['errors'].append({'line': line, 'errors': {'non_field_errors': ["The row is not a JSON object."]}})
+            continue
+
+        serializer = ProductImportRowSerializer(data=row)
+
+        if not serializer.is_valid():
+            result['errors'].append({'line': line, 'errors': serializer.errors})
+            continue
+
+        data = dict(serializer.validated_data)
+
+        if 'product_type' in data:
+            matches = product_types.get(data['product_type'].lower(), [])
+
+            if not matches:
+                result['errors'].append({'line': line, 'errors': {'product_type': [f"The product type {data['product_type']} does not exist."]}})
+                continue
+
+            #Descriptions are not unique
+            if len(matches) > 1:
+                result['errors'].append({'line': line, 'errors': {'product_type': [f"Several product types are described as {data['product_type']}."]}})
+                continue
+
+            data['product_type'] = matches[0]
+
+        valid.append((line, data))
+
+    ids = {data['id'] for _, data in valid if 'id' in data}
+    names = {data['name'] for _, data in valid if 'id' not in data}
+
+    by_id = {}
+    by_name = {}
+
+    for product in Product.all_objects.filter(Q(id__in=ids) | Q(name__in=names)):
+        by_id[product.id] = product
+        by_name.setdefault(product.name, []).append(product)
+
+    updated = {}
+    created = []
+
+    for line, data in valid:
+        product_id = data.pop('id', None)
+
+        if product_id is not None:
+            product = by_id.get(product_id)
+
+            if product is None:
+                result['errors'].append({'line': line, 'errors': {'id': [f"The product {product_id} does not exist."]}})
+                continue
+        else:
+            matches = by_name.get(data['name'], [])
+
+            if len(matches) > 1:
+                result['errors'].append({'line': line, 'errors': {'name': [f"Several products are named {data['name']}, use their id."]}})
+                continue
+
+            product = matches[0] if matches else None
+
+        if product is None:
+            missing = [field for field in ('description', 'price', 'product_type') if field not in data]
+
+            if missing:
+                result['errors'].append({'line': line, 'errors': {field: ["This field is required for a new product."] for field in missing}})
+                continue
+
+            product = Product(**data)
+            created.append(product)
+            by_name[product.name] = [product]
+            continue
+
+        for field, value in data.items():
+            setattr(product, field, value)
+
+        #Later rows of the batch for a product created by an earlier one change the pending insert
+        if product.pk is not None:
+            updated[product.pk] = product
+
+    with transaction.atomic():
+        Product.all_objects.bulk_create(list(updated.values()), update_conflicts=True, unique_fields=['id'], update_fields=FIELDS)
+        Product.all_objects.bulk_create(created)
+
+    result['updated'] += len(updated)
+    result['created'] += len(created)
+
+def import_products(rows, batch_size=1000, on_progress=None):
+    """
+    Creates and updates products from (line, row) pairs, batch_size rows per
+    transaction. Rows are matched to an existing product by id, or by name
+    when they have no id, and product types by description from a map loaded
+    once, rejecting descriptions shared by several types. The product caches
+    are invalidated once, when the import ends.
+
+    Returns the number of created and updated products and the errors of the
+    rejected rows.
+    """
+    product_types = {}
+
+    for product_type in ProductType.objects.all():
+        product_types.setdefault(product_type.description.lower(), []).append(product_type)
+
+    result = {'created': 0, 'updated': 0, 'errors': []}
+    rows = iter(rows)
+
+    with bump_once():
+        while True:
+            batch = list(islice(rows, batch_size))
+
+            if not batch:
+                break
+
+            import_batch(batch, product_types, result)
+
+            if on_progress:
+                on_progress(result)
+
+    return result
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from products.importer import import_products
+from utils.imports import FORMATS, file_format, read_rows
+
+class Command(BaseCommand):
+    help = "Creates and updates products from a CSV or JSONL file keyed by product id or name"
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help="CSV or JSONL file with id or name and the fields to set")
+        parser.add_argument('--format', choices=FORMATS, default=None, help="Format of the file, taken from its extension by default")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows applied per transaction")
+
+    def handle(self, *args, **options):
+        import_format = file_format(options['file'], options['format'])
+
+        if import_format not in FORMATS:
+            raise CommandError(f"The file format must be one of: {', '.join(FORMATS)}")
+
+        def progress(result):
+            self.stdout.write(f"{result['created']} products created, {result['updated']} updated")
+
+        try:
+            with open(options['file'], newline='', encoding='utf-8-sig') as file:
+                result = import_products(read_rows(file, import_format), batch_size=options['batch_size'], on_progress=progress)
+        except OSError as e:
+            raise CommandError(e)
+
+        for error in result['errors']:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} products created, {result['updated']} updated, {len(result['errors'])} rows rejected"
+        ))
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-19 13:14
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from utils.postgres import trigram_indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='product_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Lower('description'), name='product_description_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producttype',
+            index=models.Index(django.db.models.functions.text.Lower('description'), name='product_type_desc_lower_idx'),
+        ),
+        trigram_indexes('products_product', ['name', 'description']),
+        trigram_indexes('products_producttype', ['description']),
+    ]
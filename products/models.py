@@ -1,6 +1,10 @@
 from django.db import models
+from django.db.models.functions import Lower
 
-class Product(models.Model):
+from utils.managers import ActiveManager
+from utils.versions import VersionedModel, VersionedQuerySet
+
+class Product(VersionedModel):
     
     id = models.AutoField(primary_key=True) 
     name = models.CharField(max_length=30)
@@ -9,12 +13,32 @@ class Product(models.Model):
     is_active = models.BooleanField(("active"), default=True)
     product_type = models.ForeignKey('ProductType', on_delete=models.RESTRICT)
     
+    #objects hides soft-deleted products, all_objects stays the default manager so unique
+    #validation, the admin, related lookups and dumpdata still see them
+    objects = ActiveManager()
+    all_objects = VersionedQuerySet.as_manager()
+    
+    class Meta:
+        default_manager_name = 'all_objects'
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(is_active=True), name='product_active_idx'),
+            models.Index(Lower('name'), name='product_name_lower_idx'),
+            models.Index(Lower('description'), name='product_description_lower_idx')
+        ]
+    
     def __str__(self) -> str:
         return self.name
 
-class ProductType(models.Model):
+class ProductType(VersionedModel):
     id = models.AutoField(primary_key=True)
     description = models.CharField(max_length=50)
     
+    objects = VersionedQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            models.Index(Lower('description'), name='product_type_desc_lower_idx')
+        ]
+    
     def __str__(self):
         return self.description
\ No newline at end of file
@@ -1,4 +1,7 @@
+from decimal import Decimal
+
 from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
 from .models import ProductType, Product
 
 
@@ -60,3 +63,22 @@ class ProductInfoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ['name']
+
+class ProductImportRowSerializer(serializers.Serializer):
+    """
+    A row of a product import. Only the given fields are changed on an
+    existing product, a new one needs all of them.
+    """
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=30, required=False)
+    description = serializers.CharField(max_length=50, required=False)
+    price = serializers.DecimalField(max_digits=11, decimal_places=2, min_value=Decimal("0"), required=False)
+    #Description of the product type
+    product_type = serializers.CharField(max_length=50, required=False)
+    is_active = serializers.BooleanField(required=False)
+    
+    def validate(self, attrs):
+        if 'id' not in attrs and 'name' not in attrs:
+            raise ValidationError("A product is identified by its id or its name.")
+        
+        return attrs
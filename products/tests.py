@@ -4,6 +4,19 @@ from django.urls import reverse
 from .models import Product, ProductType
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.cache import cache
+from django.test import override_settings
+from django.db import connection
+from django.db.models import F, Value
+from unittest import skipUnless
+from utils.filters import ILike
+from utils.postgres import trigram_index_sql
+from utils.checks import check_conditional_get_cache
+from django.core.management import call_command
+from decimal import Decimal
+from io import StringIO
+import os
+import tempfile
 
 class ProductTests(APITestCase):
     @classmethod
@@ -58,6 +71,44 @@ class ProductTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data), 1)
 
+    def test_search_product(self):
+        url = reverse("product-list")
+        response = self.client.get(url, {"search": "high-power"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        
+        response = self.client.get(url, {"search": "blender"}, format="json")
+        self.assertEqual(response.data["count"], 0)
+
+    def test_search_product_type_by_id(self):
+        url = reverse("producttype-list")
+        
+        response = self.client.get(url, {"search": str(self.product_type.id)}, format="json")
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.product_type.id])
+        
+        response = self.client.get(url, {"search": "electro"}, format="json")
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_search_matches_trigram_index_expression(self):
+        query = Product.objects.all().query
+        lookup = ILike(F("name").resolve_expression(query), Value("%blender%"))
+        
+        sql, params = lookup.as_postgresql(query.get_compiler(connection=connection), connection)
+        create, _ = trigram_index_sql("products_product", "name")
+        
+        #The searched expression is the bare column the GIN index is built on
+        self.assertEqual(sql, '"products_product"."name" ILIKE %s')
+        self.assertIn('("name" gin_trgm_ops)', create)
+
+    @skipUnless(connection.vendor == "postgresql", "pg_trgm indexes only exist on PostgreSQL")
+    def test_search_uses_trigram_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            
+        plan = Product.all_objects.filter(ILike(F("name"), Value("%blender%"))).explain()
+        
+        self.assertIn("products_product_name_trgm_idx", plan)
+
     def test_get_product_detail(self):
         url = reverse("product-detail", kwargs={"pk": self.product.id})
         response = self.client.get(url, format="json")
@@ -100,4 +151,114 @@ class ProductTests(APITestCase):
     def test_delete_product(self):
         url = reverse("product-detail", kwargs={"pk": self.product.id})
         response = self.client.delete(url, format="json")
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_reactivate_deleted_product(self):
+        url = reverse("product-detail", kwargs={"pk": self.product.id})
+        self.client.delete(url, format="json")
+        response = self.client.patch(url, {"is_active": True}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(Product.objects.filter(id=self.product.id).exists())
+
+    @override_settings(CONDITIONAL_GET=True)
+    def test_conditional_get_product_list(self):
+        cache.clear()
+        
+        url = reverse("product-list")
+        response = self.client.get(url, format="json")
+        etag = response["ETag"]
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+        
+        #Only the user of the token is loaded, the products are not queried
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+            
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+        
+        response = self.client.get(url, {"search": "Blender"}, format="json", HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        #The product type is part of the product representation
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse("producttype-detail", kwargs={"pk": self.product_type.id}), {"description": "Home"}, format="json")
+            
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_conditional_get_requires_shared_cache(self):
+        local = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        shared = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://127.0.0.1:6379/1"}}
+        
+        with self.settings(CONDITIONAL_GET=True, CACHES=local):
+            self.assertEqual([error.id for error in check_conditional_get_cache(None)], ["utils.E001"])
+            
+        with self.settings(CONDITIONAL_GET=True, CACHES=shared):
+            self.assertEqual(check_conditional_get_cache(None), [])
+            
+        with self.settings(CONDITIONAL_GET=False, CACHES=local):
+            self.assertEqual(check_conditional_get_cache(None), [])
+            
+        self.assertNotIn("ETag", self.client.get(reverse("product-list"), format="json"))
+
+    def test_bulk_upsert_products(self):
+        url = reverse("product-bulk-upsert")
+        data = [
+            {"id": self.product.id, "price": "49999.99"},
+            {"name": "Toaster", "description": "Two slices", "price": "25.00", "product_type": "electronics"},
+            {"name": "Kettle", "description": "1.7 L", "price": "30.00", "product_type": "Kitchen"},
+            {"price": "10.00"},
+            {"id": 999999, "price": "10.00"}
+        ]
+        
+        response = self.client.post(url, data, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["created"], response.data["updated"]), (1, 1))
+        self.assertEqual([error["line"] for error in response.data["errors"]], [3, 4, 5])
+        self.assertEqual(Product.objects.get(id=self.product.id).price, Decimal("49999.99"))
+        self.assertEqual(Product.objects.get(name="Toaster").product_type, self.product_type)
+        
+    def test_bulk_upsert_ambiguous_product_type(self):
+        ProductType.objects.create(description="Electronics")
+        
+        response = self.client.post(reverse("product-bulk-upsert"), [{"id": self.product.id, "product_type": "electronics"}], format="json")
+        
+        self.assertEqual(response.data["updated"], 0)
+        self.assertIn("product_type", response.data["errors"][0]["errors"])
+        
+    @override_settings(BULK_IMPORT_MAX_ROWS=2)
+    def test_bulk_upsert_too_many_rows(self):
+        data = [{"id": self.product.id, "price": "10.00"}] * 3
+        
+        response = self.client.post(reverse("product-bulk-upsert"), data, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotEqual(Product.objects.get(id=self.product.id).price, Decimal("10.00"))
+        
+    def test_import_products_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.csv")
+            
+            with open(path, "w") as catalog:
+                catalog.write("id,name,description,price,product_type\n")
+                catalog.write(f"{self.product.id},,,59.90,\n")
+                catalog.write(",Toaster,Two slices,25.00,Electronics\n")
+                catalog.write(",Toaster,,27.50,\n")
+                
+            out = StringIO()
+            
+            #Three batches, the product caches are invalidated once
+            with self.captureOnCommitCallbacks() as callbacks:
+                call_command("import_products", path, "--batch-size", "1", stdout=out, stderr=StringIO())
+                
+        self.assertEqual(len(callbacks), 1)
+        self.assertIn("1 products created, 2 updated, 0 rows rejected", out.getvalue())
+        self.assertEqual(Product.objects.get(id=self.product.id).price, Decimal("59.90"))
+        self.assertEqual(Product.objects.get(name="Toaster").price, Decimal("27.50"))
@@ -2,33 +2,81 @@ from django.shortcuts import render
 
 # Create your views here.
 
+import io
+
+from django.conf import settings
+
 from .models import Product, ProductType
 from .serializers import ProductTypeSerializer, ProductSerializer
+from .importer import import_products
 
 #from django.http import JsonResponse
 from django.core.serializers import serialize
 
 from rest_framework import routers, serializers, viewsets
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework.permissions import IsAuthenticated
-from utils.permissions import CustomDjangoModelPermissions
+from utils.permissions import CustomDjangoModelPermissions, UpsertActionPermissions
+from utils.imports import FORMATS, file_format, read_rows, take_rows
+from utils.filters import IndexedSearchFilter
+from utils.conditional import ConditionalGetMixin
 
-class ProductTypeViewSet(viewsets.ModelViewSet):
+class ProductTypeViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = ProductType.objects.all()
     serializer_class = ProductTypeSerializer
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, IndexedSearchFilter]
     ordering_filters = ['description']
     filterset_fields = ['description']
-    search_fields = ['id', 'description']
+    #Ids are matched exactly, on the primary key
+    search_fields = ['=id', 'description']
     permission_classes = [IsAuthenticated, CustomDjangoModelPermissions]
     
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all().order_by('id')
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated, CustomDjangoModelPermissions]
+    etag_models = [Product, ProductType]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter]
+    search_fields = ['name', 'description']
+    
+    #Soft-deleted products are left out of the list but can still be read and reactivated
+    def get_queryset(self):
+        if self.action in ('retrieve', 'update', 'partial_update'):
+            return Product.all_objects.all().order_by('id')
+        
+        return super().get_queryset()
     
     def perform_destroy(self, instance):
         instance.is_active = False
-        instance.save()
\ No newline at end of file
+        instance.save()
+        
+    #Creates and updates products from a JSON list or an uploaded CSV/JSONL file
+    @action(detail=False, methods=['post'], url_path='bulk', permission_classes=[IsAuthenticated, UpsertActionPermissions])
+    def bulk_upsert(self, request):
+        upload = request.FILES.get('file')
+        
+        if upload is not None:
+            upload_format = file_format(upload.name, request.data.get('format'))
+            
+            if upload_format not in FORMATS:
+                return Response({"error": f"The file format must be one of: {', '.join(FORMATS)}"}, status=400)
+            
+            rows = read_rows(io.TextIOWrapper(upload.file, encoding='utf-8-sig'), upload_format)
+            
+        elif isinstance(request.data, list):
+            rows = enumerate(request.data, start=1)
+            
+        else:
+            return Response({"error": "Send a list of products or a CSV/JSONL file."}, status=400)
+        
+        #The import runs in the request, so its size is bounded
+        rows = take_rows(rows, settings.BULK_IMPORT_MAX_ROWS)
+        
+        if rows is None:
+            return Response({"error": f"At most {settings.BULK_IMPORT_MAX_ROWS} products can be sent per request, use the import_products command for larger files."}, status=400)
+        
+        return Response(import_products(rows))
\ No newline at end of file
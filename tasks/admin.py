@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import Task
+
+from utils.paginators import EstimatedCountPaginator
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('result', 'error', 'attempts', 'created_at', 'started_at', 'finished_at', 'locked_until')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+admin.site.register(Task, TaskAdmin)
@@ -0,0 +1,54 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks.worker import Worker
+
+def start_worker(poll_interval):
+    #Forked processes must not reuse the parent's database connections
+    connections.close_all()
+    
+    worker = Worker(poll_interval=poll_interval)
+    
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    
+    worker.run()
+
+class Command(BaseCommand):
+    help = "Runs background task workers"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help="Number of worker processes")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to wait when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Run the ready tasks in this process and exit")
+        
+    def handle(self, *args, **options):
+        if options['once']:
+            executed = Worker().run_once()
+            self.stdout.write(self.style.SUCCESS(f"Executed {executed} tasks"))
+            return
+        
+        connections.close_all()
+        
+        processes = [
+            multiprocessing.Process(target=start_worker, args=(options['poll_interval'],), name=f"worker-{i}")
+            for i in range(options['workers'])
+        ]
+        
+        for process in processes:
+            process.start()
+            
+        self.stdout.write(f"Started {len(processes)} workers")
+        
+        def stop(*args):
+            for process in processes:
+                process.terminate()
+                
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        
+        for process in processes:
+            process.join()
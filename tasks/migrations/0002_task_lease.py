@@ -0,0 +1,38 @@
+# Generated by Django 5.1.1 on 2026-10-19 14:00
+
+from django.conf import settings
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def lease_running_tasks(apps, schema_editor):
+    #Tasks started before leases keep the 30 minutes the old workers gave them
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.filter(status="running").update(locked_until=F('started_at') + timedelta(minutes=30))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_running_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'running')), fields=['locked_until'], name='task_running_lease_idx'),
+        ),
+        migrations.RunPython(lease_running_tasks, migrations.RunPython.noop),
+    ]
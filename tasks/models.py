@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from utils.versions import VersionedModel, VersionedQuerySet
+
+class Task(VersionedModel):
+    
+    TASK_STATUS = {
+        "queued":"Queued",
+        "running":"Running",
+        "succeeded":"Succeeded",
+        "failed":"Failed"
+    }
+    
+    id = models.BigAutoField(primary_key=True)
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=15, default="queued", choices=TASK_STATUS)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    #Lease of the worker running the task, extended while it is alive
+    locked_until = models.DateTimeField(null=True, blank=True)
+    
+    objects = VersionedQuerySet.as_manager()
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            #Only queued tasks are scanned when workers claim the next task
+            models.Index(fields=['run_after', 'id'], condition=models.Q(status="queued"), name='task_queued_idx'),
+            models.Index(fields=['locked_until'], condition=models.Q(status="running"), name='task_running_lease_idx')
+        ]
+    
+    def __str__(self) -> str:
+        return f'{self.id} - {self.name} ({self.status})'
@@ -0,0 +1,33 @@
+from .models import Task
+
+registry = {}
+
+class RegisteredTask:
+    
+    def __init__(self, func, name, max_attempts):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+    
+    def enqueue(self, created_by=None, **kwargs):
+        """
+        Stores the task to be run by a worker. Inside a transaction the task is
+        only visible to the workers once the transaction commits.
+        """
+        return Task.objects.create(name=self.name, kwargs=kwargs, max_attempts=self.max_attempts, created_by=created_by)
+
+def task(name=None, max_attempts=3):
+    """
+    Registers a function as a background task. Its keyword arguments and its
+    return value must be JSON serializable.
+    """
+    def decorator(func):
+        registered = RegisteredTask(func, name or f'{func.__module__}.{func.__name__}', max_attempts)
+        registry[registered.name] = registered
+        
+        return registered
+    
+    return decorator
@@ -0,0 +1,29 @@
+from rest_framework import serializers
+from .models import Task
+
+class TaskSerializer(serializers.ModelSerializer):
+    
+    class Meta:
+        model = Task
+        fields = [
+            'id', 
+            'name', 
+            'status', 
+            'result', 
+            'error', 
+            'attempts', 
+            'created_at', 
+            'started_at', 
+            'finished_at'
+            ]
+        
+class TaskAcceptedSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name='task-detail')
+    
+    class Meta:
+        model = Task
+        fields = [
+            'id', 
+            'status', 
+            'url'
+            ]
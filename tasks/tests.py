@@ -0,0 +1,207 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Task
+from .registry import task
+from .worker import Worker
+from clients.models import Client
+from credits.models import Credit, InterestRate
+from users.models import User
+
+calls = []
+
+@task(name='tests.record')
+def record(value):
+    calls.append(value)
+    return {'value': value}
+
+@task(name='tests.flaky', max_attempts=2)
+def flaky():
+    raise RuntimeError("Temporary failure")
+
+@task(name='tests.unserialisable')
+def unserialisable():
+    return {1, 2}
+
+class WorkerTestCase(TestCase):
+    
+    def setUp(self):
+        calls.clear()
+        self.worker = Worker(retry_delay=0)
+        
+    def test_run_task(self):
+        queued = record.enqueue(value=1)
+        
+        self.assertEqual(self.worker.run_once(), 1)
+        
+        queued.refresh_from_db()
+        
+        self.assertEqual(calls, [1])
+        self.assertEqual(queued.status, "succeeded")
+        self.assertEqual(queued.result, {'value': 1})
+        self.assertEqual(queued.attempts, 1)
+        
+    def test_tasks_run_in_order(self):
+        for value in range(3):
+            record.enqueue(value=value)
+            
+        self.worker.run_once()
+        
+        self.assertEqual(calls, [0, 1, 2])
+        
+    def test_retry_until_max_attempts(self):
+        queued = flaky.enqueue()
+        
+        self.worker.execute(self.worker.claim())
+        queued.refresh_from_db()
+        
+        self.assertEqual(queued.status, "queued")
+        
+        self.worker.execute(self.worker.claim())
+        queued.refresh_from_db()
+        
+        self.assertEqual(queued.status, "failed")
+        self.assertEqual(queued.attempts, 2)
+        self.assertIn("Temporary failure", queued.error)
+        
+    def test_delayed_task_is_not_claimed(self):
+        Task.objects.create(name='tests.record', kwargs={'value': 1}, run_after=timezone.now() + timedelta(hours=1))
+        
+        self.assertEqual(self.worker.run_once(), 0)
+        
+    def test_unknown_task_fails(self):
+        queued = Task.objects.create(name='tests.unknown')
+        
+        self.worker.run_once()
+        queued.refresh_from_db()
+        
+        self.assertEqual(queued.status, "failed")
+        
+    def test_unserialisable_result_fails_task(self):
+        queued = unserialisable.enqueue()
+        record.enqueue(value=1)
+        
+        #The worker goes on with the next task
+        self.assertEqual(self.worker.run_once(), 2)
+        
+        queued.refresh_from_db()
+        
+        self.assertEqual(queued.status, "failed")
+        self.assertEqual(queued.attempts, 1)
+        self.assertIsNone(queued.result)
+        self.assertIn("not JSON serialisable", queued.error)
+        self.assertEqual(calls, [1])
+        
+    def test_requeue_stale_tasks(self):
+        Task.objects.create(name='tests.record', kwargs={'value': 1}, status="running", started_at=timezone.now() - timedelta(hours=1), locked_until=timezone.now() - timedelta(seconds=1))
+        
+        self.assertEqual(self.worker.requeue_stale(), 1)
+        self.assertEqual(self.worker.run_once(), 1)
+        
+    def test_long_running_task_keeps_its_lease(self):
+        running = Task.objects.create(name='tests.record', kwargs={'value': 1}, status="running", started_at=timezone.now() - timedelta(hours=1), locked_until=timezone.now() + timedelta(seconds=30))
+        
+        self.assertEqual(self.worker.requeue_stale(), 0)
+        
+        Task.objects.filter(id=running.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.worker.extend_lease(running), 1)
+        
+        self.assertEqual(self.worker.requeue_stale(), 0)
+        
+    def test_claimed_task_is_leased(self):
+        record.enqueue(value=1)
+        
+        claimed = self.worker.claim()
+        
+        self.assertGreater(Task.objects.get(id=claimed.id).locked_until, timezone.now())
+        
+        self.worker.execute(claimed)
+        
+        self.assertIsNone(Task.objects.get(id=claimed.id).locked_until)
+        
+class ApproveCreditTaskTestCase(APITestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        
+        cls.user = User.objects.create(
+            id="1",
+            first_name="John",
+            last_name="Adams",
+            email="example@gmail.com",
+            phone="123",
+            address="Bajo California",
+            is_superuser=True
+        )
+        
+        cls.refresh = RefreshToken.for_user(cls.user)
+        
+        client = Client.objects.create(id="1", first_name="John", last_name="Doe", email="john@example.com", phone="123", address="Main Street")
+        
+        cls.credit = Credit.objects.create(
+            description="Credit",
+            total_amount=Decimal("1200.00"),
+            no_installment=12,
+            penalty_rate=Decimal("2.5"),
+            interest_rate=InterestRate.objects.create(percentage=5),
+            client=client
+        )
+        
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f' Bearer {self.refresh.access_token}')
+        
+    def test_approve_credit_async(self):
+        url = reverse("credit-approve", kwargs={"pk": self.credit.id})
+        
+        response = self.client.post(url, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data.get("status"), "queued")
+        self.assertEqual(self.credit.payment_set.count(), 0)
+        
+        Worker().run_once()
+        
+        response = self.client.get(reverse("task-detail", kwargs={"pk": response.data.get("id")}), format="json")
+        
+        self.credit.refresh_from_db()
+        
+        self.assertEqual(response.data.get("status"), "succeeded")
+        self.assertEqual(self.credit.status, "approved")
+        self.assertEqual(self.credit.payment_set.count(), 12)
+        
+    @override_settings(CONDITIONAL_GET=True)
+    def test_conditional_get_task(self):
+        cache.clear()
+        
+        response = self.client.post(reverse("credit-approve", kwargs={"pk": self.credit.id}), format="json")
+        url = reverse("task-detail", kwargs={"pk": response.data.get("id")})
+        etag = self.client.get(url, format="json")["ETag"]
+        
+        self.assertEqual(self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        #The worker finishing the task changes its representation
+        with self.captureOnCommitCallbacks(execute=True):
+            Worker().run_once()
+            
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data.get("status"), "succeeded")
+        
+    def test_approve_credit_async_not_pending(self):
+        Credit.objects.filter(id=self.credit.id).update(status="rejected")
+        
+        url = reverse("credit-approve", kwargs={"pk": self.credit.id})
+        
+        response = self.client.post(url, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Task.objects.exists())
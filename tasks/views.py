@@ -0,0 +1,13 @@
+from .models import Task
+from .serializers import TaskSerializer
+
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from utils.permissions import CustomDjangoModelPermissions
+from utils.conditional import ConditionalGetMixin
+
+class TaskViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Task.objects.all().order_by('id')
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated, CustomDjangoModelPermissions]
+    filterset_fields = ['status', 'name']
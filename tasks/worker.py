@@ -0,0 +1,185 @@
+import json
+import logging
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, close_old_connections, connection, connections, transaction
+from django.utils import timezone
+
+from .models import Task
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+class Worker:
+    """
+    Claims queued tasks one at a time and runs them.
+
+    The next task is selected with SELECT ... FOR UPDATE SKIP LOCKED where the
+    database supports it, so workers never wait on each other, and claimed with
+    a conditional UPDATE on status, so two workers can not run the same task
+    on databases without row locks either.
+
+    A claimed task is leased until locked_until, which a heartbeat extends
+    while the task runs. Only tasks whose lease expired, because their worker
+    died, are queued again, however long they have been running.
+    """
+
+    def __init__(self, poll_interval=1.0, retry_delay=5, lease=timedelta(minutes=1)):
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.lease = lease
+        self.stopped = False
+
+    def stop(self, *args):
+        self.stopped = True
+
+    def claim(self):
+        while True:
+            now = timezone.now()
+            ready = Task.objects.filter(status="queued", run_after__lte=now).order_by('run_after', 'id')
+
+            #Without row locks (SQLite) the read must not open a write transaction
+            if connection.features.has_select_for_update:
+                with transaction.atomic():
+                    task = ready.select_for_update(skip_locked=True).first()
+                    claimed = task and self.mark_running(task, now)
+            else:
+                task = ready.first()
+                claimed = task and self.mark_running(task, now)
+
+            if task is None:
+                return None
+
+            #Another worker claimed it first
+            if not claimed:
+                continue
+
+            task.status = "running"
+            task.started_at = now
+            task.locked_until = now + self.lease
+            task.attempts += 1
+
+            return task
+
+    def mark_running(self, task, now):
+        return Task.objects.filter(id=task.id, status="queued").update(
+            status="running", started_at=now, locked_until=now + self.lease, attempts=task.attempts + 1
+        )
+
+    def extend_lease(self, task):
+        return Task.objects.filter(id=task.id, status="running").update(locked_until=timezone.now() + self.lease)
+
+    @contextmanager
+    def heartbeat(self, task):
+        """
+        Extends the lease of the task from a background thread every third of
+        the lease while the block runs.
+        """
+        stopped = threading.Event()
+
+        def beat():
+            try:
+                while not stopped.wait(self.lease.total_seconds() / 3):
+                    try:
+                        self.extend_lease(task)
+                    except DatabaseError:
+                        logger.exception("Could not extend the lease of task %s", task.id)
+            finally:
+                #The thread has its own connection
+                connections.close_all()
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{task.id}", daemon=True)
+        thread.start()
+
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+    def execute(self, task):
+        registered = registry.get(task.name)
+
+        try:
+            if registered is None:
+                raise LookupError(f"Task {task.name} is not registered")
+
+            with self.heartbeat(task):
+                result = registered(**task.kwargs)
+
+            #Running it again would return the same result, so the task fails for good
+            try:
+                json.dumps(result, cls=Task._meta.get_field('result').encoder)
+            except (TypeError, ValueError) as error:
+                raise ValidationError(f"Task {task.name} returned a result that is not JSON serialisable: {error}") from error
+        except Exception as error:
+            self.fail(task, error)
+        else:
+            task.status = "succeeded"
+            task.result = result
+            task.finished_at = timezone.now()
+            task.locked_until = None
+            task.save(update_fields=['status', 'result', 'finished_at', 'locked_until'])
+
+        return task
+
+    def fail(self, task, error):
+        task.error = traceback.format_exc()
+        task.locked_until = None
+
+        #Validation errors are permanent, anything else is retried with backoff
+        if isinstance(error, (ValidationError, LookupError)) or task.attempts >= task.max_attempts:
+            task.status = "failed"
+            task.finished_at = timezone.now()
+            logger.error("Task %s (%s) failed: %s", task.id, task.name, error)
+        else:
+            task.status = "queued"
+            task.run_after = timezone.now() + timedelta(seconds=self.retry_delay * 2 ** (task.attempts - 1))
+            logger.warning("Task %s (%s) will be retried: %s", task.id, task.name, error)
+
+        task.save(update_fields=['status', 'error', 'run_after', 'finished_at', 'locked_until'])
+
+    def requeue_stale(self):
+        """
+        Queues again the tasks left running by a worker that died, whose lease
+        was not extended.
+        """
+        return Task.objects.filter(
+            status="running", locked_until__lt=timezone.now()
+        ).update(status="queued", run_after=timezone.now(), locked_until=None)
+
+    def run_once(self):
+        """
+        Runs queued tasks until none is ready and returns how many ran.
+        """
+        executed = 0
+
+        while not self.stopped:
+            task = self.claim()
+
+            if task is None:
+                break
+
+            self.execute(task)
+            executed += 1
+
+        return executed
+
+    def run(self):
+        while not self.stopped:
+            close_old_connections()
+
+            try:
+                self.requeue_stale()
+                executed = self.run_once()
+            except DatabaseError:
+                logger.exception("Worker could not reach the task queue")
+                executed = 0
+
+            if not executed:
+                time.sleep(self.poll_interval)
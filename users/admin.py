@@ -11,6 +11,8 @@ from django.utils.translation import gettext_lazy as _
 from authtools.forms import UserChangeForm
 from .models import User
 
+from utils.paginators import EstimatedCountPaginator
+
 USERNAME_FIELD = get_user_model().USERNAME_FIELD
 
 REQUIRED_FIELDS = (USERNAME_FIELD,) + tuple(get_user_model().REQUIRED_FIELDS)
@@ -51,7 +53,10 @@ class UserAdmin(DjangoUserAdmin):
         ADVANCED_PERMISSION_FIELDS,
     )
     
+    list_filter = ('is_active', 'is_staff', 'is_superuser', 'date_joined')
     search_fields = ('email', 'first_name')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     ordering = None
     filter_horizontal = ('groups', 'user_permissions')
     readonly_fields = ('last_login', 'date_joined')
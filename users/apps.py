@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+    
+    def ready(self):
+        from django.contrib.auth.models import Group
+        from .models import User, bump_user_version
+        
+        #The permissions of a user change with its groups and their grants
+        m2m_changed.connect(bump_user_version, sender=User.groups.through)
+        m2m_changed.connect(bump_user_version, sender=User.user_permissions.through)
+        m2m_changed.connect(bump_user_version, sender=Group.permissions.through)
+        post_delete.connect(bump_user_version, sender=Group)
@@ -1,7 +1,9 @@
 from django.db import models
-from authtools.models import AbstractEmailUser
+from authtools.models import AbstractEmailUser, UserManager
 
-class User(AbstractEmailUser):
+from utils.versions import VersionedModel, VersionedQuerySet, bump_versions
+
+class User(AbstractEmailUser, VersionedModel):
     
     id = models.CharField(max_length=12, primary_key=True)
     first_name = models.CharField(max_length=30)
@@ -12,6 +14,8 @@ class User(AbstractEmailUser):
     
     REQUIRED_FIELDS = ['id', 'first_name', 'last_name', 'phone', 'address']
     
+    objects = UserManager.from_queryset(VersionedQuerySet)()
+    
     groups = models.ManyToManyField(
         'auth.Group',
         related_name='custom_user_set',  # Avoid conflict with'auth.User'
@@ -24,5 +28,19 @@ class User(AbstractEmailUser):
         blank=True
     )
     
+    class Meta(AbstractEmailUser.Meta):
+        #Columns of the admin list_filter
+        indexes = [
+            models.Index(fields=['is_active'], name='user_is_active_idx'),
+            models.Index(fields=['is_staff'], name='user_is_staff_idx'),
+            models.Index(fields=['is_superuser'], name='user_is_superuser_idx'),
+            models.Index(fields=['date_joined'], name='user_date_joined_idx')
+        ]
+    
     def __str__(self) -> str:
-        return f'{self.id} - {self.first_name} {self.last_name}'
\ No newline at end of file
+        return f'{self.id} - {self.first_name} {self.last_name}'
+
+#Group and permission changes are written to m2m tables, not through User.save
+def bump_user_version(sender, using, action='post_delete', **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear', 'post_delete'):
+        bump_versions(User, using=using)
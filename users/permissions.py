@@ -0,0 +1,41 @@
+from django.contrib.auth.models import Permission
+
+from .models import User
+
+def permission_name(app_label, codename):
+    return f'{app_label}.{codename}'
+
+def effective_permissions(users):
+    """
+    Permission names (app_label.codename) each user is granted by the model
+    backend: its own permissions and those of its groups, every permission
+    for active superusers and none for inactive users.
+
+    The grants of all the users come from a single UNION query, the whole
+    permission list is only loaded when there is an active superuser.
+    """
+    users = list(users)
+    ids = [user.pk for user in users if user.is_active and not user.is_superuser]
+    permissions = {user.pk: set() for user in users}
+
+    direct = (
+        User.user_permissions.through.objects.filter(user_id__in=ids)
+        .values_list('user_id', 'permission__content_type__app_label', 'permission__codename')
+    )
+    grouped = (
+        User.groups.through.objects.filter(user_id__in=ids, group__permissions__isnull=False)
+        .values_list('user_id', 'group__permissions__content_type__app_label', 'group__permissions__codename')
+    )
+
+    for user_id, app_label, codename in direct.union(grouped):
+        permissions[user_id].add(permission_name(app_label, codename))
+
+    superusers = [user.pk for user in users if user.is_active and user.is_superuser]
+
+    if superusers:
+        every = {permission_name(*row) for row in Permission.objects.values_list('content_type__app_label', 'codename')}
+
+        for user_id in superusers:
+            permissions[user_id] = every
+
+    return {user_id: sorted(names) for user_id, names in permissions.items()}
@@ -49,3 +49,16 @@ class UserSerializer(serializers.ModelSerializer):
         user.groups.set(groups_data)
         
         return user
+
+class UserPermissionsSerializer(UserSerializer):
+    """
+    User with its effective permissions, computed for all the serialized
+    users at once by the view and passed in the context.
+    """
+    permissions = serializers.SerializerMethodField()
+    
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['permissions']
+        
+    def get_permissions(self, obj):
+        return self.context['permissions'].get(obj.pk, [])
@@ -2,7 +2,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import Group
+from django.contrib.auth.models import Group, Permission
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from .models import User
@@ -128,10 +128,43 @@ class UserTestCase(APITestCase):
         
     def test_user_string_representation(self):
         self.assertEqual(str(self.user), "1 - John Adams")
+
+    def test_get_user_list_ordered(self):
+        for user_id in ("3", "2"):
+            User.objects.create(id=user_id, first_name="Staff", last_name=user_id, email=f"staff{user_id}@gmail.com", phone="123", address="Nashville")
+        
+        url = reverse("user-list")
+        response = self.client.get(url, format="json")
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user["id"] for user in response.data.get("results")], ["1", "2", "3"])
         
+    def test_get_user_list_expanded_permissions(self):
+        self.group.permissions.add(Permission.objects.get(codename="view_client"))
         
+        staff = User.objects.create(id="2", first_name="Staff", last_name="Member", email="staff@gmail.com", phone="123", address="Nashville")
+        staff.groups.add(self.group)
+        staff.user_permissions.add(Permission.objects.get(codename="add_product"), Permission.objects.get(codename="view_client"))
         
+        inactive = User.objects.create(id="3", first_name="Former", last_name="Member", email="former@gmail.com", phone="123", address="Nashville", is_active=False)
+        inactive.groups.add(self.group)
         
+        url = reverse("user-list")
+        
+        #Authentication, count, page, groups, grants of the page and the permissions of the superuser
+        with self.assertNumQueries(6):
+            response = self.client.get(url, {"expand": "permissions"}, format="json")
+            
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
         
+        permissions = {user["id"]: user["permissions"] for user in response.data.get("results")}
         
-        
\ No newline at end of file
+        self.assertEqual(permissions["2"], ["clients.view_client", "products.add_product"])
+        self.assertEqual(permissions["3"], [])
+        self.assertEqual(len(permissions["1"]), Permission.objects.count())
+        
+        response = self.client.get(reverse("user-detail", kwargs={"pk": "2"}), {"expand": "permissions"}, format="json")
+        self.assertEqual(response.data.get("permissions"), ["clients.view_client", "products.add_product"])
+        
+        response = self.client.get(url, format="json")
+        self.assertNotIn("permissions", response.data.get("results")[0])
@@ -3,7 +3,8 @@ from django.shortcuts import render
 # Create your views here.
 
 from .models import User
-from .serializers import UserSerializer
+from .serializers import UserSerializer, UserPermissionsSerializer
+from .permissions import effective_permissions
 
 from django.core.serializers import serialize
 
@@ -11,15 +12,36 @@ from rest_framework import routers, serializers, viewsets
 from rest_framework.filters import OrderingFilter, SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
 
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 
 from utils.permissions import CustomDjangoModelPermissions
+from utils.conditional import ConditionalGetMixin
 
-class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+class UserViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    #Primary key order keeps the pages stable, the groups of a page are loaded with one query
+    queryset = User.objects.prefetch_related('groups').order_by('id')
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated, CustomDjangoModelPermissions]
     
+    #?expand=permissions adds the effective permissions of each user
+    def expand_permissions(self):
+        return self.request.method in SAFE_METHODS and self.request.query_params.get('expand') == 'permissions'
+    
+    def get_serializer_class(self):
+        if self.expand_permissions():
+            return UserPermissionsSerializer
+        
+        return super().get_serializer_class()
+    
+    def get_serializer(self, *args, **kwargs):
+        if args and self.expand_permissions():
+            users = args[0] if kwargs.get('many') else [args[0]]
+            
+            kwargs['context'] = self.get_serializer_context()
+            kwargs['context']['permissions'] = effective_permissions(users)
+            
+        return super().get_serializer(*args, **kwargs)
+    
     def perform_destroy(self, instance):
         instance.is_active = False
         instance.save()
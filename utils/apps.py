@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.core.checks import Tags, register
+
+
+class UtilsConfig(AppConfig):
+    name = 'utils'
+
+    def ready(self):
+        from .checks import check_conditional_get_cache
+
+        register(check_conditional_get_cache, Tags.caches)
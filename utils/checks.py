@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Error
+
+#Cache backends private to each process
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+def check_conditional_get_cache(app_configs, **kwargs):
+    """
+    Model versions bumped by workers and management commands in a cache only
+    their process sees would leave the API answering 304 with stale data.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+
+    if settings.CONDITIONAL_GET and backend in LOCAL_CACHES:
+        return [Error(
+            "CONDITIONAL_GET needs a cache shared by every process.",
+            hint=f"Use a shared cache backend such as Redis instead of {backend}, or set CONDITIONAL_GET = False.",
+            id='utils.E001',
+        )]
+
+    return []
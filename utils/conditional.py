@@ -0,0 +1,75 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .replicas import reading_from_replica
+from .versions import get_versions
+
+class NotModified(Exception):
+
+    def __init__(self, response):
+        self.response = response
+
+class ConditionalGetMixin:
+    """
+    Answers conditional GET requests of a view from the versions of the
+    models its responses are built from, listed in `etag_models` (the model
+    of the queryset by default).
+
+    The ETag and Last-Modified are computed from the cache after the
+    permission checks, without touching the database, and a request whose
+    If-None-Match or If-Modified-Since still matches gets a 304 before the
+    queryset is evaluated or anything is serialized. Only active with
+    settings.CONDITIONAL_GET, which requires a cache shared by all processes.
+    """
+
+    etag_models = None
+
+    def get_etag_models(self):
+        return self.etag_models or [self.get_queryset().model]
+
+    def get_conditional_validators(self, request):
+        versions = get_versions(self.get_etag_models())
+        newest = max(versions)
+
+        #A lagging replica could answer with the data before the last change
+        if reading_from_replica() and time.time_ns() - newest < settings.REPLICA_PIN_SECONDS * 10**9:
+            return None, None
+
+        digest = hashlib.sha1(
+            f"{request.get_full_path()}|{request.accepted_media_type}|{':'.join(map(str, versions))}".encode()
+        ).hexdigest()
+
+        return f'"{digest}"', newest // 10**9
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        self._etag = self._last_modified = None
+
+        if request.method in ('GET', 'HEAD') and settings.CONDITIONAL_GET:
+            self._etag, self._last_modified = self.get_conditional_validators(request)
+
+            if self._etag:
+                response = get_conditional_response(request, etag=self._etag, last_modified=self._last_modified)
+
+                if response is not None:
+                    raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        if getattr(self, '_etag', None) and response.status_code in (200, 304):
+            response['ETag'] = self._etag
+            response['Last-Modified'] = http_date(self._last_modified)
+
+        return response
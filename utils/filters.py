@@ -0,0 +1,109 @@
+import operator
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, FloatField, Func, Lookup, Q, Value
+from django.db.models.functions import Greatest, Lower
+from django.db.models.lookups import GreaterThanOrEqual, LessThan
+from rest_framework.filters import SearchFilter
+
+#Largest code point, used as the upper bound of prefix ranges
+PREFIX_UPPER_BOUND = chr(0x10ffff)
+
+class TrigramSimilarity(Func):
+    function = 'SIMILARITY'
+    output_field = FloatField()
+
+class ILike(Lookup):
+    """
+    `column ILIKE pattern` on the bare column (PostgreSQL only). icontains
+    compiles to UPPER(column::text) LIKE ..., which the pg_trgm indexes on the
+    column can not serve.
+    """
+    lookup_name = 'ilike'
+    
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        
+        return f'{lhs} ILIKE {rhs}', (*lhs_params, *rhs_params)
+
+class IndexedSearchFilter(SearchFilter):
+    """
+    Search backend that only emits index-backed lookups.
+
+    On PostgreSQL every term is matched with `field ILIKE '%term%'`, which is
+    served by the pg_trgm GIN indexes on the columns, and results are ranked by
+    trigram similarity. On other databases every term is matched as a
+    case-insensitive prefix with a range over LOWER(field), which is served by
+    the Lower() expression indexes. Fields prefixed with `=` are matched
+    exactly, on their own index.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        
+        if not search_fields or not search_terms:
+            return queryset
+        
+        if connections[queryset.db].vendor == 'postgresql':
+            return self.filter_trigram(request, queryset, view, search_fields, search_terms)
+        
+        return self.filter_prefix(queryset, search_fields, search_terms)
+    
+    def exact_query(self, queryset, field, term):
+        #Terms that are not a valid value of the field, e.g. text for an integer id, can not match
+        try:
+            value = queryset.model._meta.get_field(field).to_python(term)
+        except ValidationError:
+            return None
+        
+        return Q(**{field: value})
+    
+    def search(self, queryset, search_fields, search_terms, text_query):
+        for term in search_terms:
+            queries = []
+            
+            for field in search_fields:
+                if field.startswith('='):
+                    query = self.exact_query(queryset, field[1:], term)
+                else:
+                    query = text_query(field, term)
+                    
+                if query is not None:
+                    queries.append(query)
+                    
+            if not queries:
+                return queryset.none()
+            
+            queryset = queryset.filter(reduce(operator.or_, queries))
+            
+        return queryset
+    
+    def filter_trigram(self, request, queryset, view, search_fields, search_terms):
+        ops = connections[queryset.db].ops
+        
+        def contains(field, term):
+            return Q(ILike(F(field), Value(f"%{ops.prep_for_like_query(term)}%")))
+        
+        queryset = self.search(queryset, search_fields, search_terms, contains)
+        
+        term = Value(" ".join(search_terms))
+        similarities = [TrigramSimilarity(field, term) for field in search_fields if not field.startswith('=')]
+        
+        if not similarities:
+            return queryset
+        
+        rank = similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+        
+        return queryset.annotate(search_rank=rank).order_by('-search_rank', *queryset.query.order_by)
+    
+    def filter_prefix(self, queryset, search_fields, search_terms):
+        def starts_with(field, term):
+            prefix = term.lower()
+            
+            return Q(GreaterThanOrEqual(Lower(field), prefix)) & Q(LessThan(Lower(field), prefix + PREFIX_UPPER_BOUND))
+        
+        return self.search(queryset, search_fields, search_terms, starts_with)
@@ -0,0 +1,41 @@
+import csv
+import json
+import os
+from itertools import islice
+
+FORMATS = ['csv', 'jsonl']
+
+def file_format(filename, given=None):
+    """
+    Format of an import file, the given one or its extension.
+    """
+    return (given or os.path.splitext(filename)[1].lstrip('.')).lower()
+
+def take_rows(rows, limit):
+    """
+    The first limit rows as a list, None if there are more.
+    """
+    rows = list(islice(rows, limit + 1))
+
+    return rows if len(rows) <= limit else None
+
+def read_rows(file, file_format):
+    """
+    Yields the line number and content of each row of a CSV or JSONL file.
+    Empty CSV cells are left out, so they keep the current value. JSONL lines
+    that are not valid JSON are yielded as None.
+    """
+    if file_format == 'csv':
+        for line, row in enumerate(csv.DictReader(file), start=2):
+            yield line, {key: value for key, value in row.items() if key and value not in ('', None)}
+
+        return
+
+    for line, text in enumerate(file, start=1):
+        if not text.strip():
+            continue
+
+        try:
+            yield line, json.loads(text)
+        except ValueError:
+            yield line, None
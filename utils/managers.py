@@ -0,0 +1,11 @@
+from django.db import models
+
+from .versions import VersionedQuerySet
+
+class ActiveManager(models.Manager.from_queryset(VersionedQuerySet)):
+    """
+    Manager that hides soft-deleted rows (is_active=False).
+    """
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
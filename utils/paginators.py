@@ -0,0 +1,65 @@
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the PostgreSQL planner estimate on large tables
+    instead of running an exact COUNT(*). Small results and other database
+    vendors keep the exact count.
+    """
+    
+    #Estimates below this value are replaced by an exact count
+    estimate_threshold = 100000
+    
+    @cached_property
+    def count(self):
+        estimate = self.estimated_count()
+        
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        
+        return super().count
+    
+    def estimated_count(self):
+        queryset = self.object_list
+        
+        if not isinstance(queryset, QuerySet):
+            return None
+        
+        connection = connections[queryset.db]
+        
+        if connection.vendor != 'postgresql':
+            return None
+        
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(queryset.model._meta.db_table)]
+                )
+                row = cursor.fetchone()
+                
+                return row[0] if row and row[0] > 0 else None
+            
+            sql, params = queryset.order_by().values('pk').query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+            
+        return plan[0]['Plan']['Plan Rows']
+
+class WorklistPagination(CursorPagination):
+    """
+    Cursor pages over the collection priority index, each page is a single
+    indexed range query without a COUNT(*).
+    """
+    
+    page_size = 50
+    ordering = ('-score', 'client')
@@ -5,3 +5,19 @@ class CustomDjangoModelPermissions(permissions.DjangoModelPermissions):
     def __init__(self):
         self.perms_map = copy.deepcopy(self.perms_map)
         self.perms_map['GET'] = ['%(app_label)s.view_%(model_name)s']
+
+class ChangeActionPermissions(CustomDjangoModelPermissions):
+    """
+    For POST actions that modify an existing object, such as approving a credit.
+    """
+    def __init__(self):
+        super().__init__()
+        self.perms_map['POST'] = ['%(app_label)s.change_%(model_name)s']
+
+class UpsertActionPermissions(CustomDjangoModelPermissions):
+    """
+    For POST actions that create and update objects, such as importing products.
+    """
+    def __init__(self):
+        super().__init__()
+        self.perms_map['POST'] = ['%(app_label)s.add_%(model_name)s', '%(app_label)s.change_%(model_name)s']
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+def run_sql_on_postgresql(sql, reverse_sql):
+    """
+    RunPython operation that executes the given statements only on PostgreSQL,
+    so PostgreSQL specific indexes can live next to a SQLite development setup.
+    """
+    def execute(statements):
+        def run(apps, schema_editor):
+            if schema_editor.connection.vendor != 'postgresql':
+                return
+            
+            for statement in statements:
+                schema_editor.execute(statement)
+                
+        return run
+    
+    return migrations.RunPython(execute(sql), execute(reverse_sql))
+
+def trigram_index_sql(table, column):
+    """
+    Statements creating and dropping the pg_trgm GIN index of a column. It is
+    built on the bare column, which serves the `column ILIKE '%term%'` of
+    IndexedSearchFilter.
+    """
+    name = f"{table}_{column}_trgm_idx"
+    
+    return (
+        f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin ("{column}" gin_trgm_ops)',
+        f'DROP INDEX IF EXISTS "{name}"'
+    )
+
+def trigram_indexes(table, columns):
+    """
+    Operation creating a pg_trgm GIN index on each column of table (PostgreSQL only).
+    """
+    sql = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+    reverse_sql = []
+    
+    for column in columns:
+        create, drop = trigram_index_sql(table, column)
+        sql.append(create)
+        reverse_sql.append(drop)
+        
+    return run_sql_on_postgresql(sql, reverse_sql)
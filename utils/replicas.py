@@ -0,0 +1,89 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+#Alias the reads of the current request are routed to, None means the primary
+_read_alias = ContextVar('read_alias', default=None)
+
+def reading_from_replica():
+    return _read_alias.get() is not None
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+def pin_key(user):
+    return f'replica-pin:{user.pk}'
+
+def pin_to_primary(user):
+    """
+    Sends the reads of the user to the primary for REPLICA_PIN_SECONDS, so
+    the data it just wrote is not read back from a replica that lags behind.
+    """
+    if user and user.is_authenticated:
+        cache.set(pin_key(user), True, settings.REPLICA_PIN_SECONDS)
+
+def is_pinned(user):
+    return bool(user and user.is_authenticated and cache.get(pin_key(user)))
+
+class ReplicaRouter:
+    """
+    Routes the reads of the views that opted in with ReplicaReadMixin to one
+    of the DATABASE_REPLICAS aliases. Everything else, writes included, goes
+    to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        #Objects loaded from a replica must still be saved on the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        #Replicas get their schema from the primary
+        if db in get_replicas():
+            return False
+
+        return None
+
+class ReplicaReadMixin:
+    """
+    Serves the safe requests of a viewset from a read replica.
+
+    Views and actions can opt out with `read_replica = False`. After a write,
+    the user reads from the primary until the replicas have caught up.
+    """
+
+    read_replica = True
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        replicas = get_replicas()
+
+        if self.read_replica and replicas and request.method in SAFE_METHODS and not is_pinned(request.user):
+            self._read_alias_token = _read_alias.set(random.choice(replicas))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_read_alias_token', None)
+
+        if token is not None:
+            _read_alias.reset(token)
+            self._read_alias_token = None
+
+        if request.method not in SAFE_METHODS:
+            pin_to_primary(request.user)
+
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,106 @@
+import math
+
+from rest_framework.throttling import SimpleRateThrottle
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Rate throttle with a sliding window counter.
+
+    DRF's SimpleRateThrottle keeps the timestamp of every request of the window
+    in the cache and rewrites the whole list on each request. This throttle keeps
+    one counter per fixed window and estimates the requests of the last duration
+    seconds as the current counter plus the elapsed-weighted previous counter,
+    so each request costs a get_many and an incr on any Django cache backend.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        current_key = f'{self.key}:{window}'
+        previous_key = f'{self.key}:{window - 1}'
+
+        counts = self.cache.get_many([previous_key, current_key])
+        self.previous = counts.get(previous_key, 0)
+        self.current = counts.get(current_key, 0)
+        self.elapsed = now - window * self.duration
+
+        if self.previous * (1 - self.elapsed / self.duration) + self.current >= self.num_requests:
+            return self.throttle_failure()
+
+        #Counters outlive their window so they can be read as the previous one
+        if not self.cache.add(current_key, 1, self.duration * 2):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                self.cache.set(current_key, 1, self.duration * 2)
+
+        return True
+
+    def wait(self):
+        remaining = self.duration - self.elapsed
+
+        if self.current >= self.num_requests or not self.previous:
+            return remaining
+
+        #Time until the weight of the previous window leaves room for one request
+        available = self.num_requests - self.current
+        wait = self.duration * (1 - available / self.previous) - self.elapsed
+
+        return max(1, min(math.ceil(wait), remaining))
+
+class AnonSlidingWindowThrottle(SlidingWindowRateThrottle):
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request)
+        }
+
+class UserSlidingWindowThrottle(SlidingWindowRateThrottle):
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': ident
+        }
+
+class ScopedSlidingWindowThrottle(UserSlidingWindowThrottle):
+    """
+    Per user budget of the endpoint scope declared with `throttle_scope` on the
+    view or on one of its actions. Views without a scope are not limited.
+    """
+
+    scope_attr = 'throttle_scope'
+
+    def __init__(self):
+        #The rate depends on the view, it is resolved in allow_request
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        return super().allow_request(request, view)
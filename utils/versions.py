@@ -0,0 +1,130 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+
+#Keys bumped inside a bump_once block, None outside of one
+_deferred_keys = ContextVar('deferred_keys', default=None)
+
+def version_key(model):
+    return f'version:{model._meta.concrete_model._meta.label_lower}'
+
+def schedule_bump(keys, using):
+    def bump():
+        cache.set_many(dict.fromkeys(keys, time.time_ns()), None)
+
+    transaction.on_commit(bump, using=using, robust=True)
+
+def bump_versions(*model_classes, using=DEFAULT_DB_ALIAS):
+    """
+    Gives the models a new version once the current transaction commits, so
+    a version is never seen before the data it stands for.
+    """
+    keys = {version_key(model) for model in model_classes}
+    deferred = _deferred_keys.get()
+
+    if deferred is not None:
+        deferred.update(keys)
+    else:
+        schedule_bump(keys, using)
+
+@contextmanager
+def bump_once(using=DEFAULT_DB_ALIAS):
+    """
+    Collects the version bumps of the writes made in the block, for example
+    one per batch of an import, and applies them once when it ends.
+    """
+    keys = set()
+    token = _deferred_keys.set(keys)
+
+    try:
+        yield
+    finally:
+        _deferred_keys.reset(token)
+
+        if keys:
+            schedule_bump(keys, using)
+
+def bump_deleted(rows, using=DEFAULT_DB_ALIAS):
+    #rows is the per model count returned by delete(), cascades included
+    changed = [apps.get_model(label) for label, count in rows.items() if count]
+
+    if changed:
+        bump_versions(*changed, using=using)
+
+def get_versions(model_classes):
+    """
+    Current version of each model, in nanoseconds since the epoch of its last
+    change. Models without a version, after a cache flush, start a new one.
+    """
+    keys = [version_key(model) for model in model_classes]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+
+    if missing:
+        now = time.time_ns()
+
+        for key in missing:
+            cache.add(key, now, None)
+
+        versions.update(cache.get_many(missing))
+
+    return [versions.get(key, 0) for key in keys]
+
+class VersionedQuerySet(models.QuerySet):
+    """
+    QuerySet whose bulk writes bump the version of its model.
+    """
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+
+        if rows:
+            bump_versions(self.model, using=self.db)
+
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+
+        if objs:
+            bump_versions(self.model, using=self.db)
+
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+
+        if rows:
+            bump_versions(self.model, using=self.db)
+
+        return rows
+
+    def delete(self):
+        deleted, rows = super().delete()
+        bump_deleted(rows, using=self.db)
+
+        return deleted, rows
+
+class VersionedModel(models.Model):
+    """
+    Model whose saves and deletes bump its version. Its managers must be
+    built on VersionedQuerySet so bulk writes do too.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_versions(type(self), using=self._state.db)
+
+    def delete(self, *args, **kwargs):
+        using = self._state.db
+        deleted, rows = super().delete(*args, **kwargs)
+        bump_deleted(rows, using=using)
+
+        return deleted, rows